@@ -1,10 +1,31 @@
-from flask import Blueprint, request, jsonify
-from models import db, Bill, BillItem, Customer, Service
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
+from models import db, Bill, BillItem, Customer, InvoiceSequence, Service
+import catalog_cache
+import invoice_pdf
+import jobs
+import rollups
+import collections
+import csv
+import io
+import json
+import os
+import zipfile
 from datetime import datetime
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from api.pagination import (
+    PaginationError, keyset_page, parse_bool, parse_date, parse_int, parse_limit,
+)
+from api.etag import conditional
+from api.serializers import bill_dicts, bill_select, json_response
 
 bill_bp = Blueprint('bills', __name__)
 
+# Tables a serialized bill is built from (customer / service names included).
+BILL_TABLES = ('bills', 'bill_items', 'customers', 'services')
+
 def _normalize_year(year: int) -> int:
     year_int = int(year)
     # If a 2-digit year is ever passed, normalize to 2000-based.
@@ -13,51 +34,400 @@ def _normalize_year(year: int) -> int:
     return year_int
 
 
-def _max_suffix_for_prefix(prefix: str) -> int:
-    """Find the highest numeric suffix for bill_number values matching prefix."""
-    last_bill = (
-        Bill.query
-        .filter(Bill.bill_number.like(f"{prefix}%"))
-        .order_by(Bill.bill_number.desc())
-        .first()
+def _invoice_number(year_int: int, suffix: int) -> str:
+    return f"INV-{year_int % 100:02d}-{suffix:04d}"
+
+
+def _highest_existing_suffix(year_int: int) -> int:
+    """Highest numeric suffix among existing bill numbers for the year.
+
+    Considers both INV-YY- and legacy INV-YYYY- numbers (SQLite's LIKE is
+    case-insensitive, so lowercase 'inv-' variants match too). Only used to
+    seed the invoice sequence, so it runs once per year.
+    """
+    yy = year_int % 100
+    numbers = db.session.query(Bill.bill_number).filter(or_(
+        Bill.bill_number.like(f"INV-{yy:02d}-%"),
+        Bill.bill_number.like(f"INV-{year_int}-%"),
+    ))
+    highest = 0
+    for (bill_number,) in numbers:
+        try:
+            highest = max(highest, int(bill_number.split("-")[-1]))
+        except (ValueError, IndexError):
+            continue
+    return highest
+
+
+def _reserve_invoice_suffixes(year: int, count: int = 1) -> int:
+    """Atomically reserve `count` consecutive suffixes for `year`; return the first.
+
+    Runs inside the caller's transaction: the UPDATE takes SQLite's write lock,
+    so the counter cannot be handed out twice and rolls back with the bill.
+    """
+    year_int = _normalize_year(year)
+    bump = (
+        update(InvoiceSequence)
+        .where(InvoiceSequence.year == year_int)
+        .values(last_value=InvoiceSequence.last_value + count)
     )
-    if not last_bill or not last_bill.bill_number:
-        return 0
-    try:
-        return int(last_bill.bill_number.split("-")[-1])
-    except (ValueError, IndexError):
-        return 0
+    if db.session.execute(bump).rowcount == 0:
+        db.session.execute(
+            sqlite_insert(InvoiceSequence)
+            .values(year=year_int, last_value=_highest_existing_suffix(year_int))
+            .on_conflict_do_nothing(index_elements=['year'])
+        )
+        db.session.execute(bump)
+
+    last_value = db.session.execute(
+        select(InvoiceSequence.last_value).where(InvoiceSequence.year == year_int)
+    ).scalar_one()
+    return last_value - count + 1
 
 
 def next_invoice_number(year: int, start_from: int | None = None) -> str:
-    """Generate next invoice number as INV-YY-0001 (YY is the 2-digit year)."""
+    """Generate next invoice number as INV-YY-0001 (YY is the 2-digit year).
+
+    This is a preview: it reads the year's sequence without advancing it.
+    """
     year_int = _normalize_year(year)
-    yy = year_int % 100
-    desired_prefix = f"INV-{yy:02d}-"
 
     if start_from is None:
-        prefixes_to_consider = [
-            desired_prefix,
-            f"inv-{yy:02d}-",
-            # Also consider any existing 4-digit-year invoices for continuity.
-            f"INV-{year_int}-",
-            f"inv-{year_int}-",
-        ]
-        start_from = 0
-        for prefix in prefixes_to_consider:
-            start_from = max(start_from, _max_suffix_for_prefix(prefix))
-
-    return f"{desired_prefix}{(start_from + 1):04d}"
+        start_from = db.session.execute(
+            select(InvoiceSequence.last_value).where(InvoiceSequence.year == year_int)
+        ).scalar()
+        if start_from is None:
+            start_from = _highest_existing_suffix(year_int)
+
+    return _invoice_number(year_int, start_from + 1)
+
+
+class BillValidationError(ValueError):
+    """Invalid bill payload; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _payload_items(data):
+    """Return the item list of a bill payload (new `items` format or legacy single service)."""
+    items = data.get('items')
+    if not items:
+        if data.get('service_id'):
+            items = [{
+                'service_id': data.get('service_id'),
+                'quantity': data.get('quantity', 1),
+                'unit_price': data.get('unit_price')
+            }]
+        else:
+            raise BillValidationError('At least one service item is required')
+
+    if not isinstance(items, list) or len(items) == 0:
+        raise BillValidationError('Items must be a non-empty list')
+    return items
+
+
+def _item_service_ids(items):
+    service_ids = []
+    for idx, item in enumerate(items):
+        service_id = item.get('service_id') if isinstance(item, dict) else None
+        if service_id is None or service_id == '':
+            raise BillValidationError(f"Item {idx + 1}: service_id is required")
+        service_ids.append(int(service_id))
+    return service_ids
+
+
+def _chunked(values, size=500):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _active_customer(customer_id):
+    """The cached catalog row of a non-deleted customer, or None."""
+    try:
+        return catalog_cache.customers().get(int(customer_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_active_services(service_ids):
+    """Non-deleted services for `service_ids` from the catalog cache, keyed by id."""
+    return catalog_cache.services().get_many(service_ids)
+
+
+def _normalize_items(items, services):
+    """Validate items against pre-loaded `services` ({id: catalog row}); return normalized dicts."""
+    normalized_items = []
+    for idx, item in enumerate(items):
+        service_id = int(item.get('service_id'))
+        service = services.get(service_id)
+        if not service:
+            raise BillValidationError(f'Service not found (id: {service_id})', 404)
+
+        quantity = int(item.get('quantity', 1))
+        if quantity < 1:
+            raise BillValidationError(f"Item {idx + 1}: quantity must be >= 1")
+
+        unit_price = item.get('unit_price')
+        unit_price = float(unit_price) if unit_price is not None and unit_price != '' else float(service['price'])
+        if unit_price < 0:
+            raise BillValidationError(f"Item {idx + 1}: unit_price must be >= 0")
+
+        normalized_items.append({
+            'service_id': service_id,
+            'quantity': quantity,
+            'unit_price': unit_price,
+        })
+    return normalized_items
+
+
+def _apply_item_changes(bill, normalized_items):
+    """Make `bill.items` match `normalized_items` with as few row writes as possible.
+
+    Lines are matched by position (stored lines in id order), so the stored
+    order stays the submitted one: a line equal to the one at its position is
+    left untouched, a different one is updated in place, and only the surplus
+    is inserted or deleted. Returns the number of rows written.
+    """
+    stored = sorted(bill.items, key=lambda item: item.id or 0)
+    writes = 0
+    for position, item in enumerate(normalized_items):
+        line_total = float(item['quantity']) * float(item['unit_price'])
+        if position < len(stored):
+            row = stored[position]
+            if (row.service_id, row.quantity, row.unit_price) == (item['service_id'], item['quantity'], item['unit_price']):
+                continue
+            row.service_id = item['service_id']
+            row.quantity = item['quantity']
+            row.unit_price = item['unit_price']
+            row.line_total = line_total
+        else:
+            bill.items.append(BillItem(
+                service_id=item['service_id'],
+                quantity=item['quantity'],
+                unit_price=item['unit_price'],
+                line_total=line_total,
+            ))
+        writes += 1
+
+    for row in stored[len(normalized_items):]:
+        bill.items.remove(row)
+        writes += 1
+    return writes
+
+
+def _bill_query():
+    """Bill query that eager-loads everything `Bill.to_dict()` touches.
+
+    Customers are joined in, items and their services are fetched with
+    SELECT ... IN, so a listing costs a fixed number of queries no matter
+    how many bills or lines it returns.
+    """
+    return Bill.query.options(
+        joinedload(Bill.customer),
+        selectinload(Bill.items).joinedload(BillItem.service),
+    )
+
+def _filter_bills(query, args):
+    """Apply the reports filters (start_date, end_date, is_paid / status, customer_id).
+
+    Works on both ORM queries and Core selects.
+    """
+    start_date = parse_date(args.get('start_date'), 'start_date')
+    end_date = parse_date(args.get('end_date'), 'end_date')
+    is_paid = parse_bool(args.get('is_paid'), 'is_paid')
+    customer_id = parse_int(args.get('customer_id'), 'customer_id')
+    # The reports page's status filter: all | paid | unpaid
+    status = args.get('status')
+    if is_paid is None and status and status != 'all':
+        is_paid = parse_bool(status, 'status')
+
+    if start_date:
+        query = query.filter(Bill.date >= start_date)
+    if end_date:
+        query = query.filter(Bill.date <= end_date)
+    if is_paid is not None:
+        query = query.filter(Bill.is_paid == is_paid)
+    if customer_id is not None:
+        query = query.filter(Bill.customer_id == customer_id)
+    return query
 
 # Get all bills (excluding soft deleted)
+# Optional: ?start_date=&end_date=&is_paid=&customer_id= filters and
+# ?limit=&cursor= keyset paging (newest first).
 @bill_bp.route('', methods=['GET'])
+@conditional(*BILL_TABLES)
 def get_bills():
     try:
-        bills = Bill.query.filter_by(is_deleted=False).all()
-        return jsonify({
+        query = _filter_bills(bill_select().where(Bill.is_deleted == False), request.args)
+        limit = parse_limit(request.args)
+        next_cursor = None
+        if limit is None:
+            rows = db.session.execute(query).all()
+        else:
+            rows, next_cursor = keyset_page(
+                query, [Bill.date, Bill.id], request.args.get('cursor'), limit, descending=True
+            )
+        return json_response({
             'success': True,
-            'data': [bill.to_dict() for bill in bills]
-        }), 200
+            'data': bill_dicts(rows),
+            'next_cursor': next_cursor
+        })
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_BILL_COLUMNS = (
+    'id', 'bill_number', 'date', 'customer_id', 'customer_name',
+    'total', 'is_paid', 'created_at', 'updated_at',
+)
+EXPORT_ITEM_COLUMNS = (
+    'bill_id', 'bill_number', 'date', 'customer_id', 'customer_name', 'is_paid',
+    'item_id', 'service_id', 'service_name', 'quantity', 'unit_price', 'line_total',
+)
+
+
+def _export_statement(args, rows='bill'):
+    """Core select for an export: one row per bill, or per line item with rows='item'."""
+    if rows == 'item':
+        stmt = (
+            select(
+                Bill.id, Bill.bill_number, Bill.date, Bill.customer_id, Customer.name, Bill.is_paid,
+                BillItem.id, BillItem.service_id, Service.name,
+                BillItem.quantity, BillItem.unit_price, BillItem.line_total,
+            )
+            .select_from(Bill)
+            .join(BillItem, BillItem.bill_id == Bill.id)
+            .outerjoin(Service, Service.id == BillItem.service_id)
+            .order_by(Bill.date, Bill.id, BillItem.id)
+        )
+    else:
+        stmt = (
+            select(
+                Bill.id, Bill.bill_number, Bill.date, Bill.customer_id, Customer.name,
+                Bill.total, Bill.is_paid, Bill.created_at, Bill.updated_at,
+            )
+            .select_from(Bill)
+            .order_by(Bill.date, Bill.id)
+        )
+    stmt = stmt.outerjoin(Customer, Customer.id == Bill.customer_id).where(Bill.is_deleted == False)
+    return _filter_bills(stmt, args)
+
+
+def _export_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_bill_export(args, fmt='csv', rows='bill', batch_size=EXPORT_BATCH_SIZE):
+    """Yield an export as text chunks, one chunk per `batch_size` rows.
+
+    Rows are pulled from the database in fixed-size batches (yield_per), so
+    memory stays flat however many invoices match.
+    """
+    columns = EXPORT_ITEM_COLUMNS if rows == 'item' else EXPORT_BILL_COLUMNS
+    stmt = _export_statement(args, rows).execution_options(yield_per=batch_size)
+    result = db.session.execute(stmt)
+
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in result.partitions():
+            writer.writerows([[_export_value(v) for v in row] for row in batch])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for batch in result.partitions():
+            yield ''.join(
+                json.dumps(dict(zip(columns, map(_export_value, row)))) + '\n' for row in batch
+            )
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _export_options(args):
+    """Validate an export request's format / rows / filters; return (format, rows)."""
+    fmt = args.get('format', 'csv')
+    rows = args.get('rows', 'bill')
+    if fmt not in EXPORT_FORMATS:
+        raise PaginationError('format must be csv or ndjson')
+    if rows not in ('bill', 'item'):
+        raise PaginationError('rows must be bill or item')
+    _filter_bills(select(Bill.id), args)
+    return fmt, rows
+
+
+def _export_filename(fmt, rows):
+    return f"bills-{rows}s-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+
+
+@jobs.handler('bill_export', validate=_export_options)
+def _export_job(job, params):
+    fmt, rows = _export_options(params)
+    counted = _export_statement(params, rows).order_by(None).subquery()
+    total = db.session.execute(select(func.count()).select_from(counted)).scalar()
+    job.progress(0, total)
+    done = 0
+    with open(job.result_file(_export_filename(fmt, rows)), 'w', encoding='utf-8', newline='') as fh:
+        for chunk in iter_bill_export(params, fmt, rows):
+            fh.write(chunk)
+            done = min(done + EXPORT_BATCH_SIZE, total)
+            job.progress(done)
+    job.progress(total)
+    return f'Exported {total} {rows} rows'
+
+# Stream bills (or line items with ?rows=item) as CSV / NDJSON.
+# Accepts the same filters as GET /api/bills. With ?async=1 the export runs as
+# a background job instead: answers 202 with the job (see GET /api/jobs/<id>).
+@bill_bp.route('/export', methods=['GET'])
+def export_bills():
+    try:
+        if parse_bool(request.args.get('async'), 'async'):
+            params = {key: value for key, value in request.args.items() if key != 'async'}
+            job = jobs.runner().submit('bill_export', params)
+            return jsonify({
+                'success': True,
+                'message': 'Export queued',
+                'data': job.to_dict()
+            }), 202
+
+        # Validate filters up front; errors inside the stream can't change the status.
+        fmt, rows = _export_options(request.args)
+
+        return Response(
+            stream_with_context(iter_bill_export(request.args, fmt, rows)),
+            mimetype=EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename={_export_filename(fmt, rows)}'}
+        )
+    except jobs.JobError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), e.status
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -66,9 +436,10 @@ def get_bills():
 
 # Get single bill
 @bill_bp.route('/<int:id>', methods=['GET'])
+@conditional(*BILL_TABLES)
 def get_bill(id):
     try:
-        bill = Bill.query.filter_by(id=id, is_deleted=False).first()
+        bill = _bill_query().filter_by(id=id, is_deleted=False).first()
         if not bill:
             return jsonify({
                 'success': False,
@@ -84,6 +455,243 @@ def get_bill(id):
             'message': str(e)
         }), 500
 
+def _invoice_data(bill):
+    """Everything the invoice template needs: the bill dict plus customer contact details."""
+    data = bill.to_dict()
+    customer = bill.customer
+    data['customer_email'] = customer.email if customer else None
+    data['customer_phone'] = customer.phone if customer else None
+    data['customer_address'] = customer.address if customer else None
+    return data
+
+
+def _pdf_cache_entry(bill_id):
+    """(bill_number, cache path) for a non-deleted bill, from one small query; None if missing."""
+    # Line items print their service's name, so a service edit must change the key too.
+    services_updated_at = (
+        select(func.max(Service.updated_at))
+        .join(BillItem, BillItem.service_id == Service.id)
+        .where(BillItem.bill_id == Bill.id)
+        .scalar_subquery()
+    )
+    row = db.session.execute(
+        select(Bill.bill_number, Bill.updated_at, Customer.updated_at, services_updated_at)
+        .select_from(Bill)
+        .outerjoin(Customer, Customer.id == Bill.customer_id)
+        .where(Bill.id == bill_id, Bill.is_deleted == False)
+    ).first()
+    if not row:
+        return None
+    key = invoice_pdf.cache_key(bill_id, row[1], row[2], row[3])
+    return row[0], invoice_pdf.cache_path(current_app.config['PDF_CACHE_DIR'], bill_id, key)
+
+
+# Download the invoice PDF; rendered once, then served from the disk cache
+@bill_bp.route('/<int:id>/pdf', methods=['GET'])
+def get_bill_pdf(id):
+    try:
+        entry = _pdf_cache_entry(id)
+        if not entry:
+            return jsonify({
+                'success': False,
+                'message': 'Bill not found'
+            }), 404
+
+        bill_number, path = entry
+        if not os.path.exists(path):
+            bill = _bill_query().filter_by(id=id, is_deleted=False).first()
+            invoice_pdf.write_cached(path, invoice_pdf.render_invoice(_invoice_data(bill)))
+
+        return send_file(
+            path,
+            mimetype='application/pdf',
+            as_attachment=request.args.get('download') == '1',
+            download_name=f'{bill_number}.pdf'
+        )
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+PDF_BATCH_CHUNK = 50
+
+
+def _iter_pdf_zip(bill_ids, cache_dir, workers):
+    """Yield a ZIP of invoice PDFs for `bill_ids`, streaming entries as they are rendered.
+
+    Cached PDFs are read from disk; the rest are rendered on the shared process
+    pool with at most `workers` entries in flight, so memory stays flat and
+    output starts before the last invoice is rendered. Renders still pending
+    when the generator is closed early (client gone, job cancelled) are
+    cancelled.
+    """
+    stream = invoice_pdf.ZipStream()
+    archive = zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED)
+    pool = invoice_pdf.render_pool(_pdf_pool_size()) if workers > 1 else None
+    window = collections.deque()
+
+    def flush(limit):
+        while len(window) > limit:
+            name, path, job = window.popleft()
+            if isinstance(job, bytes):
+                data = job
+            else:
+                data = job.result()
+                invoice_pdf.write_cached(path, data)
+            archive.writestr(name, data)
+
+    try:
+        for chunk in _chunked(bill_ids, PDF_BATCH_CHUNK):
+            bills = {b.id: b for b in _bill_query().filter(Bill.id.in_(chunk), Bill.is_deleted == False)}
+            for bill_id in chunk:
+                bill = bills.get(bill_id)
+                if bill is None:
+                    continue
+                services_updated_at = max(
+                    (item.service.updated_at for item in bill.items if item.service and item.service.updated_at),
+                    default=None,
+                )
+                key = invoice_pdf.cache_key(
+                    bill.id, bill.updated_at, bill.customer.updated_at if bill.customer else None, services_updated_at
+                )
+                path = invoice_pdf.cache_path(cache_dir, bill.id, key)
+                name = f"{bill.bill_number}.pdf"
+                if os.path.exists(path):
+                    with open(path, 'rb') as fh:
+                        window.append((name, path, fh.read()))
+                elif pool is None:
+                    data = invoice_pdf.render_invoice(_invoice_data(bill))
+                    invoice_pdf.write_cached(path, data)
+                    window.append((name, path, data))
+                else:
+                    window.append((name, path, pool.submit(invoice_pdf.render_invoice, _invoice_data(bill))))
+                flush(workers)
+            db.session.expunge_all()
+            yield stream.pop()
+
+        flush(0)
+        archive.close()
+        yield stream.pop()
+    finally:
+        for _, _, job in window:
+            if not isinstance(job, bytes):
+                job.cancel()
+
+
+def _pdf_batch_filters(data):
+    filters = data.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise PaginationError('filters must be an object')
+    return filters
+
+
+def _pdf_batch_params(data):
+    """Validate a PDF batch request (ids or filters, workers) before any work is done."""
+    if data.get('ids') is not None:
+        if not isinstance(data['ids'], list):
+            raise PaginationError('ids must be a list')
+        for bill_id in data['ids']:
+            if parse_int(bill_id, 'ids') is None:
+                raise PaginationError('ids must be integers')
+    else:
+        _filter_bills(select(Bill.id), _pdf_batch_filters(data))
+    parse_int(data.get('workers'), 'workers')
+
+
+def _pdf_batch_ids(data):
+    """Non-deleted bill ids a PDF batch request asks for, in output order."""
+    if data.get('ids') is not None:
+        wanted = [int(i) for i in data['ids']]
+        found = set()
+        for chunk in _chunked(wanted):
+            found.update(db.session.execute(
+                select(Bill.id).where(Bill.id.in_(chunk), Bill.is_deleted == False)
+            ).scalars())
+        return [i for i in dict.fromkeys(wanted) if i in found]
+    stmt = _filter_bills(select(Bill.id).where(Bill.is_deleted == False), _pdf_batch_filters(data))
+    return list(db.session.execute(stmt.order_by(Bill.date, Bill.id)).scalars())
+
+
+def _pdf_pool_size():
+    return current_app.config.get('PDF_WORKERS') or invoice_pdf.available_cores()
+
+
+def _pdf_batch_workers(data, count):
+    """How many invoices a batch keeps rendering at once; the shared pool's size is the most."""
+    pool_size = _pdf_pool_size()
+    return max(1, min(int(data.get('workers') or pool_size), pool_size, count))
+
+
+def _pdf_batch_filename():
+    return f"invoices-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
+
+
+@jobs.handler('pdf_batch', validate=_pdf_batch_params)
+def _pdf_batch_job(job, params):
+    bill_ids = _pdf_batch_ids(params)
+    if not bill_ids:
+        raise ValueError('No bills matched')
+    job.progress(0, len(bill_ids))
+    workers = _pdf_batch_workers(params, len(bill_ids))
+    chunks = _iter_pdf_zip(bill_ids, current_app.config['PDF_CACHE_DIR'], workers)
+    with open(job.result_file(_pdf_batch_filename()), 'wb') as fh:
+        for done, data in enumerate(chunks, 1):
+            fh.write(data)
+            job.progress(min(done * PDF_BATCH_CHUNK, len(bill_ids)))
+    return f'Rendered {len(bill_ids)} invoices'
+
+# Render many invoices into one ZIP.
+# Body: {"ids": [...]} or {"filters": {start_date, end_date, is_paid/status, customer_id}};
+# optional "workers": how many invoices to render at once (at most, and by default,
+# PDF_WORKERS / the number of available cores, the size of the shared render pool).
+# With "async": true the batch runs as a background job: answers 202 with the job.
+@bill_bp.route('/pdf-batch', methods=['POST'])
+def create_pdf_batch():
+    try:
+        data = request.get_json() or {}
+        if data.get('async'):
+            params = {key: value for key, value in data.items() if key != 'async'}
+            job = jobs.runner().submit('pdf_batch', params)
+            return jsonify({
+                'success': True,
+                'message': 'PDF batch queued',
+                'data': job.to_dict()
+            }), 202
+
+        _pdf_batch_params(data)
+        bill_ids = _pdf_batch_ids(data)
+        if not bill_ids:
+            return jsonify({
+                'success': False,
+                'message': 'No bills matched'
+            }), 404
+
+        workers = _pdf_batch_workers(data, len(bill_ids))
+        return Response(
+            stream_with_context(_iter_pdf_zip(bill_ids, current_app.config['PDF_CACHE_DIR'], workers)),
+            mimetype='application/zip',
+            headers={
+                'Content-Disposition': f'attachment; filename={_pdf_batch_filename()}',
+                'X-Bill-Count': str(len(bill_ids)),
+            }
+        )
+    except jobs.JobError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), e.status
+    except (PaginationError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
 # Create bill
 @bill_bp.route('', methods=['POST'])
 def create_bill():
@@ -97,145 +705,56 @@ def create_bill():
                 'message': 'Customer is required'
             }), 400
 
-        # Accept either new format: { items: [...] } or legacy single-service payload.
-        items = data.get('items')
-        if not items:
-            if data.get('service_id'):
-                items = [{
-                    'service_id': data.get('service_id'),
-                    'quantity': data.get('quantity', 1),
-                    'unit_price': data.get('unit_price')
-                }]
-            else:
-                return jsonify({
-                    'success': False,
-                    'message': 'At least one service item is required'
-                }), 400
-
-        if not isinstance(items, list) or len(items) == 0:
-            return jsonify({
-                'success': False,
-                'message': 'Items must be a non-empty list'
-            }), 400
+        items = _payload_items(data)
         
         # Verify customer exists
-        customer = Customer.query.filter_by(id=data['customer_id'], is_deleted=False).first()
-        if not customer:
+        if not _active_customer(data['customer_id']):
             return jsonify({
                 'success': False,
                 'message': 'Customer not found'
             }), 404
 
         # Validate + normalize items before opening a write transaction.
-        normalized_items = []
-        for idx, item in enumerate(items):
-            service_id = item.get('service_id')
-            if service_id is None or service_id == '':
-                return jsonify({
-                    'success': False,
-                    'message': f"Item {idx + 1}: service_id is required"
-                }), 400
-            service_id = int(service_id)
-
-            service = Service.query.filter_by(id=service_id, is_deleted=False).first()
-            if not service:
-                return jsonify({
-                    'success': False,
-                    'message': f'Service not found (id: {service_id})'
-                }), 404
-
-            quantity = int(item.get('quantity', 1))
-            if quantity < 1:
-                return jsonify({
-                    'success': False,
-                    'message': f"Item {idx + 1}: quantity must be >= 1"
-                }), 400
-
-            unit_price = item.get('unit_price')
-            unit_price = float(unit_price) if unit_price is not None and unit_price != '' else float(service.price)
-            if unit_price < 0:
-                return jsonify({
-                    'success': False,
-                    'message': f"Item {idx + 1}: unit_price must be >= 0"
-                }), 400
-
-            normalized_items.append({
-                'service_id': service.id,
-                'quantity': quantity,
-                'unit_price': unit_price,
-            })
+        services = _load_active_services(_item_service_ids(items))
+        normalized_items = _normalize_items(items, services)
         
         # Parse date
         bill_date = datetime.strptime(data.get('date', datetime.now().strftime('%Y-%m-%d')), '%Y-%m-%d').date()
 
-        # Create bill with sequential invoice number.
+        # Create bill with the next number from the per-year invoice sequence.
         # IMPORTANT: Don't mask other IntegrityErrors as "invoice number" errors.
-        year_int = _normalize_year(bill_date.year)
-        yy = year_int % 100
-        base_suffix = None
-        bill = None
-
-        for _ in range(50):
-            if base_suffix is None:
-                # Compute current max once; then increment locally on each retry.
-                prefixes_to_consider = [
-                    f"INV-{yy:02d}-",
-                    f"inv-{yy:02d}-",
-                    # Also consider any existing 4-digit-year invoices for continuity.
-                    f"INV-{year_int}-",
-                    f"inv-{year_int}-",
-                ]
-                base_suffix = 0
-                for prefix in prefixes_to_consider:
-                    base_suffix = max(base_suffix, _max_suffix_for_prefix(prefix))
-            else:
-                base_suffix += 1
-
-            invoice_number = f"INV-{yy:02d}-{(base_suffix + 1):04d}"
-
+        try:
+            suffix = _reserve_invoice_suffixes(bill_date.year)
             bill = Bill(
-                bill_number=invoice_number,
+                bill_number=_invoice_number(_normalize_year(bill_date.year), suffix),
                 customer_id=data['customer_id'],
                 date=bill_date,
                 is_paid=data.get('is_paid', False)
             )
+            db.session.add(bill)
+            db.session.flush()
 
-            try:
-                db.session.add(bill)
-                db.session.flush()
-
-                total = 0.0
-                for item in normalized_items:
-                    line_total = float(item['quantity']) * float(item['unit_price'])
-                    total += line_total
-
-                    db.session.add(BillItem(
-                        bill_id=bill.id,
-                        service_id=item['service_id'],
-                        quantity=item['quantity'],
-                        unit_price=item['unit_price'],
-                        line_total=line_total,
-                    ))
-
-                bill.total = total
-                db.session.commit()
-                break
-            except IntegrityError as e:
-                db.session.rollback()
-                message = str(getattr(e, 'orig', e))
-                # Only retry if it's the bill_number unique constraint.
-                if 'UNIQUE constraint failed' in message and 'bills.bill_number' in message:
-                    bill = None
-                    continue
-                return jsonify({
-                    'success': False,
-                    'message': message
-                }), 500
+            total = 0.0
+            for item in normalized_items:
+                line_total = float(item['quantity']) * float(item['unit_price'])
+                total += line_total
 
-        if bill is None:
+                db.session.add(BillItem(
+                    bill_id=bill.id,
+                    service_id=item['service_id'],
+                    quantity=item['quantity'],
+                    unit_price=item['unit_price'],
+                    line_total=line_total,
+                ))
+
+            bill.total = total
+            rollups.record_change(None, rollups.snapshot(bill))
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
             return jsonify({
                 'success': False,
-                'message': 'Failed to generate a unique invoice number'
+                'message': str(getattr(e, 'orig', e))
             }), 500
         
         return jsonify({
@@ -243,6 +762,159 @@ def create_bill():
             'message': 'Bill created successfully',
             'data': bill.to_dict()
         }), 201
+    except BillValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), e.status
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+MAX_BULK_BILLS = 5000
+
+
+# Create many bills in one transaction
+# Body: {"bills": [<create_bill payload>, ...]} (or a bare list). All or nothing:
+# if any bill is invalid none are created, and the 400 lists the invalid ones by index.
+@bill_bp.route('/bulk', methods=['POST'])
+def create_bills_bulk():
+    try:
+        data = request.get_json() or {}
+        payloads = data.get('bills') if isinstance(data, dict) else data
+        if not isinstance(payloads, list) or len(payloads) == 0:
+            return jsonify({
+                'success': False,
+                'message': 'bills must be a non-empty list'
+            }), 400
+        if len(payloads) > MAX_BULK_BILLS:
+            return jsonify({
+                'success': False,
+                'message': f'At most {MAX_BULK_BILLS} bills per request'
+            }), 400
+
+        results = [None] * len(payloads)
+
+        # Pass 1: shape checks, collecting every referenced id.
+        parsed = []
+        customer_ids, service_ids = set(), set()
+        for idx, payload in enumerate(payloads):
+            try:
+                if not isinstance(payload, dict):
+                    raise BillValidationError('Bill must be an object')
+                if not payload.get('customer_id'):
+                    raise BillValidationError('Customer is required')
+                customer_id = int(payload['customer_id'])
+                items = _payload_items(payload)
+                item_service_ids = _item_service_ids(items)
+                bill_date = datetime.strptime(
+                    payload.get('date', datetime.now().strftime('%Y-%m-%d')), '%Y-%m-%d'
+                ).date()
+            except (BillValidationError, TypeError, ValueError) as e:
+                results[idx] = {'index': idx, 'success': False, 'message': str(e)}
+                continue
+            customer_ids.add(customer_id)
+            service_ids.update(item_service_ids)
+            parsed.append((idx, payload, customer_id, items, bill_date))
+
+        # Pass 2: resolve all customers / services with a few IN queries.
+        customers = catalog_cache.customers().get_many(customer_ids)
+        services = _load_active_services(service_ids)
+
+        valid = []
+        for idx, payload, customer_id, items, bill_date in parsed:
+            try:
+                if customer_id not in customers:
+                    raise BillValidationError('Customer not found', 404)
+                normalized_items = _normalize_items(items, services)
+            except (BillValidationError, TypeError, ValueError) as e:
+                results[idx] = {'index': idx, 'success': False, 'message': str(e)}
+                continue
+            total = sum(float(i['quantity']) * float(i['unit_price']) for i in normalized_items)
+            valid.append((idx, payload, customer_id, bill_date, normalized_items, total))
+
+        if len(valid) < len(payloads):
+            errors = [result for result in results if result is not None]
+            return jsonify({
+                'success': False,
+                'message': f'{len(errors)} of {len(payloads)} bills are invalid; none were created',
+                'data': {
+                    'created': 0,
+                    'failed': len(errors),
+                    'results': errors
+                }
+            }), 400
+
+        # One contiguous block of invoice numbers per year, in submission order.
+        per_year = {}
+        for entry in valid:
+            per_year.setdefault(_normalize_year(entry[3].year), []).append(entry)
+
+        bill_rows = []
+        for year_int, entries in per_year.items():
+            first = _reserve_invoice_suffixes(year_int, len(entries))
+            for offset, (idx, payload, customer_id, bill_date, _, total) in enumerate(entries):
+                bill_rows.append({
+                    'bill_number': _invoice_number(year_int, first + offset),
+                    'customer_id': customer_id,
+                    'date': bill_date,
+                    'is_paid': bool(payload.get('is_paid', False)),
+                    'total': total,
+                    'is_deleted': False,
+                })
+        db.session.execute(insert(Bill), bill_rows)
+
+        ids_by_number = {}
+        for chunk in _chunked(row['bill_number'] for row in bill_rows):
+            ids_by_number.update(
+                db.session.execute(
+                    select(Bill.bill_number, Bill.id).where(Bill.bill_number.in_(chunk))
+                ).all()
+            )
+
+        item_rows = []
+        ordered = [entry for entries in per_year.values() for entry in entries]
+        for row, (idx, _, _, _, normalized_items, total) in zip(bill_rows, ordered):
+            bill_id = ids_by_number[row['bill_number']]
+            for item in normalized_items:
+                item_rows.append({
+                    'bill_id': bill_id,
+                    'service_id': item['service_id'],
+                    'quantity': item['quantity'],
+                    'unit_price': item['unit_price'],
+                    'line_total': float(item['quantity']) * float(item['unit_price']),
+                })
+            results[idx] = {
+                'index': idx,
+                'success': True,
+                'id': bill_id,
+                'bill_number': row['bill_number'],
+                'total': total,
+            }
+        db.session.execute(insert(BillItem), item_rows)
+        rollups.record_changes(
+            (None, (row['date'], row['customer_id'], row['is_paid'], row['total'])) for row in bill_rows
+        )
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': f'Created {len(valid)} bills',
+            'data': {
+                'created': len(valid),
+                'failed': 0,
+                'results': results
+            }
+        }), 201
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(getattr(e, 'orig', e))
+        }), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -254,7 +926,7 @@ def create_bill():
 @bill_bp.route('/<int:id>', methods=['PUT'])
 def update_bill(id):
     try:
-        bill = Bill.query.filter_by(id=id, is_deleted=False).first()
+        bill = _bill_query().filter_by(id=id, is_deleted=False).first()
         if not bill:
             return jsonify({
                 'success': False,
@@ -262,11 +934,11 @@ def update_bill(id):
             }), 404
         
         data = request.get_json() or {}
+        before = rollups.snapshot(bill)
         
         # Update customer if provided
         if data.get('customer_id'):
-            customer = Customer.query.filter_by(id=data['customer_id'], is_deleted=False).first()
-            if not customer:
+            if not _active_customer(data['customer_id']):
                 return jsonify({
                     'success': False,
                     'message': 'Customer not found'
@@ -295,59 +967,146 @@ def update_bill(id):
                     'message': 'Items must be a non-empty list'
                 }), 400
 
-            # Replace all items
-            bill.items.clear()
-            total = 0.0
-            for idx, item in enumerate(items):
-                service_id = item.get('service_id')
-                if service_id is None or service_id == '':
-                    return jsonify({
-                        'success': False,
-                        'message': f"Item {idx + 1}: service_id is required"
-                    }), 400
-
-                service_id = int(service_id)
-
-                service = Service.query.filter_by(id=service_id, is_deleted=False).first()
-                if not service:
-                    return jsonify({
-                        'success': False,
-                        'message': f'Service not found (id: {service_id})'
-                    }), 404
-
-                quantity = int(item.get('quantity', 1))
-                if quantity < 1:
-                    return jsonify({
-                        'success': False,
-                        'message': f"Item {idx + 1}: quantity must be >= 1"
-                    }), 400
-
-                unit_price = item.get('unit_price')
-                unit_price = float(unit_price) if unit_price is not None and unit_price != '' else float(service.price)
-                if unit_price < 0:
-                    return jsonify({
-                        'success': False,
-                        'message': f"Item {idx + 1}: unit_price must be >= 0"
-                    }), 400
-
-                line_total = float(quantity) * float(unit_price)
-                total += line_total
-                bill.items.append(BillItem(
-                    service_id=service.id,
-                    quantity=quantity,
-                    unit_price=unit_price,
-                    line_total=line_total,
-                ))
-
-            bill.total = total
+            services = _load_active_services(_item_service_ids(items))
+            normalized_items = _normalize_items(items, services)
+            if _apply_item_changes(bill, normalized_items):
+                # Item-only edits don't touch the bills row; bump it so the
+                # PDF cache key and sync clients see the change.
+                bill.updated_at = datetime.utcnow()
+            # Summed in submission order, like create_bill, so an unchanged
+            # bill gets a bit-identical total and no UPDATE.
+            bill.total = sum(float(item['quantity']) * float(item['unit_price']) for item in normalized_items)
         
+        rollups.record_change(before, rollups.snapshot(bill))
         db.session.commit()
+        invoice_pdf.invalidate(current_app.config['PDF_CACHE_DIR'], [bill.id])
+
+        # The commit expired everything; reload in a fixed number of queries.
+        bill = _bill_query().filter_by(id=id).first()
         
         return jsonify({
             'success': True,
             'message': 'Bill updated successfully',
             'data': bill.to_dict()
         }), 200
+    except BillValidationError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), e.status
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+def _bulk_update(data, values, *where):
+    """Set `values` (plus updated_at) on the non-deleted bills a bulk request targets.
+
+    `ids` are applied in IN chunks, `filters` (the listing filters) as one
+    statement; each is an UPDATE ... RETURNING, so no row is read first.
+    Returns the changed rows. Raises PaginationError for a bad selection.
+    """
+    stmt = (
+        update(Bill)
+        .where(Bill.is_deleted == False, *where)
+        .values(updated_at=datetime.utcnow(), **values)
+        .returning(Bill.id, Bill.date, Bill.customer_id, Bill.is_paid, Bill.total, Bill.is_deleted)
+        .execution_options(synchronize_session=False)
+    )
+    if data.get('ids') is not None:
+        if not isinstance(data['ids'], list) or not data['ids']:
+            raise PaginationError('ids must be a non-empty list')
+        ids = sorted({int(i) for i in data['ids']})
+        statements = [stmt.where(Bill.id.in_(chunk)) for chunk in _chunked(ids)]
+    else:
+        filters = data.get('filters')
+        if not isinstance(filters, dict) or not filters:
+            raise PaginationError('Provide ids or a non-empty filters object')
+        statements = [_filter_bills(stmt, filters)]
+
+    rows = []
+    for statement in statements:
+        rows.extend(db.session.execute(statement).all())
+    return rows
+
+
+# Mark many bills paid / unpaid in one transaction.
+# Body: {"is_paid": true|false, "ids": [...]} or {"is_paid": ..., "filters": {start_date, end_date,
+# is_paid/status, customer_id}}. Only bills whose status actually changes are written.
+@bill_bp.route('/bulk-status', methods=['PATCH'])
+def bulk_update_status():
+    try:
+        data = request.get_json() or {}
+        if not isinstance(data.get('is_paid'), bool):
+            raise PaginationError('is_paid must be true or false')
+        is_paid = data['is_paid']
+
+        # NULL counts as unpaid (as in the rollup), so it only changes when marking paid.
+        changing = or_(Bill.is_paid == False, Bill.is_paid.is_(None)) if is_paid else Bill.is_paid == True
+        rows = _bulk_update(data, {'is_paid': is_paid}, changing)
+
+        rollups.record_changes(
+            ((row.date, int(row.customer_id), not is_paid, float(row.total or 0)), rollups.snapshot(row))
+            for row in rows
+        )
+        db.session.commit()
+
+        ids = sorted(row.id for row in rows)
+        invoice_pdf.invalidate(current_app.config['PDF_CACHE_DIR'], ids)
+        return jsonify({
+            'success': True,
+            'message': f'{len(ids)} bill(s) marked as {"paid" if is_paid else "unpaid"}',
+            'data': {
+                'updated': len(ids),
+                'ids': ids
+            }
+        }), 200
+    except (PaginationError, TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Soft delete many bills in one transaction.
+# Body: {"ids": [...]} or {"filters": {...}} as for bulk-status.
+@bill_bp.route('/bulk', methods=['DELETE'])
+def bulk_delete_bills():
+    try:
+        data = request.get_json() or {}
+        rows = _bulk_update(data, {'is_deleted': True})
+
+        rollups.record_changes(
+            ((row.date, int(row.customer_id), bool(row.is_paid), float(row.total or 0)), None)
+            for row in rows
+        )
+        db.session.commit()
+
+        ids = sorted(row.id for row in rows)
+        invoice_pdf.invalidate(current_app.config['PDF_CACHE_DIR'], ids)
+        return jsonify({
+            'success': True,
+            'message': f'{len(ids)} bill(s) deleted',
+            'data': {
+                'deleted': len(ids),
+                'ids': ids
+            }
+        }), 200
+    except (PaginationError, TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -366,8 +1125,11 @@ def toggle_paid_status(id):
                 'message': 'Bill not found'
             }), 404
         
+        before = rollups.snapshot(bill)
         bill.is_paid = not bill.is_paid
+        rollups.record_change(before, rollups.snapshot(bill))
         db.session.commit()
+        invoice_pdf.invalidate(current_app.config['PDF_CACHE_DIR'], [bill.id])
         
         return jsonify({
             'success': True,
@@ -393,8 +1155,11 @@ def delete_bill(id):
             }), 404
         
         # Soft delete
+        before = rollups.snapshot(bill)
         bill.is_deleted = True
+        rollups.record_change(before, None)
         db.session.commit()
+        invoice_pdf.invalidate(current_app.config['PDF_CACHE_DIR'], [bill.id])
         
         return jsonify({
             'success': True,
@@ -1,25 +1,156 @@
 from flask import Blueprint, request, jsonify
 from models import db, Customer
+import catalog_cache
+import csv_import
+import jobs
+import search
+from api.pagination import PaginationError, keyset_page, parse_bool, parse_limit, prefix_pattern
+from api.etag import conditional
+from api.serializers import customer_dicts, customer_select, json_response
 
 customer_bp = Blueprint('customers', __name__)
 
+CUSTOMER_IMPORT_COLUMNS = ('name', 'email', 'phone', 'address')
+
+
+def _customer_import_row(record):
+    if not record['name'] or not record['email'] or not record['phone']:
+        raise ValueError('Name, email, and phone are required')
+    return record
+
+
+@jobs.handler('customer_import', validate=csv_import.validate_import_job, cleanup=csv_import.remove_spooled_upload)
+def _import_job(job, params):
+    try:
+        return csv_import.run_import_job(
+            job, params, Customer, CUSTOMER_IMPORT_COLUMNS, ('name', 'email', 'phone'), _customer_import_row, 'customers'
+        )
+    finally:
+        catalog_cache.customers().invalidate(())
+
 # Get all customers (excluding soft deleted)
+# Optional: ?name= prefix filter and ?limit=&cursor= keyset paging (by name).
 @customer_bp.route('', methods=['GET'])
+@conditional('customers')
 def get_customers():
     try:
-        customers = Customer.query.filter_by(is_deleted=False).all()
+        query = customer_select().where(Customer.is_deleted == False)
+        name = request.args.get('name')
+        if name:
+            query = query.where(Customer.name.like(prefix_pattern(name), escape='\\'))
+
+        limit = parse_limit(request.args)
+        next_cursor = None
+        if limit is None and not name:
+            # The unfiltered list is what the Bills page loads; serve it from memory.
+            return json_response({
+                'success': True,
+                'data': catalog_cache.customers().all(),
+                'next_cursor': None
+            })
+        if limit is None:
+            rows = db.session.execute(query).all()
+        else:
+            rows, next_cursor = keyset_page(
+                query, [Customer.name, Customer.id], request.args.get('cursor'), limit
+            )
+        return json_response({
+            'success': True,
+            'data': customer_dicts(rows),
+            'next_cursor': next_cursor
+        })
+    except PaginationError as e:
         return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Full-text search over name, email, phone and address, best match first.
+# ?q= words are matched as prefixes (all must match); optional ?limit= (default 20).
+@customer_bp.route('/search', methods=['GET'])
+@conditional('customers')
+def search_customers():
+    try:
+        limit = parse_limit(request.args) or search.DEFAULT_LIMIT
+        query = search.search(customer_select().where(Customer.is_deleted == False), Customer, request.args.get('q'), limit)
+        rows = db.session.execute(query).all()
+        return json_response({
             'success': True,
-            'data': [customer.to_dict() for customer in customers]
-        }), 200
+            'data': customer_dicts(rows)
+        })
+    except (PaginationError, search.SearchError) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': str(e)
         }), 500
 
+# Import customers from CSV with a header row: name, email, phone[, address].
+# Send the file as a text/csv request body (parsed as it streams in) or as a
+# multipart field named "file". Valid rows are inserted in batches; invalid ones
+# are skipped and listed in `errors` by line number.
+# With ?async=1 the file is saved and imported by a background job instead:
+# answers 202 with the job, whose result is this summary as JSON.
+@customer_bp.route('/import', methods=['POST'])
+def import_customers():
+    try:
+        if parse_bool(request.args.get('async'), 'async'):
+            job = csv_import.submit_import_job(request, 'customer_import')
+            return jsonify({
+                'success': True,
+                'message': 'Import queued',
+                'data': job.to_dict()
+            }), 202
+
+        summary = csv_import.import_csv(
+            csv_import.upload_stream(request), Customer, CUSTOMER_IMPORT_COLUMNS, ('name', 'email', 'phone'),
+            _customer_import_row
+        )
+        imported = summary['imported']
+        return jsonify({
+            'success': imported > 0,
+            'message': f"Imported {imported} of {summary['rows']} customers",
+            'data': summary
+        }), 201 if imported else 400
+    except jobs.JobError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), e.status
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except csv_import.CsvImportError as e:
+        # `data` holds the rows imported and rejected before a mid-file error.
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': e.summary
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+    finally:
+        # Batches may have been committed even if a later one failed.
+        catalog_cache.customers().invalidate(())
+
 # Get single customer
 @customer_bp.route('/<int:id>', methods=['GET'])
+@conditional('customers')
 def get_customer(id):
     try:
         customer = Customer.query.filter_by(id=id, is_deleted=False).first()
@@ -59,6 +190,7 @@ def create_customer():
         
         db.session.add(customer)
         db.session.commit()
+        catalog_cache.customers().invalidate([customer.id])
         
         return jsonify({
             'success': True,
@@ -91,6 +223,7 @@ def update_customer(id):
         customer.address = data.get('address', customer.address)
         
         db.session.commit()
+        catalog_cache.customers().invalidate([id])
         
         return jsonify({
             'success': True,
@@ -118,6 +251,7 @@ def delete_customer(id):
         # Soft delete
         customer.is_deleted = True
         db.session.commit()
+        catalog_cache.customers().invalidate([id])
         
         return jsonify({
             'success': True,
@@ -0,0 +1,51 @@
+import hashlib
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import select
+
+from models import db, TableVersion
+
+
+def table_versions(tables):
+    """Current change counters for `tables`, read with a single PK lookup."""
+    rows = dict(db.session.execute(
+        select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+    ).all())
+    return [rows.get(name, 0) for name in tables]
+
+
+def conditional(*tables):
+    """Answer GETs with a strong ETag derived from the change counters of `tables`.
+
+    The tag covers the full request path and query string, so every page /
+    filter combination gets its own tag. A matching If-None-Match is answered
+    with 304 before the view runs, so nothing is queried or serialized.
+    Place below the route decorator; `tables` must list every table the
+    response is built from.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = table_versions(tables)
+            key = f"{request.full_path}|{'.'.join(map(str, versions))}"
+            etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+            # gzip-encoded bodies get their own tag (strong ETags are per encoding).
+            for candidate in (etag, f"{etag}-gzip"):
+                if candidate in request.if_none_match:
+                    response = make_response('', 304)
+                    response.set_etag(candidate)
+                    response.headers['Cache-Control'] = 'no-cache'
+                    return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    etag = f"{etag}-gzip"
+                response.set_etag(etag)
+                # Let the browser cache the body but revalidate every time.
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,196 @@
+import os
+
+from flask import Blueprint, request, jsonify, send_file
+from models import db, Job
+import jobs
+from api.pagination import DEFAULT_PAGE_SIZE, PaginationError, parse_limit
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def _database_size(conn):
+    page_count = conn.exec_driver_sql('PRAGMA page_count').scalar()
+    return page_count * conn.exec_driver_sql('PRAGMA page_size').scalar()
+
+
+@jobs.handler('vacuum')
+def _vacuum_job(job, params):
+    """Rebuild the database file, refresh the planner statistics and truncate the WAL."""
+    with db.engine.connect() as conn:
+        # VACUUM can't run inside a transaction.
+        conn.execution_options(isolation_level='AUTOCOMMIT')
+        before = _database_size(conn)
+        steps = ('VACUUM', 'ANALYZE', 'PRAGMA wal_checkpoint(TRUNCATE)')
+        for done, statement in enumerate(steps):
+            job.progress(done, len(steps), statement)
+            conn.exec_driver_sql(statement)
+        job.progress(len(steps), message='Done')
+        after = _database_size(conn)
+    return f'Database compacted from {before / 1e6:.1f} MB to {after / 1e6:.1f} MB'
+
+
+# List jobs, newest first. Optional: ?status= and ?limit= (default 50).
+@jobs_bp.route('', methods=['GET'])
+def get_jobs():
+    try:
+        limit = parse_limit(request.args) or DEFAULT_PAGE_SIZE
+        query = Job.query.order_by(Job.id.desc())
+        status = request.args.get('status')
+        if status:
+            query = query.filter(Job.status == status)
+        runner = jobs.runner()
+        return jsonify({
+            'success': True,
+            'data': [runner.describe(job) for job in query.limit(limit)],
+            'types': jobs.kinds()
+        }), 200
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Submit a job: {"type": "bill_export" | "pdf_batch" | "rollup_rebuild" | "vacuum", "params": {...}}.
+# `params` are those of the matching synchronous endpoint. Answers 202 with the
+# queued job; poll GET /api/jobs/<id> and download its result when it succeeds.
+# CSV imports need the file, so they are queued with POST /api/<catalog>/import?async=1.
+@jobs_bp.route('', methods=['POST'])
+def create_job():
+    try:
+        data = request.get_json() or {}
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            raise PaginationError('params must be an object')
+        job = jobs.runner().submit(data.get('type'), params)
+        return jsonify({
+            'success': True,
+            'message': 'Job queued',
+            'data': job.to_dict()
+        }), 202
+    except jobs.JobError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), e.status
+    except (PaginationError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Get a job's status and progress
+@jobs_bp.route('/<int:id>', methods=['GET'])
+def get_job(id):
+    try:
+        job = db.session.get(Job, id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+        return jsonify({
+            'success': True,
+            'data': jobs.runner().describe(job)
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Cancel a queued or running job
+@jobs_bp.route('/<int:id>/cancel', methods=['POST'])
+def cancel_job(id):
+    try:
+        job = db.session.get(Job, id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+        if job.status not in jobs.ACTIVE_STATUSES:
+            return jsonify({
+                'success': False,
+                'message': f'Job already {job.status}'
+            }), 409
+        runner = jobs.runner()
+        runner.cancel(job)
+        return jsonify({
+            'success': True,
+            'message': 'Job cancelled' if job.status == jobs.CANCELLED else 'Job cancelling',
+            'data': runner.describe(job)
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Download the file a finished job produced
+@jobs_bp.route('/<int:id>/result', methods=['GET'])
+def get_job_result(id):
+    try:
+        job = db.session.get(Job, id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+        if job.status != jobs.SUCCEEDED or not job.result_path:
+            return jsonify({
+                'success': False,
+                'message': 'Job has no result' if job.status == jobs.SUCCEEDED else f'Job is {job.status}'
+            }), 409 if job.status in jobs.ACTIVE_STATUSES else 404
+        if not os.path.exists(job.result_path):
+            return jsonify({
+                'success': False,
+                'message': 'Result file no longer exists'
+            }), 410
+        return send_file(job.result_path, as_attachment=True, download_name=job.result_name)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Delete a finished job and its result file
+@jobs_bp.route('/<int:id>', methods=['DELETE'])
+def delete_job(id):
+    try:
+        job = db.session.get(Job, id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+        if job.status in jobs.ACTIVE_STATUSES:
+            return jsonify({
+                'success': False,
+                'message': 'Cancel the job before deleting it'
+            }), 409
+        if job.result_path and os.path.exists(job.result_path):
+            os.remove(job.result_path)
+        db.session.delete(job)
+        db.session.commit()
+        return jsonify({
+            'success': True,
+            'message': 'Job deleted'
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
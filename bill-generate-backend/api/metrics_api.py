@@ -0,0 +1,46 @@
+from flask import Blueprint, current_app, jsonify
+import catalog_cache
+import instrumentation
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# Per-route latency, query-count and DB-time histograms since startup (or the last reset).
+# Each histogram's `counts` line up with `buckets` (upper bounds) plus one overflow slot.
+# `caches` has the customer / service catalog cache hit counters.
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'enabled': bool(current_app.config.get('METRICS_ENABLED')),
+                'buckets': {
+                    'latency_ms': instrumentation.LATENCY_BUCKETS_MS,
+                    'db_ms': instrumentation.LATENCY_BUCKETS_MS,
+                    'queries': instrumentation.QUERY_BUCKETS
+                },
+                'routes': instrumentation.metrics.snapshot(),
+                'caches': catalog_cache.stats()
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Clear the histograms and cache counters
+@metrics_bp.route('', methods=['DELETE'])
+def reset_metrics():
+    try:
+        instrumentation.metrics.reset()
+        catalog_cache.reset_stats()
+        return jsonify({
+            'success': True,
+            'message': 'Metrics reset'
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
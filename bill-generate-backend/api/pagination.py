@@ -0,0 +1,125 @@
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Select, and_, or_
+
+from models import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """Raised for malformed paging / filter query parameters."""
+
+
+def parse_limit(args, maximum=MAX_PAGE_SIZE):
+    """Return the requested page size (at most `maximum`), or None when the client did not ask for paging."""
+    if 'limit' not in args and 'cursor' not in args:
+        return None
+    raw = args.get('limit', DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be >= 1')
+    return min(limit, maximum)
+
+
+def parse_bool(value, name):
+    if value is None or value == '':
+        return None
+    lowered = str(value).strip().lower()
+    if lowered in ('1', 'true', 'yes', 'paid'):
+        return True
+    if lowered in ('0', 'false', 'no', 'unpaid'):
+        return False
+    raise PaginationError(f'{name} must be true or false')
+
+
+def parse_date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise PaginationError(f'{name} must be in YYYY-MM-DD format')
+
+
+def parse_int(value, name):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise PaginationError(f'{name} must be an integer')
+
+
+def prefix_pattern(prefix):
+    """LIKE pattern matching values that start with `prefix` (escape char is '\\')."""
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'{escaped}%'
+
+
+def _to_json(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_to_json(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_from_json(col, v) for col, v in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise PaginationError('Invalid cursor')
+
+
+def keyset_page(query, columns, cursor, limit, descending=False):
+    """Apply keyset ordering/seek to `query` and fetch one page.
+
+    `columns` is the sort key, most significant first; the last column must be
+    unique (normally the primary key) so the ordering is total. `query` may be
+    an ORM query or a Core select whose labels match the sort columns' keys.
+    Returns `(rows, next_cursor)`; `next_cursor` is None on the last page.
+    """
+    order = [col.desc() if descending else col.asc() for col in columns]
+    query = query.order_by(*order)
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), expanded for any width.
+        clauses = []
+        for i, col in enumerate(columns):
+            cmp = col < values[i] if descending else col > values[i]
+            clauses.append(and_(*[columns[j] == values[j] for j in range(i)], cmp))
+        query = query.filter(or_(*clauses))
+
+    query = query.limit(limit + 1)
+    rows = db.session.execute(query).all() if isinstance(query, Select) else query.all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, col.key) for col in columns])
@@ -0,0 +1,150 @@
+from flask import Blueprint, request, jsonify
+from models import db, Bill, BillItem, Customer, RevenueDaily, Service
+import jobs
+import rollups
+from sqlalchemy import case, func, select
+from api.pagination import PaginationError, parse_date
+from api.etag import conditional
+
+report_bp = Blueprint('reports', __name__)
+
+GROUP_BY_OPTIONS = ('day', 'month', 'customer', 'service')
+
+
+@jobs.handler('rollup_rebuild')
+def _rollup_rebuild_job(job, params):
+    """Recompute revenue_daily from the bills table (like rebuild_rollup.py), then verify it."""
+    job.progress(0, 2, 'Rebuilding')
+    with db.engine.begin() as conn:
+        rollups.rebuild_rollup(conn)
+    job.progress(1, message='Verifying')
+    problems = rollups.verify_rollup(db.session)
+    if problems:
+        raise ValueError(f'{len(problems)} rollup mismatches after the rebuild, e.g. {problems[0]}')
+    job.progress(2, message='Done')
+    return 'Rollup matches the bills table'
+
+
+def _date_range(query, args, date_column):
+    start_date = parse_date(args.get('start_date'), 'start_date')
+    end_date = parse_date(args.get('end_date'), 'end_date')
+    if start_date:
+        query = query.where(date_column >= start_date)
+    if end_date:
+        query = query.where(date_column <= end_date)
+    return query
+
+
+def _rollup_split():
+    """Paid / unpaid sums and bill counts over the daily revenue rollup."""
+    paid = RevenueDaily.is_paid == True
+    return (
+        func.coalesce(func.sum(case((paid, RevenueDaily.total), else_=0)), 0).label('paid_total'),
+        func.coalesce(func.sum(case((paid, 0), else_=RevenueDaily.total)), 0).label('unpaid_total'),
+        func.coalesce(func.sum(case((paid, RevenueDaily.bill_count), else_=0)), 0).label('paid_count'),
+        func.coalesce(func.sum(case((paid, 0), else_=RevenueDaily.bill_count)), 0).label('unpaid_count'),
+    )
+
+
+def _item_split():
+    """Paid / unpaid line totals and distinct bill counts over bill items."""
+    paid = Bill.is_paid == True
+    return (
+        func.coalesce(func.sum(case((paid, BillItem.line_total), else_=0)), 0).label('paid_total'),
+        func.coalesce(func.sum(case((paid, 0), else_=BillItem.line_total)), 0).label('unpaid_total'),
+        func.count(func.distinct(case((paid, Bill.id)))).label('paid_count'),
+        func.count(func.distinct(case((paid, None), else_=Bill.id))).label('unpaid_count'),
+    )
+
+
+def _group_row(key, label, row):
+    return {
+        'key': key,
+        'label': label,
+        'paid_total': round(float(row.paid_total), 2),
+        'unpaid_total': round(float(row.unpaid_total), 2),
+        'total': round(float(row.paid_total) + float(row.unpaid_total), 2),
+        'paid_count': row.paid_count,
+        'unpaid_count': row.unpaid_count,
+        'bill_count': row.paid_count + row.unpaid_count,
+    }
+
+
+def _grouped(group_by, args):
+    """Run the aggregate for one grouping; returns a list of group dicts."""
+    if group_by == 'service':
+        # Line-item level, so this one has to read bill_items.
+        stmt = (
+            select(BillItem.service_id, Service.name, *_item_split(),
+                   func.sum(BillItem.quantity).label('quantity'))
+            .select_from(BillItem)
+            .join(Bill, Bill.id == BillItem.bill_id)
+            .outerjoin(Service, Service.id == BillItem.service_id)
+            .where(Bill.is_deleted == False)
+            .group_by(BillItem.service_id, Service.name)
+            .order_by(BillItem.service_id)
+        )
+        groups = []
+        for row in db.session.execute(_date_range(stmt, args, Bill.date)):
+            group = _group_row(row.service_id, row.name, row)
+            group['quantity'] = row.quantity
+            groups.append(group)
+        return groups
+
+    if group_by == 'customer':
+        stmt = (
+            select(RevenueDaily.customer_id, Customer.name, *_rollup_split())
+            .select_from(RevenueDaily)
+            .outerjoin(Customer, Customer.id == RevenueDaily.customer_id)
+            .group_by(RevenueDaily.customer_id, Customer.name)
+            .order_by(RevenueDaily.customer_id)
+        )
+        return [_group_row(row.customer_id, row.name, row)
+                for row in db.session.execute(_date_range(stmt, args, RevenueDaily.date))]
+
+    period = RevenueDaily.date if group_by == 'day' else func.strftime('%Y-%m', RevenueDaily.date)
+    stmt = (
+        select(period.label('period'), *_rollup_split())
+        .group_by(period)
+        .order_by(period)
+    )
+    groups = []
+    for row in db.session.execute(_date_range(stmt, args, RevenueDaily.date)):
+        key = row.period.isoformat() if hasattr(row.period, 'isoformat') else row.period
+        groups.append(_group_row(key, key, row))
+    return groups
+
+
+# Revenue summary computed in SQL. Totals and day / month / customer groups
+# come from the revenue_daily rollup; service groups aggregate bill items.
+# Query params: start_date, end_date (YYYY-MM-DD), group_by=day|month|customer|service
+@report_bp.route('/summary', methods=['GET'])
+@conditional('bills', 'bill_items', 'customers', 'services')
+def get_summary():
+    try:
+        group_by = request.args.get('group_by')
+        if group_by and group_by not in GROUP_BY_OPTIONS:
+            raise PaginationError(f"group_by must be one of: {', '.join(GROUP_BY_OPTIONS)}")
+
+        totals_stmt = _date_range(select(*_rollup_split()), request.args, RevenueDaily.date)
+        totals = _group_row(None, None, db.session.execute(totals_stmt).one())
+        del totals['key'], totals['label']
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'totals': totals,
+                'group_by': group_by,
+                'groups': _grouped(group_by, request.args) if group_by else []
+            }
+        }), 200
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
@@ -1,25 +1,167 @@
+import math
+
 from flask import Blueprint, request, jsonify
 from models import db, Service
+import catalog_cache
+import csv_import
+import jobs
+import search
+from api.pagination import PaginationError, keyset_page, parse_bool, parse_limit, prefix_pattern
+from api.etag import conditional
+from api.serializers import service_dicts, service_select, json_response
 
 service_bp = Blueprint('services', __name__)
 
+SERVICE_IMPORT_COLUMNS = ('name', 'description', 'price')
+
+
+def _service_import_row(record):
+    if not record['name'] or not record['price']:
+        raise ValueError('Name and price are required')
+    try:
+        # Price lists often use thousands separators ("1,500.00").
+        price = float(record['price'].replace(',', ''))
+    except ValueError:
+        price = None
+    # float() also parses "nan" and "inf", which SQLite / JSON can't hold.
+    if price is None or not math.isfinite(price):
+        raise ValueError(f"price must be a number (got '{record['price']}')")
+    record['price'] = price
+    return record
+
+
+@jobs.handler('service_import', validate=csv_import.validate_import_job, cleanup=csv_import.remove_spooled_upload)
+def _import_job(job, params):
+    try:
+        return csv_import.run_import_job(
+            job, params, Service, SERVICE_IMPORT_COLUMNS, ('name', 'price'), _service_import_row, 'services'
+        )
+    finally:
+        catalog_cache.services().invalidate(())
+
 # Get all services (excluding soft deleted)
+# Optional: ?name= prefix filter and ?limit=&cursor= keyset paging (by name).
 @service_bp.route('', methods=['GET'])
+@conditional('services')
 def get_services():
     try:
-        services = Service.query.filter_by(is_deleted=False).all()
+        query = service_select().where(Service.is_deleted == False)
+        name = request.args.get('name')
+        if name:
+            query = query.where(Service.name.like(prefix_pattern(name), escape='\\'))
+
+        limit = parse_limit(request.args)
+        next_cursor = None
+        if limit is None and not name:
+            # The unfiltered list is what the Bills page loads; serve it from memory.
+            return json_response({
+                'success': True,
+                'data': catalog_cache.services().all(),
+                'next_cursor': None
+            })
+        if limit is None:
+            rows = db.session.execute(query).all()
+        else:
+            rows, next_cursor = keyset_page(
+                query, [Service.name, Service.id], request.args.get('cursor'), limit
+            )
+        return json_response({
+            'success': True,
+            'data': service_dicts(rows),
+            'next_cursor': next_cursor
+        })
+    except PaginationError as e:
         return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Full-text search over name and description, best match first.
+# ?q= words are matched as prefixes (all must match); optional ?limit= (default 20).
+@service_bp.route('/search', methods=['GET'])
+@conditional('services')
+def search_services():
+    try:
+        limit = parse_limit(request.args) or search.DEFAULT_LIMIT
+        query = search.search(service_select().where(Service.is_deleted == False), Service, request.args.get('q'), limit)
+        rows = db.session.execute(query).all()
+        return json_response({
             'success': True,
-            'data': [service.to_dict() for service in services]
-        }), 200
+            'data': service_dicts(rows)
+        })
+    except (PaginationError, search.SearchError) as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+# Import services from CSV with a header row: name, price[, description].
+# Send the file as a text/csv request body (parsed as it streams in) or as a
+# multipart field named "file". Valid rows are inserted in batches; invalid ones
+# are skipped and listed in `errors` by line number.
+# With ?async=1 the file is saved and imported by a background job instead:
+# answers 202 with the job, whose result is this summary as JSON.
+@service_bp.route('/import', methods=['POST'])
+def import_services():
+    try:
+        if parse_bool(request.args.get('async'), 'async'):
+            job = csv_import.submit_import_job(request, 'service_import')
+            return jsonify({
+                'success': True,
+                'message': 'Import queued',
+                'data': job.to_dict()
+            }), 202
+
+        summary = csv_import.import_csv(
+            csv_import.upload_stream(request), Service, SERVICE_IMPORT_COLUMNS, ('name', 'price'),
+            _service_import_row
+        )
+        imported = summary['imported']
+        return jsonify({
+            'success': imported > 0,
+            'message': f"Imported {imported} of {summary['rows']} services",
+            'data': summary
+        }), 201 if imported else 400
+    except jobs.JobError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), e.status
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except csv_import.CsvImportError as e:
+        # `data` holds the rows imported and rejected before a mid-file error.
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': e.summary
+        }), 400
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'message': str(e)
         }), 500
+    finally:
+        # Batches may have been committed even if a later one failed.
+        catalog_cache.services().invalidate(())
 
 # Get single service
 @service_bp.route('/<int:id>', methods=['GET'])
+@conditional('services')
 def get_service(id):
     try:
         service = Service.query.filter_by(id=id, is_deleted=False).first()
@@ -58,6 +200,7 @@ def create_service():
         
         db.session.add(service)
         db.session.commit()
+        catalog_cache.services().invalidate([service.id])
         
         return jsonify({
             'success': True,
@@ -90,6 +233,7 @@ def update_service(id):
             service.price = float(data['price'])
         
         db.session.commit()
+        catalog_cache.services().invalidate([id])
         
         return jsonify({
             'success': True,
@@ -117,6 +261,7 @@ def delete_service(id):
         # Soft delete
         service.is_deleted = True
         db.session.commit()
+        catalog_cache.services().invalidate([id])
         
         return jsonify({
             'success': True,
@@ -0,0 +1,91 @@
+from flask import Blueprint, request, jsonify
+from models import db, Bill, BillItem, ChangeLog, Customer, Service
+from sqlalchemy import select
+from api.pagination import MAX_PAGE_SIZE, PaginationError, parse_int, parse_limit
+from api.serializers import (
+    BILL_FIELDS, BILL_ITEM_FIELDS, CUSTOMER_FIELDS, SERVICE_FIELDS, json_response, rows_to_dicts,
+)
+
+sync_bp = Blueprint('sync', __name__)
+
+# Changes returned per call; clients keep pulling while `has_more` is true.
+DEFAULT_SYNC_LIMIT = 1000
+MAX_SYNC_LIMIT = MAX_PAGE_SIZE * 10
+
+# table -> (fields, model, select_from). Rows are returned whatever their
+# is_deleted flag, so clients see soft deletes.
+SYNC_SOURCES = {
+    'customers': (CUSTOMER_FIELDS + (('is_deleted', Customer.is_deleted),), Customer, Customer),
+    'services': (SERVICE_FIELDS + (('is_deleted', Service.is_deleted),), Service, Service),
+    'bills': (
+        BILL_FIELDS + (('is_deleted', Bill.is_deleted),), Bill,
+        Bill.__table__.outerjoin(Customer.__table__, Customer.id == Bill.customer_id),
+    ),
+    'bill_items': (
+        BILL_ITEM_FIELDS, BillItem,
+        BillItem.__table__.outerjoin(Service.__table__, Service.id == BillItem.service_id),
+    ),
+}
+
+
+def _load_rows(table, ids, chunk_size=500):
+    fields, model, source = SYNC_SOURCES[table]
+    rows = []
+    for i in range(0, len(ids), chunk_size):
+        stmt = (
+            select(*[expr.label(key) for key, expr in fields])
+            .select_from(source)
+            .where(model.id.in_(ids[i:i + chunk_size]))
+            .order_by(model.id)
+        )
+        rows.extend(db.session.execute(stmt).all())
+    return rows_to_dicts(fields, rows)
+
+
+# Delta sync: rows created, updated or deleted since a cursor.
+# ?since=<cursor from the previous call> (omit for a full initial download),
+# ?limit= changes per call. Returns changed rows per table (including
+# soft-deleted ones), ids of hard-deleted rows, the next cursor and has_more.
+@sync_bp.route('', methods=['GET'])
+def get_changes():
+    try:
+        since = parse_int(request.args.get('since'), 'since') or 0
+        if since < 0:
+            raise PaginationError('since must be >= 0')
+        limit = parse_limit(request.args, MAX_SYNC_LIMIT) or DEFAULT_SYNC_LIMIT
+
+        # Writers are serialized by SQLite and seq only grows, so a committed
+        # entry can never appear behind a cursor a client has already seen.
+        entries = db.session.execute(
+            select(ChangeLog.seq, ChangeLog.table_name, ChangeLog.row_id, ChangeLog.deleted)
+            .where(ChangeLog.seq > since)
+            .order_by(ChangeLog.seq)
+            .limit(limit + 1)
+        ).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        changed = {table: [] for table in SYNC_SOURCES}
+        deleted = {table: [] for table in SYNC_SOURCES}
+        for entry in entries:
+            if entry.table_name in SYNC_SOURCES:
+                (deleted if entry.deleted else changed)[entry.table_name].append(entry.row_id)
+
+        cursor = entries[-1].seq if entries else since
+        return json_response({
+            'success': True,
+            'data': {table: _load_rows(table, ids) for table, ids in changed.items()},
+            'deleted': deleted,
+            'cursor': str(cursor),
+            'has_more': has_more
+        })
+    except PaginationError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
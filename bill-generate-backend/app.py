@@ -1,10 +1,41 @@
+import time
+
+_PROCESS_START = time.perf_counter()
+
 from flask import Flask
 from flask_cors import CORS
 from config import Config
 from models import db
+from migrations import ensure_schema
+from database import apply_sqlite_profile
+import catalog_cache
+import instrumentation
+import jobs
+import query_debug
 import sys
 
-def create_app():
+
+class StartupTimer:
+    """Wall-clock time per startup phase, printed with --startup-timing."""
+
+    def __init__(self, start=None):
+        self.phases = []
+        self._last = start if start is not None else time.perf_counter()
+        self._start = self._last
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self):
+        lines = [f"{phase:<12}{seconds * 1000:>9.1f} ms" for phase, seconds in self.phases]
+        lines.append(f"{'total':<12}{(self._last - self._start) * 1000:>9.1f} ms")
+        return '\n'.join(lines)
+
+
+def create_app(timer=None):
+    timer = timer or StartupTimer()
     app = Flask(__name__)
     app.config.from_object(Config)
     
@@ -13,24 +44,100 @@ def create_app():
     
     # Initialize database
     db.init_app(app)
+    catalog_cache.init_app(app)
     
+    timer.mark('flask')
+
     # Register blueprints
     from api.customer_api import customer_bp
     from api.service_api import service_bp
     from api.bill_api import bill_bp
+    from api.report_api import report_bp
+    from api.sync_api import sync_bp
+    from api.metrics_api import metrics_bp
+    from api.jobs_api import jobs_bp
     
     app.register_blueprint(customer_bp, url_prefix='/api/customers')
     app.register_blueprint(service_bp, url_prefix='/api/services')
     app.register_blueprint(bill_bp, url_prefix='/api/bills')
+    app.register_blueprint(report_bp, url_prefix='/api/reports')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    timer.mark('blueprints')
     
-    # Create database tables
+    # Tune SQLite connections, then create tables and run migrations unless
+    # the stored schema version says the database is already up to date.
+    # Jobs a previous run left unfinished are marked failed.
     with app.app_context():
-        db.create_all()
+        apply_sqlite_profile(db.engine, app.config['SQLITE_PROFILE'])
+        instrumentation.init_app(app, db.engine)
+        query_debug.init_app(app, db.engine)
+        timer.mark('engine')
+        ensure_schema(db.engine, db.metadata)
+        jobs.init_app(app)
+        timer.mark('schema')
     
     return app
 
+def serve(app, timer=None):
+    """Serve `app` with waitress, a pure-Python multi-threaded WSGI server."""
+    from waitress import create_server
+
+    config = app.config
+    server = create_server(
+        app,
+        host=config['SERVER_HOST'],
+        port=config['SERVER_PORT'],
+        threads=config['SERVER_THREADS'],
+        backlog=config['SERVER_BACKLOG'],
+        channel_timeout=config['SERVER_CHANNEL_TIMEOUT'],
+        ident='bill-generate',
+    )
+    if timer:
+        timer.mark('listen')
+        print(timer.report(), file=sys.stderr, flush=True)
+    server.run()
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bill generate backend')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--production', dest='mode', action='store_const', const='production',
+                      help='serve with waitress (default for the packaged executable)')
+    mode.add_argument('--dev', dest='mode', action='store_const', const='dev',
+                      help="serve with Flask's debug server and reloader")
+    parser.add_argument('--host')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--threads', type=int)
+    parser.add_argument('--startup-timing', action='store_true',
+                        help='print a per-phase startup time breakdown to stderr')
+    # Ignore anything else a launcher passes along
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
 if __name__ == '__main__':
-    app = create_app()
-    # Disable debug mode when running as packaged executable
-    is_frozen = getattr(sys, 'frozen', False)
-    app.run(debug=not is_frozen, port=5000, use_reloader=not is_frozen)
+    import multiprocessing
+
+    # Lets the frozen executable start batch-PDF worker processes
+    multiprocessing.freeze_support()
+    args = parse_args()
+    timer = StartupTimer(_PROCESS_START)
+    timer.mark('imports')
+    app = create_app(timer)
+    for key, value in (('SERVER_HOST', args.host), ('SERVER_PORT', args.port), ('SERVER_THREADS', args.threads)):
+        if value is not None:
+            app.config[key] = value
+
+    if (args.mode or app.config['SERVER_MODE']) == 'production':
+        serve(app, timer if args.startup_timing else None)
+    else:
+        if args.startup_timing:
+            print(timer.report(), file=sys.stderr, flush=True)
+        # Disable debug mode when running as packaged executable
+        is_frozen = getattr(sys, 'frozen', False)
+        app.run(debug=not is_frozen, host=app.config['SERVER_HOST'], port=app.config['SERVER_PORT'],
+                use_reloader=not is_frozen)
@@ -0,0 +1,98 @@
+"""Benchmark: backend cold start, measured as time to first response.
+
+Launches the server N times against an existing (already migrated) database
+and measures from process spawn until GET /api/services answers, the same
+wait the Electron shell does. Each run can be appended to a JSON history file
+so releases can be compared.
+
+    python benchmarks/cold_start.py [--runs 10] [--label v1.2] [--history cold_start.json]
+    python benchmarks/cold_start.py --command "dist/app.exe"     # packaged build
+"""
+import argparse
+import http.client
+import json
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_to_first_response(command, port, env, timeout=60):
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+                conn.request('GET', '/api/services')
+                status = conn.getresponse().status
+                conn.close()
+                if status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f'server exited with code {server.returncode}')
+            time.sleep(0.005)
+        raise RuntimeError('server did not answer in time')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--port', type=int, default=5058)
+    parser.add_argument('--command', help='server command (default: this checkout\'s app.py --production)')
+    parser.add_argument('--label', default='', help='release / commit label stored with the result')
+    parser.add_argument('--history', help='JSON file to append the result to')
+    args = parser.parse_args()
+
+    if args.command:
+        command = shlex.split(args.command)
+    else:
+        command = [sys.executable, 'app.py', '--production']
+    command += ['--port', str(args.port)]
+
+    tmpdir = tempfile.mkdtemp(prefix='bill-cold-start-')
+    env = dict(os.environ, BILL_DATABASE_URI=f"sqlite:///{os.path.join(tmpdir, 'cold.db')}",
+               BILL_PORT=str(args.port))
+
+    # The first launch creates and migrates the database; it is not counted.
+    first = time_to_first_response(command, args.port, env)
+    timings = [time_to_first_response(command, args.port, env) for _ in range(args.runs)]
+
+    result = {
+        'label': args.label,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'command': ' '.join(command),
+        'first_launch_ms': round(first * 1000, 1),
+        'runs': args.runs,
+        'min_ms': round(min(timings) * 1000, 1),
+        'median_ms': round(statistics.median(timings) * 1000, 1),
+        'max_ms': round(max(timings) * 1000, 1),
+    }
+    print(f"first launch (new database): {result['first_launch_ms']} ms")
+    print(f"time to first response over {args.runs} runs: "
+          f"min {result['min_ms']} ms, median {result['median_ms']} ms, max {result['max_ms']} ms")
+
+    if args.history:
+        history = []
+        if os.path.exists(args.history):
+            with open(args.history) as fh:
+                history = json.load(fh)
+        history.append(result)
+        with open(args.history, 'w') as fh:
+            json.dump(history, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""Seedable synthetic dataset for benchmarks.
+
+Fills the schema with N customers, M services and K bills whose item counts,
+quantities, dates and paid ratio look like a small print shop's books. Rows
+are written with Core executemany inserts in batches, then the invoice
+sequences and the revenue rollup are brought in line, so every endpoint sees
+a consistent database.
+
+    python benchmarks/datagen.py --db /tmp/bench.db [--customers 10000] [--services 200]
+                                 [--bills 50000] [--seed 42]
+
+or, from another benchmark, inside an app context:
+
+    from datagen import generate
+    generate(db, customers=10000, services=200, bills=50000, seed=42)
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST_NAMES = ('Kamal', 'Nimal', 'Sunil', 'Saman', 'Ruwan', 'Chamari', 'Dilani', 'Nadeesha', 'Kasun',
+               'Tharindu', 'Ishara', 'Malsha', 'Sanduni', 'Lahiru', 'Chathura', 'Nuwan', 'Amaya', 'Hasini')
+LAST_NAMES = ('Perera', 'Silva', 'Fernando', 'Jayasinghe', 'Bandara', 'Rathnayake', 'Wickramasinghe',
+              'Herath', 'Dissanayake', 'Gunawardena', 'Karunaratne', 'Senanayake')
+BUSINESS_SUFFIXES = ('Stores', 'Enterprises', 'Trading', 'Motors', 'Textiles', 'Pharmacy', 'Hardware')
+TOWNS = ('Polonnaruwa', 'Kaduruwela', 'Hingurakgoda', 'Medirigiriya', 'Minneriya', 'Dambulla',
+         'Habarana', 'Kandy', 'Colombo')
+SERVICE_KINDS = (
+    ('Banner printing', 'Vinyl banner, per sq ft', 60, 180),
+    ('Flex board', 'Flex with frame', 1500, 9000),
+    ('Business cards', 'Box of 100', 800, 2500),
+    ('Sticker printing', 'Die-cut stickers, per sheet', 150, 600),
+    ('Logo design', 'Two concepts, three revisions', 3500, 15000),
+    ('Photo editing', 'Per photo', 250, 1500),
+    ('Invitation cards', 'Per card', 45, 250),
+    ('T-shirt printing', 'Per shirt', 900, 2200),
+    ('Poster design', 'A3 poster', 1200, 5000),
+    ('Document printing', 'Per page', 5, 30),
+)
+
+BATCH_SIZE = 5000
+
+
+def _batched(rows, size=BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _item_count(rng):
+    # Most invoices have a handful of lines; a few are long.
+    return min(40, max(1, int(rng.lognormvariate(1.0, 0.6))))
+
+
+def generate(db, customers=1000, services=50, bills=5000, seed=42, days=730, paid_ratio=0.65):
+    """Insert a synthetic dataset into an empty database; returns row counts. Needs an app context."""
+    from sqlalchemy import insert
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+    from models import Bill, BillItem, Customer, InvoiceSequence, Service
+    import rollups
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    session = db.session
+
+    customer_rows = []
+    for i in range(customers):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f'{first} {last}' if rng.random() < 0.7 else f'{last} {rng.choice(BUSINESS_SUFFIXES)}'
+        customer_rows.append({
+            'name': name,
+            'email': f'{first.lower()}.{last.lower()}{i}@example.lk',
+            'phone': f'07{rng.randint(0, 99999999):08d}',
+            'address': f'{rng.randint(1, 400)}, Main Street, {rng.choice(TOWNS)}',
+            'created_at': now, 'updated_at': now, 'is_deleted': rng.random() < 0.02,
+        })
+    for batch in _batched(customer_rows):
+        session.execute(insert(Customer), batch)
+
+    service_rows, prices = [], []
+    for i in range(services):
+        kind, description, low, high = SERVICE_KINDS[i % len(SERVICE_KINDS)]
+        price = float(rng.randint(low, high))
+        prices.append(price)
+        service_rows.append({
+            'name': f'{kind} {i // len(SERVICE_KINDS) + 1}' if i >= len(SERVICE_KINDS) else kind,
+            'description': description, 'price': price,
+            'created_at': now, 'updated_at': now, 'is_deleted': False,
+        })
+    for batch in _batched(service_rows):
+        session.execute(insert(Service), batch)
+
+    customer_ids = session.execute(Customer.__table__.select().with_only_columns(Customer.id)
+                                   .order_by(Customer.id)).scalars().all()[-customers:]
+    service_ids = session.execute(Service.__table__.select().with_only_columns(Service.id)
+                                  .order_by(Service.id)).scalars().all()[-services:]
+    # A few regulars bring most of the work.
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(customer_ids))]
+
+    start_day = date.today() - timedelta(days=days)
+    bill_dates = sorted(start_day + timedelta(days=rng.randrange(days)) for _ in range(bills))
+    per_year = {}
+    bill_rows, bill_items = [], []
+    for bill_date in bill_dates:
+        # Keyed by the full year, as the app's InvoiceSequence rows are.
+        year = bill_date.year
+        per_year[year] = per_year.get(year, 0) + 1
+        lines = []
+        for _ in range(_item_count(rng)):
+            index = rng.randrange(len(service_ids))
+            # Per-unit items (pages, stickers, cards) sell in bulk.
+            quantity = rng.choice((10, 25, 50, 100, 200) if prices[index] < 300 else (1, 1, 1, 2, 2, 3, 5))
+            lines.append((service_ids[index], quantity, prices[index], quantity * prices[index]))
+        created = datetime.combine(bill_date, datetime.min.time()) + timedelta(minutes=rng.randrange(600))
+        bill_rows.append({
+            'bill_number': f'INV-{year % 100:02d}-{per_year[year]:04d}',
+            'customer_id': rng.choices(customer_ids, weights)[0],
+            'total': round(sum(line[3] for line in lines), 2),
+            'date': bill_date,
+            'is_paid': rng.random() < paid_ratio,
+            'created_at': created, 'updated_at': created,
+            'is_deleted': rng.random() < 0.01,
+        })
+        bill_items.append(lines)
+
+    first_bill_id = (session.execute(Bill.__table__.select().with_only_columns(Bill.id)
+                                     .order_by(Bill.id.desc()).limit(1)).scalar() or 0) + 1
+    for batch in _batched(bill_rows):
+        session.execute(insert(Bill), batch)
+
+    item_rows = [
+        {'bill_id': first_bill_id + index, 'service_id': service_id, 'quantity': quantity,
+         'unit_price': unit_price, 'line_total': line_total,
+         'created_at': bill_rows[index]['created_at'], 'updated_at': bill_rows[index]['created_at']}
+        for index, lines in enumerate(bill_items)
+        for service_id, quantity, unit_price, line_total in lines
+    ]
+    for batch in _batched(item_rows):
+        session.execute(insert(BillItem), batch)
+
+    for year, last_value in per_year.items():
+        stmt = sqlite_insert(InvoiceSequence).values(year=year, last_value=last_value)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[InvoiceSequence.year], set_={'last_value': stmt.excluded.last_value}
+        ))
+    rollups.rebuild_rollup(session.connection())
+    session.commit()
+
+    return {'customers': customers, 'services': services, 'bills': bills, 'bill_items': len(item_rows)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True, help='SQLite file to create (must not exist)')
+    parser.add_argument('--customers', type=int, default=10000)
+    parser.add_argument('--services', type=int, default=200)
+    parser.add_argument('--bills', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        parser.error(f'{args.db} already exists')
+
+    from config import Config
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.abspath(args.db)}"
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    start = time.perf_counter()
+    with app.app_context():
+        counts = generate(db, args.customers, args.services, args.bills, args.seed)
+    elapsed = time.perf_counter() - start
+    print(', '.join(f'{count} {name}' for name, count in counts.items()) + f' in {elapsed:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+"""In-process latency / query-count benchmark for every API route.
+
+Generates a dataset with datagen.py (or reuses one with --db), then drives each
+route through the Flask test client and reports p50 / p95 / p99 latency, SQL
+statements per request and, from the Server-Timing header (metrics are turned
+on for the run), the median time spent in the database and in JSON encoding.
+Results are written as JSON; --compare prints the change against an earlier
+result file.
+
+    python benchmarks/endpoint_bench.py [--customers 5000] [--services 100] [--bills 20000]
+                                        [--iterations 50] [--only bills] [--out result.json]
+                                        [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from config import Config  # noqa: E402
+
+
+class Context:
+    """Ids to aim requests at, sampled from the dataset."""
+
+    def __init__(self, db, seed):
+        from models import Bill, Customer, Service
+
+        self.rng = random.Random(seed)
+        active = lambda model: db.session.execute(  # noqa: E731
+            model.__table__.select().with_only_columns(model.id).where(model.is_deleted == False)
+        ).scalars().all()
+        self.customers = active(Customer)
+        self.services = active(Service)
+        self.bills = active(Bill)
+        self.jobs = []
+        self.spare = {'customers': [], 'services': [], 'bills': [], 'bill_batches': [], 'jobs': [], 'queued_jobs': []}
+
+    def customer(self):
+        return self.rng.choice(self.customers)
+
+    def service(self):
+        return self.rng.choice(self.services)
+
+    def bill(self):
+        return self.rng.choice(self.bills)
+
+    def items(self, count=None):
+        count = count or self.rng.randint(1, 6)
+        return [{'service_id': self.service(), 'quantity': self.rng.randint(1, 5)} for _ in range(count)]
+
+    def new_bill(self):
+        return {'customer_id': self.customer(), 'date': '2025-06-15', 'items': self.items()}
+
+    def job(self):
+        return self.rng.choice(self.jobs)
+
+
+def _spare(kind):
+    """Path factory for DELETE routes: each call deletes a row made for the purpose."""
+    return lambda ctx: f'/api/{kind}/{ctx.spare[kind].pop()}'
+
+
+def _csv(header, row):
+    """Body factory for the CSV imports: IMPORT_ROWS rows from `row(ctx, n)`."""
+    def body(ctx):
+        lines = [header] + [row(ctx, n) for n in range(IMPORT_ROWS)]
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+    return body
+
+
+IMPORT_ROWS = 200
+BULK_DELETE_SIZE = 20
+
+# (name, method, path(ctx), body(ctx) or None, iterations override or None).
+# A body is sent as JSON, or as a text/csv upload when it is bytes.
+ROUTES = (
+    ('GET /api/customers', 'GET', lambda ctx: '/api/customers', None, 10),
+    ('GET /api/customers?limit', 'GET', lambda ctx: '/api/customers?limit=50', None, None),
+    ('GET /api/customers/search', 'GET',
+     lambda ctx: f"/api/customers/search?q={ctx.rng.choice(('kamal', 'perera', 'silva stores', '0771'))}",
+     None, None),
+    ('GET /api/customers/<id>', 'GET', lambda ctx: f'/api/customers/{ctx.customer()}', None, None),
+    ('POST /api/customers', 'POST', lambda ctx: '/api/customers',
+     lambda ctx: {'name': 'Bench Customer', 'email': 'bench@example.lk', 'phone': '0710000000'}, None),
+    ('PUT /api/customers/<id>', 'PUT', lambda ctx: f'/api/customers/{ctx.customer()}',
+     lambda ctx: {'address': f'{ctx.rng.randint(1, 400)}, Main Street'}, None),
+    ('DELETE /api/customers/<id>', 'DELETE', _spare('customers'), None, None),
+    ('POST /api/customers/import', 'POST', lambda ctx: '/api/customers/import',
+     _csv('name,email,phone,address',
+          lambda ctx, n: f'Imported {ctx.rng.randint(1, 10 ** 6)},import{n}@example.lk,07{n:08d},{n} Lake Road'),
+     10),
+
+    ('GET /api/services', 'GET', lambda ctx: '/api/services', None, None),
+    ('GET /api/services?limit', 'GET', lambda ctx: '/api/services?limit=50', None, None),
+    ('GET /api/services/search', 'GET',
+     lambda ctx: f"/api/services/search?q={ctx.rng.choice(('banner', 'print', 'design'))}", None, None),
+    ('GET /api/services/<id>', 'GET', lambda ctx: f'/api/services/{ctx.service()}', None, None),
+    ('POST /api/services', 'POST', lambda ctx: '/api/services',
+     lambda ctx: {'name': 'Bench Service', 'price': 250}, None),
+    ('PUT /api/services/<id>', 'PUT', lambda ctx: f'/api/services/{ctx.service()}',
+     lambda ctx: {'description': 'updated by benchmark'}, None),
+    ('DELETE /api/services/<id>', 'DELETE', _spare('services'), None, None),
+    ('POST /api/services/import', 'POST', lambda ctx: '/api/services/import',
+     _csv('name,description,price',
+          lambda ctx, n: f'Imported {ctx.rng.randint(1, 10 ** 6)},imported by benchmark,{100 + n}'),
+     10),
+
+    ('GET /api/bills', 'GET', lambda ctx: '/api/bills', None, 3),
+    ('GET /api/bills?limit', 'GET', lambda ctx: '/api/bills?limit=50', None, None),
+    ('GET /api/bills?customer_id', 'GET', lambda ctx: f'/api/bills?customer_id={ctx.customer()}&limit=50',
+     None, None),
+    ('GET /api/bills/<id>', 'GET', lambda ctx: f'/api/bills/{ctx.bill()}', None, None),
+    ('GET /api/bills/<id>/pdf', 'GET', lambda ctx: f'/api/bills/{ctx.bill()}/pdf', None, None),
+    ('GET /api/bills/export', 'GET', lambda ctx: '/api/bills/export?format=csv', None, 3),
+    ('POST /api/bills', 'POST', lambda ctx: '/api/bills', lambda ctx: ctx.new_bill(), None),
+    ('POST /api/bills/bulk', 'POST', lambda ctx: '/api/bills/bulk',
+     lambda ctx: {'bills': [ctx.new_bill() for _ in range(100)]}, 5),
+    ('POST /api/bills/pdf-batch', 'POST', lambda ctx: '/api/bills/pdf-batch',
+     lambda ctx: {'ids': ctx.rng.sample(ctx.bills, min(50, len(ctx.bills))), 'workers': 1}, 3),
+    ('PUT /api/bills/<id>', 'PUT', lambda ctx: f'/api/bills/{ctx.bill()}',
+     lambda ctx: {'items': ctx.items()}, None),
+    ('PATCH /api/bills/<id>/toggle-paid', 'PATCH', lambda ctx: f'/api/bills/{ctx.bill()}/toggle-paid',
+     None, None),
+    ('PATCH /api/bills/bulk-status', 'PATCH', lambda ctx: '/api/bills/bulk-status',
+     lambda ctx: {'ids': ctx.rng.sample(ctx.bills, min(500, len(ctx.bills))), 'is_paid': ctx.rng.random() < 0.5},
+     10),
+    ('DELETE /api/bills/<id>', 'DELETE', _spare('bills'), None, None),
+    ('DELETE /api/bills/bulk', 'DELETE', lambda ctx: '/api/bills/bulk',
+     lambda ctx: {'ids': ctx.spare['bill_batches'].pop()}, None),
+
+    ('GET /api/reports/summary', 'GET', lambda ctx: '/api/reports/summary', None, None),
+    ('GET /api/reports/summary?group_by=month', 'GET',
+     lambda ctx: '/api/reports/summary?group_by=month', None, None),
+    ('GET /api/reports/summary?group_by=service', 'GET',
+     lambda ctx: '/api/reports/summary?group_by=service', None, 10),
+    ('GET /api/sync', 'GET', lambda ctx: '/api/sync?limit=500', None, None),
+    ('GET /api/metrics', 'GET', lambda ctx: '/api/metrics', None, None),
+    ('DELETE /api/metrics', 'DELETE', lambda ctx: '/api/metrics', None, None),
+
+    ('GET /api/jobs', 'GET', lambda ctx: '/api/jobs', None, None),
+    ('GET /api/jobs/<id>', 'GET', lambda ctx: f'/api/jobs/{ctx.job()}', None, None),
+    ('GET /api/jobs/<id>/result', 'GET', lambda ctx: f'/api/jobs/{ctx.job()}/result', None, None),
+    ('POST /api/jobs/<id>/cancel', 'POST', lambda ctx: f"/api/jobs/{ctx.spare['queued_jobs'].pop()}/cancel",
+     None, None),
+    ('DELETE /api/jobs/<id>', 'DELETE', _spare('jobs'), None, None),
+    # Last, so the exports it queues don't run behind the other routes' timings;
+    # few enough iterations to stay under JOB_QUEUE_LIMIT.
+    ('POST /api/jobs', 'POST', lambda ctx: '/api/jobs',
+     lambda ctx: {'type': 'bill_export', 'params': {'customer_id': ctx.customer()}}, 10),
+)
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def prepare_spares(client, ctx, count):
+    for _ in range(count):
+        ctx.spare['customers'].append(client.post('/api/customers', json={
+            'name': 'Spare', 'email': 'spare@example.lk', 'phone': '0710000000'}).get_json()['data']['id'])
+        ctx.spare['services'].append(client.post('/api/services', json={
+            'name': 'Spare', 'price': 1}).get_json()['data']['id'])
+        ctx.spare['bills'].append(client.post('/api/bills', json=ctx.new_bill()).get_json()['data']['id'])
+        batch = client.post('/api/bills/bulk', json={'bills': [ctx.new_bill() for _ in range(BULK_DELETE_SIZE)]})
+        ctx.spare['bill_batches'].append([row['id'] for row in batch.get_json()['data']['results']])
+
+
+def prepare_jobs(app, db, ctx, count):
+    """Job rows for the job routes: finished exports (with a result file) to
+    read and delete, and queued ones to cancel. Written directly, so no job
+    runs while the routes are timed."""
+    from models import Job
+
+    results_dir = app.config['JOB_RESULTS_DIR']
+    os.makedirs(results_dir, exist_ok=True)
+    with app.app_context():
+        finished = []
+        for n in range(2 * count):
+            path = os.path.join(results_dir, f'bench-{n}.csv')
+            with open(path, 'w') as fh:
+                fh.write('bill_number,total\nBENCH-1,100.0\n')
+            finished.append(Job(kind='bill_export', status='succeeded', params='{}', result_path=path,
+                                result_name='bills.csv', started_at=datetime.utcnow(), finished_at=datetime.utcnow()))
+        queued = [Job(kind='bill_export', status='queued', params='{}') for _ in range(count)]
+        db.session.add_all(finished + queued)
+        db.session.commit()
+        ctx.jobs = [job.id for job in finished[:count]]
+        ctx.spare['jobs'] = [job.id for job in finished[count:]]
+        ctx.spare['queued_jobs'] = [job.id for job in queued]
+
+
+def bench_route(client, ctx, counter, route, iterations, warmup):
+    name, method, path, body, override = route
+    runs = override or iterations
+    timings, queries, statuses = [], [], {}
+    phases = {'db': [], 'serialize': []}
+    for i in range(warmup + runs):
+        url = path(ctx)
+        payload = body(ctx) if body else None
+        counter[0] = 0
+        start = time.perf_counter()
+        if isinstance(payload, bytes):
+            response = client.open(url, method=method, data=payload, content_type='text/csv')
+        else:
+            response = client.open(url, method=method, json=payload)
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        response.close()
+        if i < warmup:
+            continue
+        timings.append(elapsed * 1000)
+        queries.append(counter[0])
+        server_timing = server_timings(response.headers.get('Server-Timing', ''))
+        for phase, values in phases.items():
+            values.append(server_timing.get(phase, 0.0))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    timings.sort()
+    return {
+        'iterations': runs,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': round(statistics.fmean(queries), 2),
+        'db_ms': round(statistics.median(phases['db']), 3),
+        'serialize_ms': round(statistics.median(phases['serialize']), 3),
+        'status': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def server_timings(header):
+    """{name: duration in ms} from a Server-Timing header."""
+    durations = {}
+    for metric in header.split(','):
+        name, *params = [part.strip() for part in metric.split(';')]
+        for param in params:
+            if param.startswith('dur='):
+                durations[name] = float(param[4:])
+    return durations
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    base_routes = (baseline or {}).get('routes', {})
+    header = f"{'route':<44}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'db':>8}{'json':>8}"
+    if baseline:
+        header += f"{'p50 vs base':>13}"
+    print(header)
+    for name, row in results['routes'].items():
+        line = (f"{name:<44}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['queries']:>9.1f}"
+                f"{row.get('db_ms', 0):>8.2f}{row.get('serialize_ms', 0):>8.2f}")
+        base = base_routes.get(name)
+        if base and base['p50_ms']:
+            line += f"{(row['p50_ms'] / base['p50_ms'] - 1) * 100:>+12.0f}%"
+        if set(row['status']) - {'200', '201'}:
+            line += f"  status {row['status']}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', help='benchmark an existing database (a temp copy is not made)')
+    parser.add_argument('--customers', type=int, default=5000)
+    parser.add_argument('--services', type=int, default=100)
+    parser.add_argument('--bills', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', help='run only routes whose name contains this text')
+    parser.add_argument('--out', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='earlier result JSON to compare p50 against')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='bill-endpoints-')
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(tmpdir, 'bench.db')
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    Config.METRICS_ENABLED = True
+    Config.JOB_RESULTS_DIR = os.path.join(tmpdir, 'job_results')
+
+    from sqlalchemy import event
+    from app import create_app
+    from models import db
+    from datagen import generate
+
+    app = create_app()
+    app.config['PDF_CACHE_DIR'] = os.path.join(tmpdir, 'pdf_cache')
+    counter = [0]
+    with app.app_context():
+        if not args.db:
+            generate(db, args.customers, args.services, args.bills, args.seed)
+        event.listen(db.engine, 'before_cursor_execute', lambda *a, **k: counter.__setitem__(0, counter[0] + 1))
+        ctx = Context(db, args.seed)
+
+    client = app.test_client()
+    routes = [route for route in ROUTES if not args.only or args.only in route[0]]
+    spares = max((route[4] or args.iterations) + args.warmup for route in routes) if routes else 0
+    prepare_spares(client, ctx, spares)
+    prepare_jobs(app, db, ctx, spares)
+
+    benched = {(route[1], route[0].split()[1].split('?')[0]) for route in ROUTES}
+    for rule in app.url_map.iter_rules():
+        if rule.rule.startswith('/api'):
+            path = rule.rule.replace('<int:id>', '<id>')
+            for method in rule.methods - {'HEAD', 'OPTIONS'}:
+                if (method, path) not in benched:
+                    print(f'warning: {method} {rule.rule} has no benchmark entry', file=sys.stderr)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'dataset': {'db': args.db, 'customers': len(ctx.customers), 'services': len(ctx.services),
+                        'bills': len(ctx.bills), 'seed': args.seed},
+            'iterations': args.iterations,
+        },
+        'routes': {},
+    }
+    for route in routes:
+        results['routes'][route[0]] = bench_route(client, ctx, counter, route, args.iterations, args.warmup)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+    print_results(results, baseline)
+
+    if args.out:
+        with open(args.out, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
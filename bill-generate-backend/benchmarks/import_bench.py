@@ -0,0 +1,133 @@
+"""Benchmark: CSV import of customers through a real server.
+
+Writes a synthetic customer CSV, starts the backend (app.py --production) on
+a temporary database and streams the file to POST /api/customers/import as a
+text/csv body. Reports rows per second and the server's peak resident memory,
+which should stay flat as --rows grows. For comparison, --compare-single
+rows are also created one request at a time through POST /api/customers.
+
+    python benchmarks/import_bench.py [--rows 500000] [--compare-single 500]
+"""
+import argparse
+import csv
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from datagen import FIRST_NAMES, LAST_NAMES, TOWNS  # noqa: E402
+
+
+def write_csv(path, rows, seed, bad_every=1000):
+    """Customer CSV with one row in `bad_every` missing its phone number."""
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(('name', 'email', 'phone', 'address'))
+        for i in range(rows):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            phone = '' if i % bad_every == bad_every - 1 else f'07{rng.randint(0, 99999999):08d}'
+            writer.writerow((f'{first} {last}', f'{first.lower()}.{last.lower()}{i}@example.lk', phone,
+                             f'{rng.randint(1, 400)}, Main Street, {rng.choice(TOWNS)}'))
+
+
+def memory_mb(pid):
+    """{'peak', 'anon', 'file'} resident memory of `pid` in MB (Linux only; None elsewhere).
+
+    `file` is mostly SQLite's memory-mapped database pages, which the kernel
+    can drop at any time; `anon` is the process's own heap.
+    """
+    fields = {'VmHWM:': 'peak', 'RssAnon:': 'anon', 'RssFile:': 'file'}
+    try:
+        with open(f'/proc/{pid}/status') as fh:
+            return {fields[line.split()[0]]: int(line.split()[1]) / 1024
+                    for line in fh if line.split()[0] in fields}
+    except OSError:
+        return None
+
+
+def wait_for_server(port, server, timeout=60):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/services')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError(f'server exited with code {server.returncode}')
+            time.sleep(0.05)
+    raise RuntimeError('server did not answer in time')
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=3600)
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--compare-single', type=int, default=500,
+                        help='rows to create one request at a time for comparison (0 to skip)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--port', type=int, default=5059)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='bill-import-')
+    csv_path = os.path.join(tmpdir, 'customers.csv')
+    write_csv(csv_path, args.rows, args.seed)
+    size_mb = os.path.getsize(csv_path) / 1e6
+
+    env = dict(os.environ, BILL_DATABASE_URI=f"sqlite:///{os.path.join(tmpdir, 'import.db')}",
+               BILL_PORT=str(args.port))
+    server = subprocess.Popen([sys.executable, 'app.py', '--production', '--port', str(args.port)],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(args.port, server)
+        idle = memory_mb(server.pid)
+
+        with open(csv_path, 'rb') as fh:
+            start = time.perf_counter()
+            status, payload = request(args.port, 'POST', '/api/customers/import', body=fh, headers={
+                'Content-Type': 'text/csv', 'Content-Length': str(os.path.getsize(csv_path)),
+            })
+            elapsed = time.perf_counter() - start
+        summary = payload.get('data') or {}
+        print(f"import: {args.rows} rows ({size_mb:.1f} MB) -> HTTP {status}, "
+              f"{summary.get('imported')} imported, {summary.get('failed')} rejected, "
+              f"{elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
+        if idle is not None:
+            after = memory_mb(server.pid)
+            print(f"server memory before / after: heap {idle['anon']:.1f} / {after['anon']:.1f} MB, "
+                  f"mapped files {idle['file']:.1f} / {after['file']:.1f} MB, peak RSS {after['peak']:.1f} MB")
+
+        if args.compare_single:
+            body = json.dumps({'name': 'Single', 'email': 'single@example.lk', 'phone': '0710000000'})
+            start = time.perf_counter()
+            for _ in range(args.compare_single):
+                request(args.port, 'POST', '/api/customers', body=body,
+                        headers={'Content-Type': 'application/json'})
+            elapsed = time.perf_counter() - start
+            print(f"one request per row: {args.compare_single / elapsed:,.0f} rows/s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
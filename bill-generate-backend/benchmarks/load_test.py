@@ -0,0 +1,154 @@
+"""Load test: Werkzeug dev server vs. the waitress production mode.
+
+Starts the dev server (as the packaged build ran it: app.run, debug off) and
+`app.py --production` in turn against a throw-away database seeded with a few
+hundred bills, then hammers a mix of GET endpoints from concurrent keep-alive
+clients and reports requests/sec and latency percentiles for each.
+
+    python benchmarks/load_test.py [--clients 16] [--duration 10] [--threads 8]
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PATHS = (
+    '/api/customers',
+    '/api/services',
+    '/api/bills?limit=50',
+    '/api/reports/summary?group_by=month',
+)
+
+SEED_SCRIPT = """
+import random
+from config import Config
+Config.SQLALCHEMY_DATABASE_URI = {uri!r}
+from app import create_app
+app = create_app()
+c = app.test_client()
+random.seed(42)
+cs = [c.post('/api/customers', json={{'name': f'Customer {{i}}', 'email': f'c{{i}}@example.com',
+      'phone': f'07{{i:08d}}'}}).get_json()['data']['id'] for i in range(100)]
+ss = [c.post('/api/services', json={{'name': f'Service {{i}}', 'price': 100 + i}}).get_json()['data']['id']
+      for i in range(20)]
+for b in range(300):
+    c.post('/api/bills', json={{'customer_id': random.choice(cs), 'date': f'2024-{{1 + b % 12:02d}}-{{1 + b % 28:02d}}',
+           'items': [{{'service_id': random.choice(ss), 'quantity': 1 + b % 3}} for _ in range(4)]}})
+"""
+
+DEV_SERVER = """
+from app import create_app
+create_app().run(debug=False, port={port}, use_reloader=False)
+"""
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/services')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not come up')
+
+
+def client(port, deadline, latencies, errors, offset):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    i = offset
+    while time.time() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            latencies.append(time.perf_counter() - start)
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.close()
+
+
+def run(mode, port, env, args):
+    if mode == 'dev':
+        # What the packaged build ran before: app.run() with debug off.
+        command = [sys.executable, '-c', DEV_SERVER.format(port=port)]
+    else:
+        command = [sys.executable, 'app.py', '--production', '--port', str(port), '--threads', str(args.threads)]
+    server = subprocess.Popen(
+        command,
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(port)
+        latencies, errors = [], []
+        deadline = time.time() + args.duration
+        workers = [threading.Thread(target=client, args=(port, deadline, latencies, errors, n))
+                   for n in range(args.clients)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--port', type=int, default=5057)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='bill-load-')
+    uri = f"sqlite:///{os.path.join(tmpdir, 'load.db')}"
+    subprocess.run([sys.executable, '-c', SEED_SCRIPT.format(uri=uri)], cwd=BACKEND_DIR, check=True)
+
+    # Metrics on, as in the runs the recorded numbers come from.
+    env = dict(os.environ, BILL_DATABASE_URI=uri, BILL_METRICS='1')
+    print(f"{args.clients} clients, {args.duration:g}s per server, {args.threads} server threads")
+    print(f"{'server':<12}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for mode in ('dev', 'production'):
+        result = run(mode, args.port, env, args)
+        print(f"{mode:<12}{result['rps']:>9.1f}{result['p50']:>9.1f}{result['p99']:>9.1f}{result['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
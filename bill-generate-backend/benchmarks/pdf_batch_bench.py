@@ -0,0 +1,105 @@
+"""Benchmark: batch invoice PDF throughput vs. number of worker processes.
+
+Fills a throw-away database with N bills and times POST /api/bills/pdf-batch
+for each worker count, with a cold PDF cache on every run (plus one warm run
+at the end to show the cache-hit rate).
+
+    python benchmarks/pdf_batch_bench.py [--bills 500] [--items 8] [--workers 1,2,4]
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+def seed(db, n_bills, n_items):
+    from models import Bill, BillItem, Customer, Service
+
+    now = datetime.utcnow()
+    db.session.execute(Customer.__table__.insert(), [
+        {'name': f'Customer {i}', 'email': f'c{i}@example.com', 'phone': f'07{i:08d}',
+         'address': f'{i} Main Street, Polonnaruwa', 'created_at': now, 'updated_at': now,
+         'is_deleted': False}
+        for i in range(100)
+    ])
+    db.session.execute(Service.__table__.insert(), [
+        {'name': f'Service {i}', 'description': '', 'price': 100.0 + i,
+         'created_at': now, 'updated_at': now, 'is_deleted': False}
+        for i in range(50)
+    ])
+    db.session.execute(Bill.__table__.insert(), [
+        {'bill_number': f'BENCH-{i:07d}', 'customer_id': random.randint(1, 100),
+         'total': 100.0 * n_items, 'date': date(2024, 1, 1) + timedelta(days=i % 365),
+         'is_paid': i % 2 == 0, 'created_at': now, 'updated_at': now, 'is_deleted': False}
+        for i in range(n_bills)
+    ])
+    db.session.execute(BillItem.__table__.insert(), [
+        {'bill_id': b + 1, 'service_id': random.randint(1, 50), 'quantity': 1,
+         'unit_price': 100.0, 'line_total': 100.0, 'created_at': now, 'updated_at': now}
+        for b in range(n_bills) for _ in range(n_items)
+    ])
+    db.session.commit()
+
+
+def run(client, workers):
+    start = time.perf_counter()
+    response = client.post('/api/bills/pdf-batch', json={'filters': {}, 'workers': workers})
+    body = response.get_data()
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    count = len(zipfile.ZipFile(io.BytesIO(body)).namelist())
+    return elapsed, count, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bills', type=int, default=500)
+    parser.add_argument('--items', type=int, default=8)
+    parser.add_argument('--workers', default='1,2,4',
+                        help='comma-separated worker counts to try')
+    args = parser.parse_args()
+
+    random.seed(42)
+    tmpdir = tempfile.mkdtemp(prefix='bill-pdf-batch-')
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    from app import create_app
+    from models import db
+    import invoice_pdf
+
+    worker_counts = [int(w) for w in args.workers.split(',')]
+    app = create_app()
+    cache_dir = os.path.join(tmpdir, 'pdf_cache')
+    app.config['PDF_CACHE_DIR'] = cache_dir
+    # One shared render pool; each run's `workers` caps how much of it that batch uses.
+    app.config['PDF_WORKERS'] = max(worker_counts)
+    with app.app_context():
+        seed(db, args.bills, args.items)
+
+    client = app.test_client()
+    print(f"{args.bills} bills x {args.items} items, {invoice_pdf.available_cores()} core(s) available")
+    print(f"{'workers':>8}{'seconds':>10}{'PDFs/s':>10}{'zip MB':>9}")
+    if max(worker_counts) > 1:
+        # Start the pool outside the timed runs.
+        invoice_pdf.render_pool(max(worker_counts)).submit(int).result()
+    for workers in worker_counts:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        elapsed, count, size = run(client, workers)
+        print(f"{workers:>8}{elapsed:>10.2f}{count / elapsed:>10.1f}{size / 1e6:>9.2f}")
+
+    elapsed, count, size = run(client, 1)
+    print(f"{'cached':>8}{elapsed:>10.2f}{count / elapsed:>10.1f}{size / 1e6:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark: customer full-text search latency on a large table.
+
+Fills a throw-away database with N customers, then times
+GET /api/customers/search for a few typical queries.
+
+    python benchmarks/search_bench.py [--rows 100000] [--repeat 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+FIRST = ('Kamal', 'Nimal', 'Sunil', 'Saman', 'Ruwan', 'Chamari', 'Dilani', 'Nadeesha', 'Kasun', 'Tharindu')
+LAST = ('Perera', 'Silva', 'Fernando', 'Jayasinghe', 'Bandara', 'Rathnayake', 'Wickramasinghe', 'Herath')
+TOWNS = ('Polonnaruwa', 'Kaduruwela', 'Hingurakgoda', 'Medirigiriya', 'Colombo', 'Kandy', 'Dambulla')
+
+QUERIES = ('kamal', 'perera', 'kas sil', 'polonnaruwa', '0771', 'customer12345', 'nadeesha kandy')
+
+
+def seed(db, n):
+    from models import Customer
+
+    now = datetime.utcnow()
+    db.session.execute(Customer.__table__.insert(), [
+        {'name': f'{random.choice(FIRST)} {random.choice(LAST)}',
+         'email': f'customer{i}@example.com', 'phone': f'07{random.randint(0, 99999999):08d}',
+         'address': f'{random.randint(1, 500)} Main Street, {random.choice(TOWNS)}',
+         'created_at': now, 'updated_at': now, 'is_deleted': i % 20 == 0}
+        for i in range(n)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(42)
+    tmpdir = tempfile.mkdtemp(prefix='bill-search-')
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    app.config['JSON_GZIP'] = False
+    with app.app_context():
+        seed(db, args.rows)
+
+    client = app.test_client()
+    print(f"{args.rows} customers")
+    print(f"{'query':<18}{'hits':>6}{'p50 ms':>9}{'max ms':>9}")
+    for q in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get('/api/customers/search', query_string={'q': q})
+            timings.append((time.perf_counter() - start) * 1000)
+        hits = len(response.get_json()['data'])
+        print(f"{q:<18}{hits:>6}{statistics.median(timings):>9.2f}{max(timings):>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Micro-benchmark: ORM `to_dict()` + `jsonify` vs. the Core-row serializer.
+
+Fills a throw-away database with N customers and N/5 bills of 5 items
+(N bill items), then times both paths for the customer and bill listings.
+
+    python benchmarks/serializer_bench.py [--rows 100000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+def seed(db, n):
+    from models import Bill, BillItem, Customer, Service
+
+    now = datetime.utcnow()
+    db.session.execute(Customer.__table__.insert(), [
+        {'name': f'Customer {i}', 'email': f'c{i}@example.com', 'phone': f'07{i:08d}',
+         'address': f'{i} Main Street', 'created_at': now, 'updated_at': now, 'is_deleted': False}
+        for i in range(n)
+    ])
+    db.session.execute(Service.__table__.insert(), [
+        {'name': f'Service {i}', 'description': '', 'price': 100.0 + i,
+         'created_at': now, 'updated_at': now, 'is_deleted': False}
+        for i in range(50)
+    ])
+    n_bills = max(1, n // 5)
+    db.session.execute(Bill.__table__.insert(), [
+        {'bill_number': f'BENCH-{i:07d}', 'customer_id': random.randint(1, n), 'total': 500.0,
+         'date': date(2024, 1, 1) + timedelta(days=i % 365), 'is_paid': i % 2 == 0,
+         'created_at': now, 'updated_at': now, 'is_deleted': False}
+        for i in range(n_bills)
+    ])
+    db.session.execute(BillItem.__table__.insert(), [
+        {'bill_id': b + 1, 'service_id': random.randint(1, 50), 'quantity': 1,
+         'unit_price': 100.0, 'line_total': 100.0, 'created_at': now, 'updated_at': now}
+        for b in range(n_bills) for _ in range(5)
+    ])
+    db.session.commit()
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(42)
+    tmpdir = tempfile.mkdtemp(prefix='bill-serializer-')
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    from flask import jsonify
+    from app import create_app
+    from models import db, Bill, Customer
+    from api.bill_api import _bill_query
+    from api.serializers import (
+        bill_dicts, bill_select, customer_dicts, customer_select, json_response,
+    )
+
+    app = create_app()
+    app.config['JSON_GZIP'] = False
+    with app.app_context():
+        seed(db, args.rows)
+
+    def orm_customers():
+        customers = Customer.query.filter_by(is_deleted=False).all()
+        body = jsonify({'success': True, 'data': [c.to_dict() for c in customers]}).get_data()
+        db.session.expunge_all()
+        return len(body)
+
+    def core_customers():
+        rows = db.session.execute(customer_select().where(Customer.is_deleted == False)).all()
+        return len(json_response({'success': True, 'data': customer_dicts(rows)}).get_data())
+
+    def orm_bills():
+        bills = _bill_query().filter_by(is_deleted=False).all()
+        body = jsonify({'success': True, 'data': [b.to_dict() for b in bills]}).get_data()
+        db.session.expunge_all()
+        return len(body)
+
+    def core_bills():
+        rows = db.session.execute(bill_select().where(Bill.is_deleted == False)).all()
+        return len(json_response({'success': True, 'data': bill_dicts(rows)}).get_data())
+
+    cases = [
+        (f'customers ({args.rows} rows)', orm_customers, core_customers),
+        (f'bills ({args.rows // 5} bills, {args.rows} items)', orm_bills, core_bills),
+    ]
+    print(f"{'listing':<36}{'to_dict+jsonify':>16}{'core rows':>12}{'speedup':>9}")
+    with app.test_request_context('/'):
+        for label, orm_fn, core_fn in cases:
+            orm_time, orm_size = best_of(args.repeat, orm_fn)
+            core_time, core_size = best_of(args.repeat, core_fn)
+            print(f"{label:<36}{orm_time:>15.3f}s{core_time:>11.3f}s{orm_time / core_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
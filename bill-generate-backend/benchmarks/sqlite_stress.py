@@ -0,0 +1,87 @@
+"""Concurrent reader/writer stress test for the SQLite engine profiles.
+
+Runs the real API routes from several threads against a throw-away database,
+once per profile, and reports throughput and "database is locked" failures.
+
+    python benchmarks/sqlite_stress.py [--seconds 10] [--readers 6] [--writers 2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config, SQLITE_PROFILES  # noqa: E402
+
+
+def run_profile(profile, seconds, readers, writers):
+    from app import create_app
+
+    tmpdir = tempfile.mkdtemp(prefix=f'bill-stress-{profile}-')
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, 'stress.db')}"
+    Config.SQLITE_PROFILE = profile
+    app = create_app()
+
+    client = app.test_client()
+    customer_id = client.post('/api/customers', json={
+        'name': 'Stress Customer', 'email': 'stress@example.com', 'phone': '000'
+    }).get_json()['data']['id']
+    service_id = client.post('/api/services', json={
+        'name': 'Stress Service', 'price': 10
+    }).get_json()['data']['id']
+
+    stats = {'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def record(kind, response):
+        with lock:
+            if response.status_code < 400:
+                stats[kind] += 1
+            elif 'locked' in (response.get_json() or {}).get('message', ''):
+                stats['locked'] += 1
+            else:
+                stats['errors'] += 1
+
+    def reader():
+        c = app.test_client()
+        while time.perf_counter() < deadline:
+            record('reads', c.get('/api/bills?limit=50'))
+
+    def writer():
+        c = app.test_client()
+        while time.perf_counter() < deadline:
+            record('writes', c.post('/api/bills', json={
+                'customer_id': customer_id,
+                'items': [{'service_id': service_id, 'quantity': 2}],
+            }))
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=6)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--profiles', nargs='+', default=list(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'locked':>8}{'errors':>8}")
+    for profile in args.profiles:
+        stats = run_profile(profile, args.seconds, args.readers, args.writers)
+        print(f"{profile:<12}{stats['reads'] / args.seconds:>10.1f}{stats['writes'] / args.seconds:>10.1f}"
+              f"{stats['locked']:>8}{stats['errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark: cost of the row-level table_versions triggers (migration v3).
+
+SQLite has no statement-level triggers, so a bulk INSERT / UPDATE / DELETE of
+N rows bumps its table's version N times. Times such statements on bill_items
+(which has no other triggers) with the version triggers in place and dropped,
+interleaved so both see the same cache and WAL state, plus a single-row
+insert + commit as the write routes do it.
+
+    python benchmarks/version_trigger_bench.py [--rows 10000] [--repeat 8]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+SINGLE_ROW_WRITES = 300
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=8)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='bill-triggers-')
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    from app import create_app
+    from models import db, Bill, BillItem, Customer, Service
+
+    app = create_app()
+    with app.app_context(), db.engine.connect() as conn:
+        now = datetime.utcnow()
+        conn.execute(Customer.__table__.insert(), {'name': 'Customer', 'email': 'c@example.com', 'phone': '0710000000',
+                                                   'created_at': now, 'updated_at': now, 'is_deleted': False})
+        conn.execute(Service.__table__.insert(), {'name': 'Service', 'price': 100.0,
+                                                  'created_at': now, 'updated_at': now, 'is_deleted': False})
+        conn.execute(Bill.__table__.insert(), {'bill_number': 'BENCH-0000001', 'customer_id': 1, 'total': 0,
+                                               'date': date.today(), 'created_at': now, 'updated_at': now,
+                                               'is_deleted': False})
+        conn.commit()
+        triggers = conn.exec_driver_sql(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_bill_items_version_%'"
+        ).all()
+
+        def set_triggers(on):
+            for name, sql in triggers:
+                conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
+                if on:
+                    conn.exec_driver_sql(sql)
+            conn.commit()
+
+        items = BillItem.__table__
+        row = {'bill_id': 1, 'service_id': 1, 'quantity': 1, 'unit_price': 100.0, 'line_total': 100.0,
+               'created_at': now, 'updated_at': now}
+        # Rows are generated inside SQLite, so Python parameter handling doesn't drown the difference.
+        bulk_insert = (
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+            "INSERT INTO bill_items (bill_id, service_id, quantity, unit_price, line_total, created_at, updated_at) "
+            "SELECT 1, 1, 1, 100.0, 100.0, ?, ? FROM n"
+        )
+        statements = (
+            ('insert', lambda: conn.exec_driver_sql(bulk_insert, (args.rows, str(now), str(now)))),
+            ('update', lambda: conn.execute(items.update().values(quantity=items.c.quantity + 1))),
+            ('delete', lambda: conn.execute(items.delete())),
+        )
+        best = {(on, label): float('inf') for on in (True, False) for label, _ in statements}
+        for _ in range(args.repeat):
+            for on in (True, False):
+                set_triggers(on)
+                for label, run in statements:
+                    start = time.perf_counter()
+                    run()
+                    conn.commit()
+                    best[on, label] = min(best[on, label], time.perf_counter() - start)
+
+        single = {}
+        for on in (True, False):
+            set_triggers(on)
+            timings = []
+            for _ in range(SINGLE_ROW_WRITES):
+                start = time.perf_counter()
+                conn.execute(items.insert(), row)
+                conn.commit()
+                timings.append(time.perf_counter() - start)
+            single[on] = statistics.median(timings)
+        set_triggers(True)
+
+    print(f"{args.rows} bill_items rows, best of {args.repeat}")
+    print(f"{'statement':<22}{'triggers':>11}{'none':>11}{'per row':>11}")
+    for label, _ in statements:
+        with_t, without = best[True, label], best[False, label]
+        print(f"{label + ' all rows':<22}{with_t * 1e3:>9.1f}ms{without * 1e3:>9.1f}ms"
+              f"{(with_t - without) / args.rows * 1e6:>9.2f}us")
+    print(f"{'1 row + commit (p50)':<22}{single[True] * 1e6:>9.0f}us{single[False] * 1e6:>9.0f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""In-process read-through cache for the customer and service catalogs.
+
+Both tables are small and rarely change, yet every bill write looks rows up
+by id and the Bills page loads both full lists on each visit. Each catalog
+keeps:
+
+- an LRU of active rows by id (CATALOG_CACHE_SIZE entries), used by bill
+  validation;
+- the full active list as served by the unfiltered list endpoint.
+
+Rows are plain dicts in the list-response shape (see api/serializers.py) and
+are shared between requests, so callers must not modify them.
+
+Every write to a catalog must call `invalidate()` after its commit. That bumps
+the catalog's version: entries read from the database before the bump are
+never stored, so a lookup racing a write cannot put stale rows back.
+CATALOG_CACHE_SIZE = 0 turns caching off; lookups then always read through.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Customer, Service
+from api.serializers import CUSTOMER_FIELDS, SERVICE_FIELDS, rows_to_dicts
+
+DEFAULT_SIZE = 10000
+_CHUNK = 500
+
+
+class CatalogCache:
+    def __init__(self, model, fields, maxsize=DEFAULT_SIZE):
+        self.model = model
+        self.fields = fields
+        self.maxsize = maxsize
+        self.version = 0
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()
+        self._list = None
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.list_hits = 0
+        self.list_misses = 0
+        self.invalidations = 0
+
+    def _select(self):
+        return select(*[expr.label(key) for key, expr in self.fields]).where(self.model.is_deleted == False)
+
+    def _store(self, version, rows):
+        """Remember `rows` unless the catalog changed since `version` was read. Needs the lock."""
+        if version != self.version or not self.maxsize:
+            return
+        for row in rows:
+            self._rows[row['id']] = row
+            self._rows.move_to_end(row['id'])
+        while len(self._rows) > self.maxsize:
+            self._rows.popitem(last=False)
+
+    def get_many(self, ids):
+        """{id: row} for the active rows among `ids`; unknown or deleted ids are left out."""
+        found, missing = {}, []
+        with self._lock:
+            version = self.version
+            for row_id in set(ids):
+                row = self._rows.get(row_id)
+                if row is None:
+                    missing.append(row_id)
+                else:
+                    self._rows.move_to_end(row_id)
+                    found[row_id] = row
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        loaded = []
+        for i in range(0, len(missing), _CHUNK):
+            stmt = self._select().where(self.model.id.in_(missing[i:i + _CHUNK]))
+            loaded.extend(rows_to_dicts(self.fields, db.session.execute(stmt)))
+        if loaded:
+            with self._lock:
+                self._store(version, loaded)
+            found.update((row['id'], row) for row in loaded)
+        return found
+
+    def get(self, row_id):
+        return self.get_many([row_id]).get(row_id)
+
+    def all(self):
+        """Every active row, as GET /api/<catalog> returns them."""
+        with self._lock:
+            rows = self._list
+            version = self.version
+            if rows is not None:
+                self.list_hits += 1
+                return rows
+            self.list_misses += 1
+
+        rows = rows_to_dicts(self.fields, db.session.execute(self._select()))
+        with self._lock:
+            if version == self.version and self.maxsize:
+                self._list = rows
+                # The list also warms the id lookups bill validation uses.
+                self._store(version, rows[-self.maxsize:])
+        return rows
+
+    def invalidate(self, ids=None):
+        """Forget `ids` (or every row) and the cached list; call after the write commits."""
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self._list = None
+            if ids is None:
+                self._rows.clear()
+            else:
+                for row_id in ids:
+                    self._rows.pop(row_id, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            lists = self.list_hits + self.list_misses
+            return {
+                'size': len(self._rows),
+                'maxsize': self.maxsize,
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'list_hits': self.list_hits,
+                'list_misses': self.list_misses,
+                'list_hit_rate': round(self.list_hits / lists, 4) if lists else None,
+                'invalidations': self.invalidations,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._reset_counters()
+
+
+def init_app(app):
+    """Give `app` its own customer and service caches (sized by CATALOG_CACHE_SIZE)."""
+    size = app.config.get('CATALOG_CACHE_SIZE', DEFAULT_SIZE)
+    app.extensions['catalog_cache'] = {
+        'customers': CatalogCache(Customer, CUSTOMER_FIELDS, size),
+        'services': CatalogCache(Service, SERVICE_FIELDS, size),
+    }
+
+
+def customers():
+    return current_app.extensions['catalog_cache']['customers']
+
+
+def services():
+    return current_app.extensions['catalog_cache']['services']
+
+
+def stats():
+    return {name: cache.stats() for name, cache in current_app.extensions['catalog_cache'].items()}
+
+
+def reset_stats():
+    for cache in current_app.extensions['catalog_cache'].values():
+        cache.reset_stats()
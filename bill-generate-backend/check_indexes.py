@@ -0,0 +1,70 @@
+"""Print SQLite's EXPLAIN QUERY PLAN for the hot listing / lookup queries.
+
+Migrates the configured database first (see migrations.py), then checks that
+each query is answered through the expected index. Exits with status 1 if any
+of them falls back to a full table scan.
+
+Each query is explained exactly as the app sends it: compiled by the engine
+with its values as bound parameters, not inlined as literals. Whether a
+partial index (`WHERE is_deleted = 0`) is usable depends on what the planner
+sees in the WHERE clause, so a literal-bound copy of the SQL can get a
+different plan from the statement the app really runs.
+"""
+import sys
+from datetime import date
+
+from sqlalchemy import event
+
+from app import create_app
+from models import db, Bill, BillItem, Customer, Service
+
+
+def hot_queries():
+    return [
+        ('bill listing', 'ix_bills_deleted_date',
+         Bill.query.filter_by(is_deleted=False).order_by(Bill.date.desc(), Bill.id.desc()).limit(50)),
+        ('bills by date range', 'ix_bills_deleted_date',
+         Bill.query.filter_by(is_deleted=False)
+         .filter(Bill.date >= date(2025, 1, 1), Bill.date <= date(2025, 1, 31))),
+        ('bills by customer', 'ix_bills_customer_id',
+         Bill.query.filter_by(is_deleted=False, customer_id=1)),
+        ('items of listed bills', 'ix_bill_items_bill_id',
+         BillItem.query.filter(BillItem.bill_id.in_([1, 2, 3]))),
+        ('items using a service', 'ix_bill_items_service_id',
+         BillItem.query.filter_by(service_id=1)),
+        ('customer listing', 'ix_customers_active_name',
+         Customer.query.filter_by(is_deleted=False).order_by(Customer.name, Customer.id).limit(50)),
+        ('service listing', 'ix_services_active_name',
+         Service.query.filter_by(is_deleted=False).order_by(Service.name, Service.id).limit(50)),
+    ]
+
+
+def explain(conn, statement):
+    """Steps of the query plan for `statement`, run with its bound parameters."""
+    def prefix(conn, cursor, sql, parameters, context, executemany):
+        return f"EXPLAIN QUERY PLAN {sql}", parameters
+
+    event.listen(conn, 'before_cursor_execute', prefix, retval=True)
+    try:
+        # The rows are plan steps, not the statement's columns: read the cursor.
+        return [row[3] for row in conn.execute(statement).cursor.fetchall()]
+    finally:
+        event.remove(conn, 'before_cursor_execute', prefix)
+
+
+def main():
+    app = create_app()
+    failures = 0
+    with app.app_context(), db.engine.connect() as conn:
+        for label, index_name, query in hot_queries():
+            plan = explain(conn, query.statement)
+            ok = any(index_name in step for step in plan)
+            failures += 0 if ok else 1
+            print(f"[{'OK' if ok else 'MISSING'}] {label} (expects {index_name})")
+            for step in plan:
+                print(f"    {step}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,8 +9,86 @@ else:
     # Running as script
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+# PRAGMAs applied to every new SQLite connection, by profile name.
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal, readers block writers.
+    'default': {},
+    # WAL lets readers run alongside a writer; busy_timeout makes a blocked
+    # writer wait instead of failing with "database is locked".
+    'concurrent': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -20000,       # negative = KiB, ~20 MB per connection
+        'mmap_size': 268435456,     # 256 MB
+        'temp_store': 'MEMORY',
+    },
+}
+
 class Config:
     # Database filename set to 'abc bill db.db' as requested
-    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(BASE_DIR, 'abc bill db.db')}"
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'BILL_DATABASE_URI', f"sqlite:///{os.path.join(BASE_DIR, 'abc bill db.db')}"
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = 'your-secret-key-here'
+
+    # gzip list responses larger than JSON_GZIP_MIN_SIZE bytes when the client
+    # sends Accept-Encoding: gzip (BILL_JSON_GZIP=0 to turn off)
+    JSON_GZIP = os.environ.get('BILL_JSON_GZIP', '1') != '0'
+    JSON_GZIP_MIN_SIZE = 1024
+    JSON_GZIP_LEVEL = 5
+
+    # Rendered invoice PDFs (see invoice_pdf.py)
+    PDF_CACHE_DIR = os.path.join(BASE_DIR, 'pdf_cache')
+    # Processes in the shared batch render pool; 0 = one per available core
+    PDF_WORKERS = int(os.environ.get('BILL_PDF_WORKERS', 0))
+
+    # Background jobs (see jobs.py): worker threads, how many jobs may be
+    # queued or running at once, and where / how long result files are kept
+    JOB_WORKERS = int(os.environ.get('BILL_JOB_WORKERS', 2))
+    JOB_QUEUE_LIMIT = int(os.environ.get('BILL_JOB_QUEUE_LIMIT', 20))
+    JOB_RESULTS_DIR = os.path.join(BASE_DIR, 'job_results')
+    JOB_RETENTION_DAYS = int(os.environ.get('BILL_JOB_RETENTION_DAYS', 7))
+
+    # HTTP server. `python app.py --production` (or BILL_SERVER=production)
+    # serves through waitress instead of Werkzeug's development server; the
+    # frozen build always does. Keep SERVER_THREADS <= the connection pool.
+    SERVER_MODE = os.environ.get('BILL_SERVER', 'production' if getattr(sys, 'frozen', False) else 'dev')
+    SERVER_HOST = os.environ.get('BILL_HOST', '127.0.0.1')
+    SERVER_PORT = int(os.environ.get('BILL_PORT', 5000))
+    SERVER_THREADS = int(os.environ.get('BILL_SERVER_THREADS', 8))
+    SERVER_BACKLOG = int(os.environ.get('BILL_SERVER_BACKLOG', 1024))
+    # Seconds an idle keep-alive connection is held open
+    SERVER_CHANNEL_TIMEOUT = int(os.environ.get('BILL_SERVER_KEEPALIVE', 120))
+
+    # Per-request query / serialization timing (Server-Timing header and
+    # GET /api/metrics). Off by default so the desktop app doesn't pay for it;
+    # BILL_METRICS=1 turns it on (the benchmarks do)
+    METRICS_ENABLED = os.environ.get('BILL_METRICS', '0') == '1'
+
+    # Development aids (see query_debug.py): BILL_QUERY_DEBUG=1 flags
+    # repeated query shapes per request; BILL_SLOW_QUERY_MS=<ms> logs slower
+    # statements with their query plan to SLOW_QUERY_LOG
+    QUERY_DEBUG = os.environ.get('BILL_QUERY_DEBUG') == '1'
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('BILL_N_PLUS_ONE_THRESHOLD', 5))
+    SLOW_QUERY_MS = float(os.environ.get('BILL_SLOW_QUERY_MS', 0))
+    SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'slow_queries.log')
+
+    # Customers / services kept in memory for bill validation and the full
+    # list endpoints (see catalog_cache.py); 0 turns the cache off
+    CATALOG_CACHE_SIZE = int(os.environ.get('BILL_CATALOG_CACHE_SIZE', 10000))
+
+    # Engine profile, overridable with BILL_DB_PROFILE=default|concurrent
+    SQLITE_PROFILE = os.environ.get('BILL_DB_PROFILE', 'concurrent')
+    # One pooled connection per server thread; connections are shared across
+    # threads by the pool, so sqlite3's same-thread check must be off.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('BILL_DB_POOL_SIZE', 8)),
+        'max_overflow': 8,
+        'pool_timeout': 30,
+        'connect_args': {
+            'timeout': 5,
+            'check_same_thread': False,
+        },
+    }
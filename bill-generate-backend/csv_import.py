@@ -0,0 +1,210 @@
+"""Streaming CSV import for the customer and service catalogs.
+
+The upload is decoded and parsed as it is read, rows are validated and
+inserted IMPORT_BATCH_SIZE at a time with one executemany INSERT and one
+commit per batch, and only the first MAX_REPORTED_ERRORS row errors are kept,
+so memory stays flat however large the file is. Valid rows are imported and
+invalid ones skipped; each skipped row is reported by its line in the file.
+A row the database rejects (a constraint the row check missed) is reported
+the same way instead of failing its batch.
+
+A raw text/csv request body is parsed straight off the socket; a multipart
+`file` upload is spooled to a temporary file by Werkzeug first.
+
+`submit_import_job()` runs an import as a background job instead: the upload
+is copied to JOB_RESULTS_DIR, and the job imports it from there and deletes
+it. The job's result file is the summary as JSON.
+"""
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+import jobs
+from models import db
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+CSV_MIMETYPES = ('text/csv', 'text/plain', 'application/csv', 'application/octet-stream')
+
+UPLOAD_PREFIX = 'upload-'
+
+
+class CsvImportError(ValueError):
+    """The upload as a whole can't be imported (no file, bad header, unreadable data).
+
+    `summary` is the import summary so far when the error hit mid-file, after
+    earlier batches were committed; None when nothing was imported.
+    """
+
+    def __init__(self, message, summary=None):
+        super().__init__(message)
+        self.summary = summary
+
+
+def upload_stream(request):
+    """The binary stream of a CSV upload: multipart field `file`, or the raw body."""
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            raise CsvImportError('Multipart uploads must put the CSV in a field named "file"')
+        return upload.stream
+    if request.mimetype in CSV_MIMETYPES:
+        return request.stream
+    raise CsvImportError('Send the CSV as a text/csv request body or a multipart "file" field')
+
+
+def _read_header(reader, columns, required):
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise CsvImportError('The file is empty')
+    positions = {}
+    for index, name in enumerate(header):
+        positions.setdefault(name.strip().lower(), index)
+    missing = [name for name in required if name not in positions]
+    if missing:
+        raise CsvImportError(f"Missing required column(s): {', '.join(missing)}")
+    return [(name, positions.get(name)) for name in columns]
+
+
+def import_csv(stream, model, columns, required, convert_row, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Import the CSV in binary `stream` into `model`'s table.
+
+    The header row names the columns (any order, case-insensitive; unknown
+    columns are ignored). Each data row becomes {column: stripped text} for
+    `columns`, and `convert_row(record)` returns the dict to insert or raises
+    ValueError with the message to report. Returns a summary dict; a
+    CsvImportError raised mid-file carries the summary up to that point.
+    `progress(summary)`, if given, is called after each committed batch.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    summary = {'rows': 0, 'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+    def fail(line, message):
+        summary['failed'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line, 'message': message})
+        else:
+            summary['errors_truncated'] = True
+
+    def flush(batch):
+        if not batch:
+            return
+        try:
+            db.session.execute(insert(model), [row for _, row in batch])
+            db.session.commit()
+            summary['imported'] += len(batch)
+        except IntegrityError:
+            db.session.rollback()
+            # Retry one row at a time to find the bad ones. A failed INSERT only
+            # undoes itself, so the rest of the batch still commits together.
+            for line, row in batch:
+                try:
+                    db.session.execute(insert(model), row)
+                except IntegrityError as e:
+                    fail(line, f'Rejected by the database: {getattr(e, "orig", e)}')
+                else:
+                    summary['imported'] += 1
+            db.session.commit()
+        if progress is not None:
+            progress(summary)
+
+    try:
+        layout = _read_header(reader, columns, required)
+        batch = []
+        for row in reader:
+            if not any(field.strip() for field in row):
+                continue
+            summary['rows'] += 1
+            record = {
+                name: row[index].strip() if index is not None and index < len(row) else ''
+                for name, index in layout
+            }
+            try:
+                batch.append((reader.line_num, convert_row(record)))
+            except ValueError as e:
+                fail(reader.line_num, str(e))
+                continue
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        flush(batch)
+    except (csv.Error, UnicodeDecodeError) as e:
+        db.session.rollback()
+        raise CsvImportError(
+            f"Near line {reader.line_num + 1}: {e}; {summary['imported']} rows were imported before it",
+            summary,
+        )
+    finally:
+        # The stream belongs to the request; don't let the wrapper close it.
+        text.detach()
+    return summary
+
+
+def _spooled_path(params):
+    """Path of the spooled upload named by a job's params; CsvImportError if it isn't one."""
+    name = params.get('upload')
+    if not isinstance(name, str) or os.path.basename(name) != name or not name.startswith(UPLOAD_PREFIX):
+        raise CsvImportError('upload must name a spooled CSV upload')
+    return os.path.join(current_app.config['JOB_RESULTS_DIR'], name)
+
+
+def validate_import_job(params):
+    if not os.path.exists(_spooled_path(params)):
+        raise CsvImportError('The uploaded file no longer exists')
+
+
+def remove_spooled_upload(params):
+    try:
+        os.remove(_spooled_path(params))
+    except (CsvImportError, FileNotFoundError):
+        pass
+
+
+def submit_import_job(request, kind):
+    """Copy the request's CSV upload to JOB_RESULTS_DIR and queue `kind` to import it."""
+    stream = upload_stream(request)
+    directory = current_app.config['JOB_RESULTS_DIR']
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=UPLOAD_PREFIX, suffix='.csv', dir=directory)
+    params = {'upload': os.path.basename(path)}
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            shutil.copyfileobj(stream, fh, 1024 * 1024)
+        return jobs.runner().submit(kind, params)
+    except BaseException:
+        remove_spooled_upload(params)
+        raise
+
+
+def run_import_job(job, params, model, columns, required, convert_row, noun):
+    """Body of an import job: import the spooled upload, reporting progress by bytes read.
+
+    Batches committed before a cancellation or a mid-file error stay imported.
+    """
+    path = _spooled_path(params)
+
+    def progress(summary):
+        job.progress(fh.tell(), message=f"Imported {summary['imported']} of {summary['rows']} {noun}")
+
+    with open(path, 'rb') as fh:
+        job.progress(0, os.fstat(fh.fileno()).st_size)
+        try:
+            summary = import_csv(fh, model, columns, required, convert_row, progress=progress)
+        except CsvImportError as e:
+            if e.summary is not None:
+                job.message = f"Imported {e.summary['imported']} of {e.summary['rows']} {noun} before the error"
+            raise
+        job.progress(job.total)
+    with open(job.result_file(f'{noun}-import.json'), 'w', encoding='utf-8') as out:
+        json.dump(summary, out)
+    return f"Imported {summary['imported']} of {summary['rows']} {noun}"
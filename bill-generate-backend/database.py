@@ -0,0 +1,24 @@
+from sqlalchemy import event
+
+from config import SQLITE_PROFILES
+
+
+def apply_sqlite_profile(engine, profile):
+    """Run the profile's PRAGMAs on every connection `engine` opens.
+
+    Must be called before the engine hands out its first connection.
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}' (expected one of: {', '.join(SQLITE_PROFILES)})")
+    pragmas = SQLITE_PROFILES[profile]
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
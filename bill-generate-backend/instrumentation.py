@@ -0,0 +1,187 @@
+"""Per-request SQL / serialization timing and per-route histograms.
+
+When METRICS_ENABLED is on, engine events count and time every statement a
+request runs, JSON encoding is timed, and each response gets a
+`Server-Timing: db;dur=..;desc="N queries", serialize;dur=.., total;dur=..`
+header. Latency and query-count histograms per route are kept in memory and
+served by GET /api/metrics.
+
+When it is off nothing is registered: the only cost left is the
+`record_serialize()` call in the JSON helpers, which returns at once.
+"""
+import threading
+import time
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_local = threading.local()
+
+
+class Histogram:
+    """Fixed buckets: counts[i] holds values in (bounds[i-1], bounds[i]];
+    the last slot holds everything above the top bound."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None when empty / overflow)."""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self):
+        return {
+            'counts': list(self.counts),
+            'count': self.total,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.total, 3) if self.total else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class RouteMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, latency_ms, queries, db_ms):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {
+                    'latency_ms': Histogram(LATENCY_BUCKETS_MS),
+                    'queries': Histogram(QUERY_BUCKETS),
+                    'db_ms': Histogram(LATENCY_BUCKETS_MS),
+                }
+            entry['latency_ms'].observe(latency_ms)
+            entry['queries'].observe(queries)
+            entry['db_ms'].observe(db_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: {name: histogram.to_dict() for name, histogram in entry.items()}
+                for route, entry in sorted(self._routes.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+metrics = RouteMetrics()
+
+
+class _RequestStats:
+    __slots__ = ('started', 'queries', 'db', 'serialize')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+
+
+def current_stats():
+    """Stats for the request running on this thread, or None."""
+    return getattr(_local, 'stats', None)
+
+
+def record_serialize(seconds):
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats.serialize += seconds
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with jsonify() encoding counted as serialize time."""
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            record_serialize(time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats.queries += 1
+        stats.db += time.perf_counter() - started
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute.
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _before_request():
+    _local.stats = _RequestStats()
+
+
+def _after_request(response):
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        return response
+    total_ms = (time.perf_counter() - stats.started) * 1000
+    db_ms = stats.db * 1000
+    response.headers['Server-Timing'] = (
+        f'db;dur={db_ms:.2f};desc="{stats.queries} queries", '
+        f'serialize;dur={stats.serialize * 1000:.2f}, total;dur={total_ms:.2f}'
+    )
+    rule = request.url_rule
+    if rule is not None:
+        metrics.observe(f'{request.method} {rule.rule}', total_ms, stats.queries, db_ms)
+    return response
+
+
+def _teardown_request(exc):
+    _local.stats = None
+
+
+def init_app(app, engine):
+    """Hook the timing into `app` and `engine` if METRICS_ENABLED is set."""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    app.json = TimedJSONProvider(app)
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,368 @@
+"""Server-side invoice PDF rendering with an on-disk cache.
+
+Pure Python: the PDF is written by hand using the 14 standard PDF fonts
+(Helvetica / Helvetica-Bold), so no extra packages are needed and it works in
+the PyInstaller build. The layout follows components/BillPDF.jsx.
+
+Rendered files are cached as `<bill id>-<key>.pdf`, where the key covers the
+`updated_at` of the bill, its customer and its line items' services, and
+TEMPLATE_HASH; `invalidate()` removes a bill's cached files when it changes.
+"""
+import glob
+import hashlib
+import io
+import os
+import threading
+import zlib
+
+# Bump when the layout below changes so cached PDFs are re-rendered.
+TEMPLATE_VERSION = 2
+
+COMPANY = {
+    'name': 'ABC Graphics',
+    'tagline': 'Creativity Beyond Limits!',
+    'contact': 'Polonnaruwa  •  www.abcgraphics.lk  •  071 523 4993',
+    'email': 'abceditinggraphic@gmail.com',
+    'footer_contact': '075 971 5913 (Call)  •  071 523 4993 (WhatsApp)  •  www.abcgraphics.lk',
+}
+
+PAYMENT_ACCOUNTS = (
+    ('BANK OF CEYLON', '92339910', 'H.K.B.S.Rathanasiri', 'Kaduruwela Branch'),
+    ('PEOPLES BANK', '005200170090177', 'H.K.B.S.Rathnasiri', 'Polonnaruwa Branch'),
+    ('NDB BANK', '115511917281', 'H.K.B.S.Rathnasiri', 'Boralasgamuwa Branch'),
+)
+
+TEMPLATE_HASH = hashlib.sha256(
+    repr((TEMPLATE_VERSION, COMPANY, PAYMENT_ACCOUNTS)).encode('utf-8')
+).hexdigest()[:16]
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89   # A4 in points
+MARGIN = 40
+
+DARK = (0.122, 0.161, 0.216)     # #1f2937
+MUTED = (0.820, 0.835, 0.859)    # #d1d5db
+TEXT = (0.067, 0.094, 0.153)     # #111827
+GRAY = (0.420, 0.447, 0.502)     # #6b7280
+STRIPE = (0.953, 0.957, 0.965)   # #f3f4f6
+GREEN = (0.086, 0.639, 0.290)    # #16a34a
+WHITE = (1, 1, 1)
+
+# Advance widths (1/1000 em) for WinAnsi codes 32..126, from the standard AFM files.
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+_FONTS = {
+    'F1': ('Helvetica', _HELVETICA_WIDTHS),
+    'F2': ('Helvetica-Bold', _HELVETICA_BOLD_WIDTHS),
+}
+
+
+def _encode(text):
+    return str(text).encode('cp1252', errors='replace')
+
+
+def text_width(text, font, size):
+    widths = _FONTS[font][1]
+    total = 0
+    for code in _encode(text):
+        total += widths[code - 32] if 32 <= code <= 126 else 556
+    return total * size / 1000.0
+
+
+def _escape(raw):
+    return raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _money(value):
+    return f"Rs. {float(value or 0):,.2f}"
+
+
+class _Canvas:
+    """Collects content-stream operators for one page (origin at top-left)."""
+
+    def __init__(self):
+        self.ops = []
+
+    def rect(self, x, y, w, h, color):
+        self.ops.append(b'%.3f %.3f %.3f rg %.2f %.2f %.2f %.2f re f' % (
+            *color, x, PAGE_HEIGHT - y - h, w, h))
+
+    def line(self, x1, y1, x2, y2, color, width=0.5):
+        self.ops.append(b'%.3f %.3f %.3f RG %.2f w %.2f %.2f m %.2f %.2f l S' % (
+            *color, width, x1, PAGE_HEIGHT - y1, x2, PAGE_HEIGHT - y2))
+
+    def text(self, x, y, value, size=10, font='F1', color=TEXT, align='left', max_width=None):
+        value = str(value)
+        if max_width is not None:
+            while value and text_width(value, font, size) > max_width:
+                value = value[:-2] + '…' if len(value) > 1 else ''
+        if align == 'right':
+            x -= text_width(value, font, size)
+        elif align == 'center':
+            x -= text_width(value, font, size) / 2
+        self.ops.append(b'BT %.3f %.3f %.3f rg /%s %.1f Tf %.2f %.2f Td (%s) Tj ET' % (
+            *color, font.encode('ascii'), size, x, PAGE_HEIGHT - y, _escape(_encode(value))))
+
+    def stream(self):
+        return b'\n'.join(self.ops)
+
+
+def _write_pdf(pages):
+    """Assemble page content streams into a complete PDF document."""
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages_obj = add(None)
+    fonts = {
+        name: add(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>'
+                  % base.encode('ascii'))
+        for name, (base, _) in _FONTS.items()
+    }
+    font_dict = b' '.join(b'/%s %d 0 R' % (name.encode('ascii'), num) for name, num in fonts.items())
+
+    page_ids = []
+    for content in pages:
+        data = zlib.compress(content, 6)
+        stream_id = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(data), data))
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /Font << %s >> >> /Contents %d 0 R >>'
+            % (pages_obj, PAGE_WIDTH, PAGE_HEIGHT, font_dict, stream_id)
+        ))
+
+    objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages_obj
+    objects[pages_obj - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % pid for pid in page_ids), len(page_ids))
+
+    out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (num, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def _header(page, bill):
+    page.rect(0, 0, PAGE_WIDTH, 120, DARK)
+    page.text(MARGIN, 48, COMPANY['name'], 22, 'F2', WHITE)
+    page.text(MARGIN, 66, COMPANY['tagline'], 10, 'F1', MUTED)
+    page.text(MARGIN, 86, COMPANY['contact'], 8.5, 'F1', MUTED)
+    page.text(MARGIN, 99, COMPANY['email'], 8.5, 'F1', MUTED)
+
+    right = PAGE_WIDTH - MARGIN
+    page.text(right, 50, 'INVOICE', 24, 'F2', WHITE, align='right')
+    page.text(right, 70, f"#{bill['bill_number']}", 11, 'F2', WHITE, align='right')
+    page.text(right, 88, f"Date: {bill.get('date') or ''}", 9, 'F1', MUTED, align='right')
+
+
+def _table_header(page, y, cols):
+    page.rect(MARGIN, y, PAGE_WIDTH - 2 * MARGIN, 22, DARK)
+    for label, x, align in (('DESCRIPTION', cols[0], 'left'), ('QTY', cols[1], 'center'),
+                            ('UNIT PRICE', cols[2], 'right'), ('AMOUNT', cols[3], 'right')):
+        page.text(x, y + 15, label, 8.5, 'F2', WHITE, align=align)
+    return y + 22
+
+
+def _footer(page, number, count, year):
+    top = PAGE_HEIGHT - 78
+    page.rect(0, top, PAGE_WIDTH, 78, DARK)
+    center = PAGE_WIDTH / 2
+    page.text(center, top + 22, f"Thank you for choosing {COMPANY['name']}!", 11, 'F2', WHITE, align='center')
+    page.text(center, top + 37, 'We appreciate your business and look forward to serving you again',
+              8.5, 'F1', MUTED, align='center')
+    page.text(center, top + 53, COMPANY['footer_contact'], 8, 'F1', MUTED, align='center')
+    page.text(center, top + 67, f"© {year} {COMPANY['name']}. All rights reserved."
+              f"    Page {number} of {count}", 7.5, 'F1', GRAY, align='center')
+
+
+def render_invoice(bill):
+    """Render one invoice to PDF bytes.
+
+    `bill` is a plain dict like `Bill.to_dict()` plus optional customer_email /
+    customer_phone / customer_address keys. Pure function of its input, so it
+    can run in worker processes.
+    """
+    pages = []
+    page = _Canvas()
+    pages.append(page)
+    _header(page, bill)
+
+    y = 150
+    page.text(MARGIN, y, 'BILL TO', 9, 'F2', GRAY)
+    y += 18
+    page.text(MARGIN, y, bill.get('customer_name') or 'Unknown', 13, 'F2', TEXT)
+    for key in ('customer_email', 'customer_phone', 'customer_address'):
+        if bill.get(key):
+            y += 15
+            page.text(MARGIN, y, bill[key], 9.5, 'F1', GRAY, max_width=PAGE_WIDTH - 2 * MARGIN - 90)
+    if bill.get('is_paid'):
+        badge_x = PAGE_WIDTH - MARGIN - 70
+        page.rect(badge_x, 156, 70, 22, GREEN)
+        page.text(badge_x + 35, 171, 'PAID', 11, 'F2', WHITE, align='center')
+
+    y += 32
+    page.text(MARGIN, y, 'SERVICES / ITEMS', 10, 'F2', TEXT)
+    y += 10
+    content_width = PAGE_WIDTH - 2 * MARGIN
+    cols = (MARGIN + 10, MARGIN + content_width * 0.55, MARGIN + content_width * 0.80,
+            PAGE_WIDTH - MARGIN - 10)
+    y = _table_header(page, y, cols)
+
+    bottom = PAGE_HEIGHT - 100
+    subtotal = 0.0
+    for index, item in enumerate(bill.get('items') or []):
+        if y + 20 > bottom:
+            page = _Canvas()
+            pages.append(page)
+            y = _table_header(page, MARGIN, cols)
+        if index % 2:
+            page.rect(MARGIN, y, content_width, 20, STRIPE)
+        amount = float(item.get('quantity') or 0) * float(item.get('unit_price') or 0)
+        subtotal += amount
+        page.text(cols[0], y + 14, item.get('service_name') or '', 9.5, 'F1', TEXT,
+                  max_width=cols[1] - cols[0] - 40)
+        page.text(cols[1], y + 14, item.get('quantity'), 9.5, 'F1', TEXT, align='center')
+        page.text(cols[2], y + 14, _money(item.get('unit_price')), 9.5, 'F1', TEXT, align='right')
+        page.text(cols[3], y + 14, _money(amount), 9.5, 'F1', TEXT, align='right')
+        y += 20
+    page.line(MARGIN, y, PAGE_WIDTH - MARGIN, y, MUTED)
+
+    # Totals + payment methods need ~200pt; start a new page if they don't fit.
+    if y + 210 > bottom:
+        page = _Canvas()
+        pages.append(page)
+        y = MARGIN
+    box_x = PAGE_WIDTH - MARGIN - 220
+    y += 16
+    page.text(box_x, y + 12, 'Subtotal', 10, 'F1', GRAY)
+    page.text(PAGE_WIDTH - MARGIN - 10, y + 12, _money(subtotal), 10, 'F1', TEXT, align='right')
+    y += 22
+    page.rect(box_x - 10, y, 230, 28, DARK)
+    page.text(box_x, y + 18, 'TOTAL AMOUNT', 11, 'F2', WHITE)
+    page.text(PAGE_WIDTH - MARGIN - 10, y + 18, _money(bill.get('total')), 12, 'F2', WHITE, align='right')
+
+    y += 56
+    page.text(MARGIN, y, 'PAYMENT METHODS', 10, 'F2', TEXT)
+    y += 10
+    card_width = (content_width - 20) / 3
+    for i, (bank, account, holder, branch) in enumerate(PAYMENT_ACCOUNTS):
+        x = MARGIN + i * (card_width + 10)
+        page.rect(x, y, card_width, 62, STRIPE)
+        page.text(x + 8, y + 15, bank, 9, 'F2', TEXT)
+        page.text(x + 8, y + 30, account, 10, 'F2', DARK)
+        page.text(x + 8, y + 43, holder, 8.5, 'F1', GRAY)
+        page.text(x + 8, y + 55, branch, 8.5, 'F1', GRAY)
+    page.text(MARGIN, y + 80, '* Please send the payment slip to us after payment', 8.5, 'F1', GRAY)
+
+    # The bill's own year, not today's: the output must not depend on when
+    # it was rendered, or cached PDFs would go stale on New Year's Day.
+    year = str(bill.get('date') or bill.get('created_at') or '')[:4]
+    for number, canvas in enumerate(pages, start=1):
+        _footer(canvas, number, len(pages), year)
+    return _write_pdf([canvas.stream() for canvas in pages])
+
+
+def cache_key(*parts):
+    """Cache key for a bill's PDF; `parts` are the values the output depends on."""
+    raw = '|'.join(str(part) for part in (*parts, TEMPLATE_HASH))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:24]
+
+
+def cache_path(cache_dir, bill_id, key):
+    return os.path.join(cache_dir, f"{int(bill_id)}-{key}.pdf")
+
+
+def write_cached(path, data):
+    """Write atomically so concurrent readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def invalidate(cache_dir, bill_ids):
+    """Remove every cached PDF of the given bills."""
+    for bill_id in bill_ids:
+        for path in glob.glob(os.path.join(cache_dir, f"{int(bill_id)}-*.pdf")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_pool(size):
+    """The process pool shared by every PDF batch, started with `size` processes on first use.
+
+    One pool per process: later calls return it whatever `size` they pass, so
+    requests can't each start their own set of processes. Uses the spawn start
+    method on every platform: forking a multi-threaded server is unsafe, and
+    spawn is what Windows / the frozen build use anyway.
+    """
+    global _pool
+    # Imported here: only batch exports need it, and it slows startup.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=size, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+class ZipStream(io.RawIOBase):
+    """Write-only, non-seekable sink for zipfile.ZipFile; `pop()` drains what was written.
+
+    zipfile falls back to data descriptors when it can't seek, so an archive can
+    be streamed to the client while later entries are still being produced.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -0,0 +1,286 @@
+"""Background jobs: long-running work moved off the request thread.
+
+Exports, PDF batches, rollup rebuilds and database maintenance can take
+longer than the Electron client waits for a response. A blueprint registers
+a handler for its kind of work and hands requests to it:
+
+    @jobs.handler('bill_export', validate=_export_options)
+    def _export_job(job, params):
+        with open(job.result_file('bills.csv'), 'w') as fh:
+            for chunk in ...:
+                job.progress(done, total)     # raises JobCancelled once cancelled
+                fh.write(chunk)
+
+    job = jobs.runner().submit('bill_export', params)    # -> Job row, status 'queued'
+
+Jobs are persisted in the `jobs` table and run on JOB_WORKERS daemon threads
+(SQLite releases the GIL while it works, and PDF batches render on their own
+process pool). At most JOB_QUEUE_LIMIT jobs can be queued or running.
+Progress is kept in memory while a job runs; the row is written when the job
+starts and when it finishes. Cancellation is cooperative: a queued job never
+starts, a running one stops at its next progress()/check() call. Result files
+live in JOB_RESULTS_DIR until the job is deleted or JOB_RETENTION_DAYS pass.
+
+Jobs left queued or running by a previous process are marked failed at startup.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from models import db, Job
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+logger = logging.getLogger('bill.jobs')
+
+# kind -> (run(job, params), validate(params) or None, cleanup(params) or None)
+_handlers = {}
+
+
+class JobError(ValueError):
+    """A job request that can't be accepted; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+def handler(kind, validate=None, cleanup=None):
+    """Register `run(job, params)` for `kind`.
+
+    `validate(params)` runs at submit time, so bad parameters are rejected
+    with a 400 instead of producing a failed job. `run` may return a short
+    message to store with the finished job. `cleanup(params)` runs (in an app
+    context) once the job is over however it ended, even if it was cancelled
+    before it started; use it to remove input files spooled for the job.
+    """
+    def decorator(run):
+        _handlers[kind] = (run, validate, cleanup)
+        return run
+    return decorator
+
+
+def kinds():
+    return sorted(_handlers)
+
+
+class JobContext:
+    """What a handler sees of its job: params, progress reporting, cancellation."""
+
+    def __init__(self, job_id, kind, params, results_dir):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.done = 0
+        self.total = None
+        self.message = None
+        self.result_path = None
+        self.result_name = None
+        self.started = False
+        self._results_dir = results_dir
+        self._cancelled = threading.Event()
+
+    def progress(self, done, total=None, message=None):
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.check()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def result_file(self, name):
+        """Path to write the job's downloadable result to (offered as `name`)."""
+        os.makedirs(self._results_dir, exist_ok=True)
+        self.result_path = os.path.join(self._results_dir, f'{self.id}-{name}')
+        self.result_name = name
+        return self.result_path
+
+
+def _remove(path):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class JobRunner:
+    def __init__(self, app):
+        config = app.config
+        self.app = app
+        self.workers = max(1, config.get('JOB_WORKERS', 2))
+        self.queue_limit = config.get('JOB_QUEUE_LIMIT', 20)
+        self.results_dir = config['JOB_RESULTS_DIR']
+        self.retention = timedelta(days=config.get('JOB_RETENTION_DAYS', 7))
+        self._queue = queue.Queue()
+        self._active = {}   # job id -> JobContext, queued or running in this process
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _start_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'bill-job-{i + 1}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, params=None):
+        """Queue a job; returns its Job row. Call inside an app context."""
+        if kind not in _handlers:
+            raise JobError(f"Unknown job type '{kind}' (expected one of: {', '.join(kinds())})")
+        params = dict(params or {})
+        validate = _handlers[kind][1]
+        if validate is not None:
+            validate(params)
+
+        self.prune()
+        with self._lock:
+            if len(self._active) >= self.queue_limit:
+                raise JobError(f'{len(self._active)} jobs are already queued or running; try again later', 503)
+            job = Job(kind=kind, status=QUEUED, params=json.dumps(params))
+            db.session.add(job)
+            db.session.commit()
+            self._active[job.id] = JobContext(job.id, kind, params, self.results_dir)
+        self._start_workers()
+        self._queue.put(job.id)
+        return job
+
+    def cancel(self, job):
+        """Cancel an active Job row. A queued job is marked cancelled at once;
+        a running one stops at its next progress check."""
+        with self._lock:
+            context = self._active.get(job.id)
+            if context is not None:
+                context._cancelled.set()
+            started = context is not None and context.started
+        if context is None:
+            # Not ours, or it finished after `job` was read.
+            db.session.refresh(job)
+        if not started and job.status in ACTIVE_STATUSES:
+            job.status = CANCELLED
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+    def describe(self, job):
+        """job.to_dict() with live progress for a job running in this process."""
+        data = job.to_dict()
+        with self._lock:
+            context = self._active.get(job.id)
+        if context is not None and context.started and job.status == RUNNING:
+            data['progress'] = Job.progress_dict(context.done, context.total)
+            data['message'] = context.message
+        return data
+
+    def prune(self):
+        """Delete finished jobs (and their files) older than JOB_RETENTION_DAYS."""
+        cutoff = datetime.utcnow() - self.retention
+        expired = db.session.execute(
+            select(Job.id, Job.result_path).where(Job.status.not_in(ACTIVE_STATUSES), Job.finished_at < cutoff)
+        ).all()
+        if not expired:
+            return
+        for _, path in expired:
+            _remove(path)
+        Job.query.filter(Job.id.in_([job_id for job_id, _ in expired])).delete(synchronize_session=False)
+        db.session.commit()
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                with self._lock:
+                    context = self._active.get(job_id)
+                if context is not None:
+                    with self.app.app_context():
+                        try:
+                            self._run(context)
+                        finally:
+                            cleanup = _handlers[context.kind][2]
+                            if cleanup is not None:
+                                cleanup(context.params)
+            except Exception:
+                logger.exception('job %s: could not record its outcome', job_id)
+            finally:
+                with self._lock:
+                    self._active.pop(job_id, None)
+
+    def _run(self, context):
+        with self._lock:
+            if context._cancelled.is_set():
+                return
+            context.started = True
+        job = db.session.get(Job, context.id)
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        status, error = SUCCEEDED, None
+        try:
+            message = _handlers[context.kind][0](context, context.params)
+            if message:
+                context.message = message
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            logger.exception('job %s (%s) failed', context.id, context.kind)
+            status, error = FAILED, str(e)
+        # Drop anything the handler left uncommitted before recording the outcome.
+        db.session.rollback()
+        if status != SUCCEEDED:
+            _remove(context.result_path)
+
+        db.session.execute(
+            update(Job).where(Job.id == context.id).values(
+                status=status,
+                error=error,
+                done=context.done,
+                total=context.total,
+                message=context.message,
+                result_path=context.result_path if status == SUCCEEDED else None,
+                result_name=context.result_name if status == SUCCEEDED else None,
+                finished_at=datetime.utcnow(),
+            )
+        )
+        db.session.commit()
+
+
+def init_app(app):
+    """Attach a JobRunner to `app` and fail jobs a previous process left unfinished.
+
+    Needs an app context and an up-to-date schema.
+    """
+    app.extensions['jobs'] = JobRunner(app)
+    # Core on the table, and a read before any write: touching the ORM here
+    # would configure every mapper at startup, and an UPDATE, even of no
+    # rows, costs a commit.
+    table = Job.__table__
+    interrupted = table.c.status.in_(ACTIVE_STATUSES)
+    with db.engine.connect() as conn:
+        if conn.execute(select(table.c.id).where(interrupted).limit(1)).first() is None:
+            return
+        result = conn.execute(update(table).where(interrupted).values(
+            status=FAILED, error='Interrupted by a server restart', finished_at=datetime.utcnow()
+        ))
+        conn.commit()
+    logger.warning('marked %d interrupted jobs as failed', result.rowcount)
+
+
+def runner():
+    return current_app.extensions['jobs']
@@ -0,0 +1,137 @@
+"""Versioned schema migrations for the SQLite database.
+
+`db.create_all()` only creates missing tables; it never touches an existing
+database. Everything else (indexes, triggers, data backfills) lives here as
+numbered migrations so installed `abc bill db.db` files can be upgraded in
+place. The applied version is stored in SQLite's `PRAGMA user_version`.
+
+Each migration must be idempotent (`IF NOT EXISTS` etc.): SQLite commits DDL
+as it goes, so a migration interrupted half way is simply re-run on the next
+start.
+"""
+
+# Indexes for the hot query paths. SQLite does not index foreign keys on its
+# own, and every listing filters on is_deleted. The customer / service indexes
+# are partial: SQLAlchemy renders `is_deleted = 0` as a literal, which lets the
+# planner use them for the active-rows listings ordered by name.
+_V1_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_bills_deleted_date ON bills (is_deleted, date)",
+    "CREATE INDEX IF NOT EXISTS ix_bills_customer_id ON bills (customer_id, date)",
+    "CREATE INDEX IF NOT EXISTS ix_bill_items_bill_id ON bill_items (bill_id)",
+    "CREATE INDEX IF NOT EXISTS ix_bill_items_service_id ON bill_items (service_id)",
+    "CREATE INDEX IF NOT EXISTS ix_customers_active_name ON customers (name, id) WHERE is_deleted = 0",
+    "CREATE INDEX IF NOT EXISTS ix_services_active_name ON services (name, id) WHERE is_deleted = 0",
+)
+
+
+def _v1_add_indexes(conn):
+    for statement in _V1_INDEXES:
+        conn.exec_driver_sql(statement)
+
+
+def _v2_seed_revenue_rollup(conn):
+    # The table itself is created by db.create_all(); fill it from the bills.
+    from rollups import rebuild_rollup
+    rebuild_rollup(conn)
+
+
+VERSIONED_TABLES = ('customers', 'services', 'bills', 'bill_items')
+
+
+def _v3_add_table_version_triggers(conn):
+    # Row-level triggers catch every write path (ORM, Core bulk statements,
+    # raw SQL), so the counters can't be forgotten by new code. SQLite has no
+    # statement-level triggers, so a statement touching N rows bumps the
+    # version N times: one more update of the same table_versions row per row.
+    # benchmarks/version_trigger_bench.py puts that at roughly 0.2-1.5us per
+    # row on bulk statements (under ~30% of SQLite's own time for a bare
+    # INSERT ... SELECT, lost in the noise next to the Python per-row cost of
+    # an import batch) and no measurable change for single-row writes, where
+    # the commit dominates.
+    for table in VERSIONED_TABLES:
+        conn.exec_driver_sql(
+            f"INSERT OR IGNORE INTO table_versions (name, version) VALUES ('{table}', 0)"
+        )
+        for event, suffix in (('INSERT', 'ins'), ('UPDATE', 'upd'), ('DELETE', 'del')):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{suffix} AFTER {event} ON {table} "
+                f"BEGIN UPDATE table_versions SET version = version + 1 WHERE name = '{table}'; END"
+            )
+
+
+def _v4_add_search_indexes(conn):
+    from search import SEARCH_INDEXES, create_search_index
+    for source in SEARCH_INDEXES:
+        create_search_index(conn, source)
+
+
+def _v5_add_change_log_triggers(conn):
+    # INSERT OR REPLACE drops the row's previous entry, so the log holds one
+    # entry per row and a client only ever downloads a row's latest state.
+    for table in VERSIONED_TABLES:
+        conn.exec_driver_sql(
+            f"INSERT OR IGNORE INTO change_log (table_name, row_id, deleted) "
+            f"SELECT '{table}', id, 0 FROM {table} ORDER BY id"
+        )
+        for event, suffix, row, deleted in (('INSERT', 'ins', 'new', 0),
+                                            ('UPDATE', 'upd', 'new', 0),
+                                            ('DELETE', 'del', 'old', 1)):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_{suffix} AFTER {event} ON {table} "
+                f"BEGIN INSERT OR REPLACE INTO change_log (table_name, row_id, deleted) "
+                f"VALUES ('{table}', {row}.id, {deleted}); END"
+            )
+
+
+# (version, description, callable(conn)) in ascending version order.
+MIGRATIONS = [
+    (1, 'Add hot-path indexes', _v1_add_indexes),
+    (2, 'Seed the daily revenue rollup', _v2_seed_revenue_rollup),
+    (3, 'Add per-table change counters', _v3_add_table_version_triggers),
+    (4, 'Add full-text search indexes', _v4_add_search_indexes),
+    (5, 'Add the change log for delta sync', _v5_add_change_log_triggers),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def run_migrations(engine) -> list:
+    """Apply every pending migration; return the versions that were applied."""
+    applied = []
+    with engine.begin() as conn:
+        current = get_schema_version(conn)
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(conn)
+            # PRAGMA does not accept bound parameters; version is an int literal.
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+            applied.append(version)
+    return applied
+
+
+def schema_is_current(conn, metadata) -> bool:
+    """True when migrations are up to date and every model table exists.
+
+    One PRAGMA plus one sqlite_master read, instead of the per-table checks
+    `create_all()` makes.
+    """
+    if get_schema_version(conn) != LATEST_VERSION:
+        return False
+    existing = set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'").scalars())
+    return set(metadata.tables) <= existing
+
+
+def ensure_schema(engine, metadata) -> bool:
+    """Create missing tables and apply migrations; skipped entirely for an
+    up-to-date database. Returns True if any DDL was run."""
+    with engine.connect() as conn:
+        if schema_is_current(conn, metadata):
+            return False
+    metadata.create_all(engine)
+    run_migrations(engine)
+    return True
@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import json
 
 db = SQLAlchemy()
 
@@ -112,3 +113,94 @@ class BillItem(db.Model):
             'unit_price': self.unit_price,
             'line_total': self.line_total,
         }
+
+
+class InvoiceSequence(db.Model):
+    __tablename__ = 'invoice_sequences'
+
+    # One counter row per calendar year; last_value is the highest suffix handed out.
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class RevenueDaily(db.Model):
+    __tablename__ = 'revenue_daily'
+
+    # Rollup of non-deleted bills per day x customer x paid status, kept in
+    # step with the bills table by rollups.py.
+    date = db.Column(db.Date, primary_key=True)
+    customer_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    is_paid = db.Column(db.Boolean, primary_key=True)
+    bill_count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0)
+
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    # Change counter per table, bumped by SQLite triggers (see migrations.py);
+    # used to build cheap ETags for the GET endpoints.
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.UniqueConstraint('table_name', 'row_id', name='uq_change_log_row'),
+        {'sqlite_autoincrement': True},
+    )
+
+    # Latest change per row, written by SQLite triggers (see migrations.py).
+    # Each write replaces the row's entry with a new, higher seq, so the
+    # delta sync endpoint reads everything after a cursor from the primary key.
+    seq = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    # Background work run by jobs.py. `params` is the JSON the job was
+    # submitted with; `result_path` is the file a finished job produced.
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    params = db.Column(db.Text)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    message = db.Column(db.Text)
+    error = db.Column(db.Text)
+    result_path = db.Column(db.Text)
+    result_name = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    @staticmethod
+    def progress_dict(done, total):
+        return {
+            'done': done,
+            'total': total,
+            'percent': round(100.0 * done / total, 1) if total else None,
+        }
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'params': json.loads(self.params) if self.params else {},
+            'progress': self.progress_dict(self.done, self.total),
+            'message': self.message,
+            'error': self.error,
+            'result': {
+                'name': self.result_name,
+                'url': f'/api/jobs/{self.id}/result',
+            } if self.status == 'succeeded' and self.result_path else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
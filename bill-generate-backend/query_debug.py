@@ -0,0 +1,202 @@
+"""N+1 query detection and a slow-query log, for development and tests.
+
+N+1 detector: while a `QueryWatcher` is active on the current thread, every
+statement is reduced to its shape (the SQL text with IN lists collapsed;
+parameters are already placeholders), and any shape run `threshold` or more
+times is reported with the stack that triggered it, e.g. a to_dict() walking
+a lazy relationship inside a loop.
+
+Slow-query log: statements slower than SLOW_QUERY_MS are written to the
+`bill.slow_queries` logger (and SLOW_QUERY_LOG) with their parameters and
+EXPLAIN QUERY PLAN output.
+
+In the app, set BILL_QUERY_DEBUG=1 to watch every request (problems are
+logged and counted in an `X-Query-Warnings` header) and BILL_SLOW_QUERY_MS
+to enable the slow log. In tests, the `query_guard` fixture (tests/conftest.py)
+fails a test whose requests run an N+1 pattern:
+
+    def test_bill_list(app, client, query_guard):
+        with query_guard.watch(app):
+            client.get('/api/bills')
+"""
+import logging
+import os
+import re
+import sysconfig
+import threading
+import time
+import traceback
+import weakref
+from contextlib import contextmanager
+
+from flask import request
+from sqlalchemy import event
+
+DEFAULT_THRESHOLD = 5
+
+logger = logging.getLogger('bill.queries')
+slow_logger = logging.getLogger('bill.slow_queries')
+
+_local = threading.local()
+_installed = weakref.WeakKeyDictionary()   # engine -> settings
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+_LIBRARY_DIRS = tuple({sysconfig.get_paths()[key] for key in ('stdlib', 'purelib', 'platlib')})
+
+
+class NPlusOneError(AssertionError):
+    """Raised by QueryWatcher.check() when a repeated query shape was seen."""
+
+
+def query_shape(statement):
+    return _IN_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+def _caller_stack():
+    """The current stack without library frames (stdlib, site-packages, frozen, this module)."""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if not frame.filename.startswith(_LIBRARY_DIRS + ('<',)) and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames))
+
+
+class QueryWatcher:
+    """Counts statements by shape; see the module docstring."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.counts = {}
+        self.stacks = {}
+        self.total = 0
+
+    def record(self, statement):
+        shape = query_shape(statement)
+        count = self.counts.get(shape, 0) + 1
+        self.counts[shape] = count
+        self.total += 1
+        if count == self.threshold:
+            self.stacks[shape] = _caller_stack()
+
+    def problems(self):
+        """[(shape, count, stack)] for every shape at or over the threshold, worst first."""
+        return sorted(
+            ((shape, self.counts[shape], stack) for shape, stack in self.stacks.items()),
+            key=lambda problem: -problem[1],
+        )
+
+    def report(self):
+        lines = []
+        for shape, count, stack in self.problems():
+            lines.append(f'{count}x {shape}\n  triggered from:\n{stack}')
+        return '\n'.join(lines)
+
+    def check(self):
+        if self.stacks:
+            raise NPlusOneError(
+                f'Repeated query shapes (threshold {self.threshold}) in {self.total} queries:\n{self.report()}'
+            )
+
+
+def current_watcher():
+    return getattr(_local, 'watcher', None)
+
+
+def _explain(dbapi_connection, statement, parameters, executemany):
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return ''
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ())
+        return '\n'.join(f'    {row[-1]}' for row in cursor.fetchall()) or '    (no plan)'
+    except Exception as e:
+        return f'    (EXPLAIN failed: {e})'
+    finally:
+        cursor.close()
+
+
+def install(engine, slow_ms=None):
+    """Attach the watcher / slow-log hooks to `engine` (once per engine)."""
+    settings = _installed.get(engine)
+    if settings is not None:
+        settings['slow_ms'] = slow_ms or settings['slow_ms']
+        return
+    settings = _installed[engine] = {'slow_ms': slow_ms}
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_debug_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info['query_debug_started'].pop()) * 1000
+        watcher = getattr(_local, 'watcher', None)
+        if watcher is not None:
+            watcher.record(statement)
+        threshold = settings['slow_ms']
+        if threshold and elapsed_ms >= threshold:
+            plan = _explain(conn.connection.dbapi_connection, statement, parameters, executemany)
+            shown = parameters[:3] if executemany else parameters
+            slow_logger.warning('%.1f ms: %s\n  params: %r\n  plan:\n%s', elapsed_ms,
+                                _WHITESPACE.sub(' ', statement).strip(), shown, plan)
+
+    @event.listens_for(engine, 'handle_error')
+    def _error(context):
+        if context.connection is not None:
+            started = context.connection.info.get('query_debug_started')
+            if started:
+                started.pop()
+
+
+@contextmanager
+def watch(engine, threshold=DEFAULT_THRESHOLD):
+    """Count this thread's statements on `engine` for the duration of the block."""
+    install(engine)
+    previous = getattr(_local, 'watcher', None)
+    watcher = _local.watcher = QueryWatcher(threshold)
+    try:
+        yield watcher
+    finally:
+        _local.watcher = previous
+
+
+def init_app(app, engine):
+    """Per-request N+1 detection (QUERY_DEBUG) and the slow-query log (SLOW_QUERY_MS)."""
+    config = app.config
+    slow_ms = config.get('SLOW_QUERY_MS') or None
+    if not config.get('QUERY_DEBUG') and not slow_ms:
+        return
+    install(engine, slow_ms)
+
+    log_path = config.get('SLOW_QUERY_LOG')
+    if slow_ms and log_path:
+        log_path = os.path.abspath(log_path)
+        if not any(getattr(h, 'baseFilename', None) == log_path for h in slow_logger.handlers):
+            handler = logging.FileHandler(log_path, encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            slow_logger.addHandler(handler)
+        slow_logger.setLevel(logging.WARNING)
+
+    if not config.get('QUERY_DEBUG'):
+        return
+    threshold = config.get('N_PLUS_ONE_THRESHOLD', DEFAULT_THRESHOLD)
+
+    @app.before_request
+    def _start_watch():
+        _local.watcher = QueryWatcher(threshold)
+
+    @app.after_request
+    def _report(response):
+        watcher = getattr(_local, 'watcher', None)
+        if watcher is not None and watcher.stacks:
+            logger.warning('%s %s: possible N+1 queries\n%s', request.method, request.path, watcher.report())
+            response.headers['X-Query-Warnings'] = str(len(watcher.stacks))
+        return response
+
+    @app.teardown_request
+    def _stop_watch(exc):
+        _local.watcher = None
+
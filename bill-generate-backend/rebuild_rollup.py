@@ -0,0 +1,31 @@
+import sys
+
+from app import create_app
+from models import db
+from rollups import rebuild_rollup, verify_rollup
+
+
+def main(argv):
+    """Rebuild the revenue_daily rollup from the bills table, then verify it.
+
+    With --check the rollup is only verified, not rebuilt.
+    """
+    app = create_app()
+    with app.app_context():
+        if '--check' not in argv:
+            with db.engine.begin() as conn:
+                rebuild_rollup(conn)
+            print("Rebuilt revenue_daily from bills.")
+
+        problems = verify_rollup(db.session)
+        if problems:
+            print(f"Rollup mismatches ({len(problems)}):")
+            for problem in problems:
+                print(f"  {problem}")
+            return 1
+        print("Rollup matches the bills table.")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
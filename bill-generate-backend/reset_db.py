@@ -24,6 +24,10 @@ def backup_and_remove(path: str):
     backup = f"{path}.bak-{ts}"
     shutil.move(path, backup)
     print(f"Backed up existing DB to: {backup}")
+    # WAL mode keeps sidecar files next to the DB; move them with it.
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            shutil.move(path + suffix, backup + suffix)
 
 
 def recreate_db():
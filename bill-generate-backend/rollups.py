@@ -0,0 +1,112 @@
+"""Incrementally maintained daily revenue rollup (`revenue_daily`).
+
+Every write path that changes a bill's date, customer, paid status, total or
+deleted flag records the change here in the same transaction, so report reads
+can scan a few hundred rollup rows instead of every invoice.
+"""
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Bill, RevenueDaily
+
+# Recomputes the whole rollup from the bills table. Shared by rebuild_rollup()
+# and the migration that seeds existing databases.
+REBUILD_SQL = (
+    "INSERT INTO revenue_daily (date, customer_id, is_paid, bill_count, total) "
+    "SELECT date, customer_id, COALESCE(is_paid, 0), COUNT(*), COALESCE(SUM(total), 0) "
+    "FROM bills WHERE is_deleted = 0 "
+    "GROUP BY date, customer_id, COALESCE(is_paid, 0)"
+)
+
+# Float sums drift a little as deltas are added and removed.
+TOLERANCE = 0.005
+
+
+def snapshot(bill):
+    """The part of a bill the rollup depends on, or None if it doesn't count."""
+    if bill is None or bill.is_deleted:
+        return None
+    return (bill.date, int(bill.customer_id), bool(bill.is_paid), float(bill.total or 0))
+
+
+def record_changes(changes):
+    """Apply a batch of (before, after) snapshot pairs to the rollup.
+
+    Deltas are folded per rollup key first, then written with one executemany
+    upsert; rows that drop to zero bills are removed.
+    """
+    deltas = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for snap, sign in ((before, -1), (after, 1)):
+            if snap is None:
+                continue
+            key = snap[:3]
+            count, total = deltas.get(key, (0, 0.0))
+            deltas[key] = (count + sign, total + sign * snap[3])
+
+    rows = [
+        {'date': k[0], 'customer_id': k[1], 'is_paid': k[2], 'bill_count': count, 'total': total}
+        for k, (count, total) in deltas.items()
+        if count or abs(total) > 1e-9
+    ]
+    if not rows:
+        return
+
+    stmt = sqlite_insert(RevenueDaily)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['date', 'customer_id', 'is_paid'],
+            set_={
+                'bill_count': RevenueDaily.bill_count + stmt.excluded.bill_count,
+                'total': RevenueDaily.total + stmt.excluded.total,
+            },
+        ),
+        rows,
+    )
+    if any(row['bill_count'] < 0 for row in rows):
+        db.session.execute(delete(RevenueDaily).where(RevenueDaily.bill_count <= 0))
+
+
+def record_change(before, after):
+    record_changes([(before, after)])
+
+
+def rebuild_rollup(conn):
+    """Recompute `revenue_daily` from scratch on a Connection."""
+    conn.exec_driver_sql("DELETE FROM revenue_daily")
+    conn.exec_driver_sql(REBUILD_SQL)
+
+
+def verify_rollup(session):
+    """Compare the rollup with the base tables; return a list of mismatch descriptions."""
+    expected = {
+        (row.date, row.customer_id, bool(row.is_paid)): (row.bill_count, float(row.total))
+        for row in session.execute(
+            select(
+                Bill.date, Bill.customer_id, func.coalesce(Bill.is_paid, False).label('is_paid'),
+                func.count().label('bill_count'), func.coalesce(func.sum(Bill.total), 0).label('total'),
+            )
+            .where(Bill.is_deleted == False)
+            .group_by(Bill.date, Bill.customer_id, func.coalesce(Bill.is_paid, False))
+        )
+    }
+    actual = {
+        (row.date, row.customer_id, bool(row.is_paid)): (row.bill_count, float(row.total))
+        for row in session.execute(
+            select(RevenueDaily.date, RevenueDaily.customer_id, RevenueDaily.is_paid,
+                   RevenueDaily.bill_count, RevenueDaily.total)
+        )
+    }
+
+    problems = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], k[1], k[2])):
+        want = expected.get(key, (0, 0.0))
+        got = actual.get(key, (0, 0.0))
+        if want[0] != got[0] or abs(want[1] - got[1]) > TOLERANCE:
+            problems.append(
+                f"{key[0]} customer={key[1]} paid={key[2]}: expected {want[0]} bills / {want[1]:.2f}, "
+                f"rollup has {got[0]} / {got[1]:.2f}"
+            )
+    return problems
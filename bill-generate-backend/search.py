@@ -0,0 +1,100 @@
+"""Full-text search over customers and services (SQLite FTS5).
+
+Each searchable table has a standalone FTS5 index (`customers_fts`,
+`services_fts`) whose rowid is the source row's id. Only active rows are
+indexed; triggers keep the index in step with inserts, updates (including
+soft deletes and restores) and hard deletes, whatever code path did the write.
+"""
+from sqlalchemy import column, literal_column, select, table
+
+# source table -> indexed columns, with bm25 weights (name matches rank highest)
+SEARCH_INDEXES = {
+    'customers': (('name', 10.0), ('email', 4.0), ('phone', 4.0), ('address', 1.0)),
+    'services': (('name', 10.0), ('description', 1.0)),
+}
+
+DEFAULT_LIMIT = 20
+
+# prefix='2 3' keeps short as-you-type prefix queries on the index.
+_TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+
+class SearchError(ValueError):
+    """Raised for a search request that can't be run (no search terms)."""
+
+
+def _columns(source):
+    return [name for name, _ in SEARCH_INDEXES[source]]
+
+
+def create_search_index(conn, source):
+    """Create (or rebuild) the FTS index for `source` and its sync triggers."""
+    fts = f'{source}_fts'
+    cols = _columns(source)
+    col_list = ', '.join(cols)
+    new_values = ', '.join(f'new.{c}' for c in cols)
+
+    conn.exec_driver_sql(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({col_list}, {_TOKENIZE})")
+    # Default `rank` is bm25 with the column weights above.
+    weights = ', '.join(str(weight) for _, weight in SEARCH_INDEXES[source])
+    conn.exec_driver_sql(f"INSERT INTO {fts} ({fts}, rank) VALUES ('rank', 'bm25({weights})')")
+    conn.exec_driver_sql(f"DELETE FROM {fts}")
+    conn.exec_driver_sql(
+        f"INSERT INTO {fts} (rowid, {col_list}) SELECT id, {col_list} FROM {source} WHERE is_deleted = 0"
+    )
+
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{source}_fts_ins AFTER INSERT ON {source} "
+        f"WHEN new.is_deleted = 0 "
+        f"BEGIN INSERT INTO {fts} (rowid, {col_list}) VALUES (new.id, {new_values}); END"
+    )
+    # Covers edits, soft deletes (row leaves the index) and restores (row comes back).
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{source}_fts_upd AFTER UPDATE ON {source} "
+        f"BEGIN "
+        f"DELETE FROM {fts} WHERE rowid = old.id; "
+        f"INSERT INTO {fts} (rowid, {col_list}) SELECT new.id, {new_values} WHERE new.is_deleted = 0; "
+        f"END"
+    )
+    conn.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS trg_{source}_fts_del AFTER DELETE ON {source} "
+        f"BEGIN DELETE FROM {fts} WHERE rowid = old.id; END"
+    )
+
+
+def match_expression(q):
+    """Turn free text into a safe FTS5 query: every word must match as a prefix.
+
+    Words are quoted, so FTS5 syntax in user input (AND, NEAR, *, ^, column
+    filters, stray quotes) is searched for literally instead of raising. The
+    extra whole-word alternative makes exact matches rank above prefix ones.
+    """
+    terms = []
+    for word in (q or '').split():
+        word = word.replace('"', '')
+        if word:
+            terms.append(f'("{word}" OR "{word}"*)')
+    if not terms:
+        raise SearchError('q is required')
+    return ' AND '.join(terms)
+
+
+def search(select_stmt, model, q, limit):
+    """Restrict `select_stmt` (over `model`) to the `limit` best matches for `q`.
+
+    Ranking and the limit are applied inside the FTS query, so only the
+    returned rows are joined back to the source table.
+    """
+    fts = table(f'{model.__tablename__}_fts', column('rowid'), column('rank'))
+    hits = (
+        select(fts.c.rowid, fts.c.rank)
+        .where(literal_column(fts.name).op('MATCH')(match_expression(q)))
+        .order_by(fts.c.rank)
+        .limit(limit)
+        .subquery()
+    )
+    return (
+        select_stmt
+        .join(hits, hits.c.rowid == model.id)
+        .order_by(hits.c.rank, model.id)
+    )
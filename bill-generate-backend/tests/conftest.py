@@ -0,0 +1,88 @@
+"""Shared fixtures: an app on a fresh SQLite file per test, data helpers and
+the N+1 query guard.
+
+Run from bill-generate-backend with `python -m pytest`.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+import query_debug
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # create_app() copies Config, so point it at per-test paths first.
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, 'PDF_CACHE_DIR', str(tmp_path / 'pdf_cache'))
+    monkeypatch.setattr(Config, 'JOB_RESULTS_DIR', str(tmp_path / 'job_results'))
+
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    app.config['TESTING'] = True
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def seed(client):
+    """seed(bills=N) creates a few customers and services, then N bills
+    with one to three lines each; returns (customer_ids, service_ids, bill_ids)."""
+    def create(bills=5, customers=3, services=3):
+        customer_ids = [
+            client.post('/api/customers', json={
+                'name': f'Customer {i}', 'email': f'c{i}@example.lk', 'phone': '0710000000'
+            }).get_json()['data']['id']
+            for i in range(customers)
+        ]
+        service_ids = [
+            client.post('/api/services', json={'name': f'Service {i}', 'price': 100 + i}).get_json()['data']['id']
+            for i in range(services)
+        ]
+        payload = [
+            {
+                'customer_id': customer_ids[i % customers],
+                'date': f'2025-{i % 12 + 1:02d}-15',
+                'items': [{'service_id': service_ids[(i + j) % services], 'quantity': j + 1}
+                          for j in range(i % 3 + 1)],
+            }
+            for i in range(bills)
+        ]
+        response = client.post('/api/bills/bulk', json={'bills': payload})
+        assert response.status_code == 201, response.get_json()
+        bill_ids = [result['id'] for result in response.get_json()['data']['results']]
+        return customer_ids, service_ids, bill_ids
+    return create
+
+
+class QueryGuard:
+    """Handed out by the `query_guard` fixture.
+
+    `with query_guard.watch(app) as watcher:` counts the statements run in
+    the block (watcher.total) and fails the test if any query shape repeats
+    `threshold` times or more, i.e. an N+1 pattern.
+    """
+
+    @contextmanager
+    def watch(self, app, threshold=query_debug.DEFAULT_THRESHOLD):
+        from models import db
+
+        with app.app_context():
+            engine = db.engine
+        with query_debug.watch(engine, threshold) as watcher:
+            yield watcher
+        watcher.check()
+
+
+@pytest.fixture
+def query_guard():
+    return QueryGuard()
@@ -0,0 +1,46 @@
+"""The bill endpoints must run a fixed number of queries however many bills
+there are, and never one query per bill or line (N+1)."""
+
+
+def _queries(query_guard, app, client, url):
+    with query_guard.watch(app) as watcher:
+        response = client.get(url)
+    assert response.status_code == 200
+    return watcher.total
+
+
+def test_bill_list_query_count_is_constant(app, client, seed, query_guard):
+    seed(bills=5)
+    with_5 = _queries(query_guard, app, client, '/api/bills')
+    seed(bills=45)
+    with_50 = _queries(query_guard, app, client, '/api/bills')
+
+    assert len(client.get('/api/bills').get_json()['data']) == 50
+    assert with_50 == with_5
+
+
+def test_paged_bill_list_query_count_is_constant(app, client, seed, query_guard):
+    seed(bills=5)
+    with_5 = _queries(query_guard, app, client, '/api/bills?limit=50')
+    seed(bills=45)
+    with_50 = _queries(query_guard, app, client, '/api/bills?limit=50')
+
+    assert with_50 == with_5
+
+
+def test_bill_detail_loads_lines_without_n_plus_one(app, client, seed, query_guard):
+    customer_ids, _, _ = seed(bills=1)
+    service_ids = [
+        client.post('/api/services', json={'name': f'Line service {i}', 'price': 10 * i}).get_json()['data']['id']
+        for i in range(1, 11)
+    ]
+    bill_id = client.post('/api/bills', json={
+        'customer_id': customer_ids[0],
+        'items': [{'service_id': service_id, 'quantity': 2} for service_id in service_ids],
+    }).get_json()['data']['id']
+
+    with query_guard.watch(app):
+        response = client.get(f'/api/bills/{bill_id}')
+    assert response.status_code == 200
+    assert [item['service_name'] for item in response.get_json()['data']['items']] == \
+        [f'Line service {i}' for i in range(1, 11)]
@@ -0,0 +1,43 @@
+"""PUT /api/bills/<id> writes only what changed, and keeps lines in the submitted order."""
+
+
+def _writes(watcher, table):
+    """Number of INSERT / UPDATE / DELETE statements the watcher saw against `table`."""
+    prefixes = (f'INSERT INTO {table} ', f'UPDATE {table} ', f'DELETE FROM {table} ')
+    return sum(count for shape, count in watcher.counts.items() if shape.startswith(prefixes))
+
+
+def _bill(client, seed):
+    customer_ids, service_ids, _ = seed(bills=1)
+    items = [{'service_id': service_id, 'quantity': i + 1} for i, service_id in enumerate(service_ids)]
+    bill = client.post('/api/bills', json={'customer_id': customer_ids[0], 'items': items}).get_json()['data']
+    return bill, items
+
+
+def test_unchanged_save_writes_no_items(app, client, seed, query_guard):
+    bill, items = _bill(client, seed)
+    with query_guard.watch(app) as watcher:
+        response = client.put(f"/api/bills/{bill['id']}", json={'items': items})
+    assert response.status_code == 200
+    assert _writes(watcher, 'bill_items') == 0
+    assert _writes(watcher, 'bills') == 0
+
+
+def test_paid_toggle_writes_only_the_bill(app, client, seed, query_guard):
+    bill, items = _bill(client, seed)
+    with query_guard.watch(app) as watcher:
+        response = client.put(f"/api/bills/{bill['id']}", json={'is_paid': True, 'items': items})
+    assert response.status_code == 200
+    assert response.get_json()['data']['is_paid'] is True
+    assert _writes(watcher, 'bill_items') == 0
+    assert _writes(watcher, 'bills') == 1
+
+
+def test_reordered_lines_keep_the_new_order(client, seed):
+    bill, items = _bill(client, seed)
+    reordered = items[::-1]
+    response = client.put(f"/api/bills/{bill['id']}", json={'items': reordered})
+    assert response.status_code == 200
+    expected = [(item['service_id'], item['quantity']) for item in reordered]
+    for data in (response.get_json()['data'], client.get(f"/api/bills/{bill['id']}").get_json()['data']):
+        assert [(item['service_id'], item['quantity']) for item in data['items']] == expected
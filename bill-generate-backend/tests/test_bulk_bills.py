@@ -0,0 +1,69 @@
+"""POST /api/bills/bulk: one transaction, set-based lookups, contiguous numbers."""
+from api import bill_api
+
+
+def _payload(customer_id, service_ids, day, quantity=1):
+    return {'customer_id': customer_id, 'date': day,
+            'items': [{'service_id': service_id, 'quantity': quantity} for service_id in service_ids]}
+
+
+def _bill_count(client):
+    return len(client.get('/api/bills').get_json()['data'])
+
+
+def test_numbers_are_contiguous_per_year_in_submission_order(client, seed):
+    customer_ids, service_ids, _ = seed(bills=1)   # INV-25-0001
+    days = ['2025-02-01', '2024-05-01', '2025-03-01', '2024-06-01', '2025-04-01']
+    response = client.post('/api/bills/bulk', json={'bills': [_payload(customer_ids[0], service_ids, d) for d in days]})
+    assert response.status_code == 201
+    numbers = [result['bill_number'] for result in response.get_json()['data']['results']]
+    assert numbers == ['INV-25-0002', 'INV-24-0001', 'INV-25-0003', 'INV-24-0002', 'INV-25-0004']
+
+
+def test_one_invalid_bill_creates_nothing(client, seed):
+    customer_ids, service_ids, _ = seed(bills=1)
+    bills = [
+        _payload(customer_ids[0], service_ids, '2025-01-01'),
+        _payload(customer_ids[0], [999999], '2025-01-02'),
+        _payload(customer_ids[0], service_ids, '2025-01-03', quantity=0),
+    ]
+    response = client.post('/api/bills/bulk', json={'bills': bills})
+    assert response.status_code == 400
+    data = response.get_json()['data']
+    assert data['created'] == 0
+    assert [result['index'] for result in data['results']] == [1, 2]
+    assert _bill_count(client) == 1
+
+    # The failed request didn't use up invoice numbers either.
+    response = client.post('/api/bills/bulk', json={'bills': bills[:1]})
+    assert response.get_json()['data']['results'][0]['bill_number'] == 'INV-25-0002'
+
+
+def test_request_size_is_limited(client, seed, monkeypatch):
+    customer_ids, service_ids, _ = seed(bills=1)
+    monkeypatch.setattr(bill_api, 'MAX_BULK_BILLS', 2)
+    bills = [_payload(customer_ids[0], service_ids, '2025-01-01')] * 3
+    response = client.post('/api/bills/bulk', json={'bills': bills})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'At most 2 bills per request'
+    assert _bill_count(client) == 1
+
+
+def test_services_are_checked_with_one_in_query(app, client, seed, query_guard):
+    import catalog_cache
+
+    customer_ids, service_ids, _ = seed(bills=1, customers=3, services=3)
+    bills = [_payload(customer_ids[i % 3], service_ids, '2025-01-01') for i in range(20)]
+    with app.app_context():
+        # Cold caches, so the lookups reach the database.
+        catalog_cache.customers().invalidate()
+        catalog_cache.services().invalidate()
+    with query_guard.watch(app) as watcher:
+        response = client.post('/api/bills/bulk', json={'bills': bills})
+    assert response.status_code == 201
+
+    def selects_from(table):
+        return sum(count for shape, count in watcher.counts.items()
+                   if shape.startswith('SELECT') and f'FROM {table} ' in f'{shape} ')
+    assert selects_from('services') == 1
+    assert selects_from('customers') == 1
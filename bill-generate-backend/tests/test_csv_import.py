@@ -0,0 +1,50 @@
+import io
+
+import csv_import
+from models import db, Service
+from api.service_api import SERVICE_IMPORT_COLUMNS
+
+
+def _post_csv(client, url, text):
+    return client.post(url, data=text.encode('utf-8'), content_type='text/csv')
+
+
+def test_non_finite_prices_are_reported_per_row(client):
+    response = _post_csv(client, '/api/services/import',
+                         'name,price\nCleaning,100\nBad,nan\nWorse,inf\nRepair,1,500.00\n')
+    summary = response.get_json()['data']
+    assert response.status_code == 201
+    assert summary['imported'] == 2
+    assert [error['line'] for error in summary['errors']] == [3, 4]
+
+
+def test_row_rejected_by_the_database_does_not_fail_its_batch(app):
+    def convert(record):
+        # Skip the row check so the NOT NULL constraint catches "missing".
+        record['price'] = None if record['price'] == 'missing' else float(record['price'])
+        return record
+
+    stream = io.BytesIO(b'name,price\nA,1\nB,missing\nC,3\n')
+    with app.app_context():
+        summary = csv_import.import_csv(stream, Service, SERVICE_IMPORT_COLUMNS, ('name', 'price'), convert)
+        names = db.session.execute(db.select(Service.name).order_by(Service.name)).scalars().all()
+    assert summary['imported'] == 2
+    assert summary['failed'] == 1
+    assert summary['errors'][0]['line'] == 3
+    assert names == ['A', 'C']
+
+
+def test_unreadable_data_returns_the_partial_summary(app):
+    # Past the decoder's first read, so some batches commit before the error.
+    rows = ''.join(f'Service {i},{i}\n' for i in range(2000))
+    stream = io.BytesIO(f'name,price\n{rows}'.encode('utf-8') + b'Bad \xff,1\n')
+    with app.app_context():
+        try:
+            csv_import.import_csv(stream, Service, SERVICE_IMPORT_COLUMNS, ('name', 'price'),
+                                  lambda record: record, batch_size=100)
+        except csv_import.CsvImportError as e:
+            summary = e.summary
+        else:
+            raise AssertionError('expected CsvImportError')
+    assert summary['imported'] > 0
+    assert summary['imported'] % 100 == 0
@@ -0,0 +1,54 @@
+"""Conditional GETs: ETags from the table_versions counters (migration v3 triggers)."""
+import pytest
+from sqlalchemy import text
+
+from models import db
+
+
+def _etag(client, url='/api/bills', **headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def test_repeated_get_is_answered_with_304(client, seed):
+    seed(bills=3)
+    etag = _etag(client)
+    response = client.get('/api/bills', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+# One write per table the bill list is built from, straight to SQLite, so the
+# triggers (not the routes) are what's being tested.
+@pytest.mark.parametrize('statement', [
+    "UPDATE customers SET phone = '0770000000' WHERE id = 1",
+    "UPDATE services SET name = 'Renamed' WHERE id = 1",
+    "UPDATE bills SET is_paid = 1 WHERE id = 1",
+    "UPDATE bill_items SET quantity = quantity + 1 WHERE id = 1",
+    "INSERT INTO bill_items (bill_id, service_id, quantity, unit_price, line_total) VALUES (1, 1, 1, 1, 1)",
+    "DELETE FROM bill_items WHERE id = 1",
+])
+def test_a_write_to_any_listed_table_changes_the_tag(app, client, seed, statement):
+    seed(bills=3)
+    before = _etag(client)
+    with app.app_context():
+        db.session.execute(text(statement))
+        db.session.commit()
+    after = _etag(client)
+    assert after != before
+    assert client.get('/api/bills', headers={'If-None-Match': before}).status_code == 200
+
+
+def test_gzip_and_plain_bodies_have_their_own_tags(app, client, seed):
+    app.config['JSON_GZIP_MIN_SIZE'] = 0
+    seed(bills=3)
+    plain = client.get('/api/bills')
+    gzipped = client.get('/api/bills', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in plain.headers
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert plain.headers['ETag'] != gzipped.headers['ETag']
+    response = client.get('/api/bills', headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzipped.headers['ETag']})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == gzipped.headers['ETag']
@@ -0,0 +1,33 @@
+import json
+import os
+import time
+
+
+def _wait(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f'/api/jobs/{job_id}').get_json()['data']
+        if job['status'] not in ('queued', 'running') or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_async_service_import_runs_as_a_job(app, client):
+    response = client.post('/api/services/import?async=1', data=b'name,price\nCleaning,100\nBad,nan\n',
+                           content_type='text/csv')
+    assert response.status_code == 202
+    job = _wait(client, response.get_json()['data']['id'])
+    assert job['status'] == 'succeeded', job
+
+    summary = json.loads(client.get(f"/api/jobs/{job['id']}/result").data)
+    assert summary['imported'] == 1
+    assert summary['errors'][0]['line'] == 3
+    assert [s['name'] for s in client.get('/api/services').get_json()['data']] == ['Cleaning']
+    # Only the result is left; the spooled upload is gone.
+    assert [name for name in os.listdir(app.config['JOB_RESULTS_DIR']) if name.startswith('upload-')] == []
+
+
+def test_import_job_only_reads_spooled_uploads(client):
+    for upload in ('../test.db', 'upload-missing.csv', None):
+        response = client.post('/api/jobs', json={'type': 'customer_import', 'params': {'upload': upload}})
+        assert response.status_code == 400
@@ -0,0 +1,65 @@
+"""Invoice numbers: INV-YY-NNNN per year, seeded from existing bills, unique under concurrency."""
+import threading
+from datetime import date
+
+from models import db, Bill
+
+
+def _legacy_bills(app, customer_id, *numbers):
+    with app.app_context():
+        db.session.execute(Bill.__table__.insert(), [
+            {'bill_number': number, 'customer_id': customer_id, 'total': 0, 'date': date(2023, 6, 1),
+             'is_paid': False, 'is_deleted': False}
+            for number in numbers
+        ])
+        db.session.commit()
+
+
+def _create(client, customer_id, service_id, day):
+    response = client.post('/api/bills', json={
+        'customer_id': customer_id, 'date': day, 'items': [{'service_id': service_id, 'quantity': 1}],
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['data']['bill_number']
+
+
+def test_year_is_seeded_from_legacy_numbers(app, client, seed):
+    customer_ids, service_ids, _ = seed(bills=1)
+    _legacy_bills(app, customer_ids[0], 'INV-2023-0042', 'INV-23-0007')
+    assert _create(client, customer_ids[0], service_ids[0], '2023-07-01') == 'INV-23-0043'
+    assert _create(client, customer_ids[0], service_ids[0], '2023-07-02') == 'INV-23-0044'
+
+
+def test_suffixes_compare_as_numbers(app, client, seed):
+    customer_ids, service_ids, _ = seed(bills=1)
+    _legacy_bills(app, customer_ids[0], 'INV-23-9999', 'inv-23-10000')
+    assert _create(client, customer_ids[0], service_ids[0], '2023-07-01') == 'INV-23-10001'
+
+
+def test_numbering_restarts_each_year(client, seed):
+    customer_ids, service_ids, _ = seed(bills=1)
+    assert _create(client, customer_ids[0], service_ids[0], '2021-12-31') == 'INV-21-0001'
+    assert _create(client, customer_ids[0], service_ids[0], '2022-01-01') == 'INV-22-0001'
+    assert _create(client, customer_ids[0], service_ids[0], '2021-12-30') == 'INV-21-0002'
+
+
+def test_concurrent_creates_get_unique_numbers(app, seed):
+    customer_ids, service_ids, _ = seed(bills=1)
+    numbers, errors = [], []
+
+    def create_many():
+        client = app.test_client()
+        try:
+            for _ in range(5):
+                numbers.append(_create(client, customer_ids[0], service_ids[0], '2020-03-01'))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=create_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(numbers) == [f'INV-20-{n:04d}' for n in range(1, 21)]
@@ -0,0 +1,23 @@
+import re
+import zlib
+
+import invoice_pdf
+
+
+def _page_text(pdf):
+    streams = re.findall(rb'stream\n(.*?)\nendstream', pdf, re.S)
+    return b''.join(zlib.decompress(data) for data in streams)
+
+
+def test_footer_year_comes_from_the_bill_date():
+    pdf = invoice_pdf.render_invoice({'bill_number': 'INV-21-0001', 'date': '2021-03-04', 'total': 0, 'items': []})
+    assert b'\xa9 2021 ' in _page_text(pdf)
+
+
+def test_service_edit_changes_the_cached_pdf(client, seed):
+    _, service_ids, bill_ids = seed(bills=1, services=1)
+    before = _page_text(client.get(f'/api/bills/{bill_ids[0]}/pdf').data)
+    client.put(f'/api/services/{service_ids[0]}', json={'name': 'Renamed service'})
+    after = _page_text(client.get(f'/api/bills/{bill_ids[0]}/pdf').data)
+    assert b'Renamed service' not in before
+    assert b'Renamed service' in after
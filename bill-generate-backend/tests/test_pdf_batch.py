@@ -0,0 +1,43 @@
+def test_pdf_batch_rejects_non_object_filters(client):
+    response = client.post('/api/bills/pdf-batch', json={'filters': [1]})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'filters must be an object'
+
+
+def test_pdf_batch_job_rejects_non_object_filters(client):
+    response = client.post('/api/jobs', json={'type': 'pdf_batch', 'params': {'filters': [1]}})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'filters must be an object'
+
+
+class _IdlePool:
+    """Stands in for the render pool: accepts work and never runs it."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+        self.futures.append(Future())
+        return self.futures[-1]
+
+
+def test_pdf_batch_shares_one_pool_and_cancels_pending_renders(app, seed, monkeypatch):
+    import invoice_pdf
+    from api import bill_api
+
+    _, _, bill_ids = seed(bills=2)
+    pool = _IdlePool()
+    sizes = []
+    monkeypatch.setattr(invoice_pdf, 'render_pool', lambda size: sizes.append(size) or pool)
+    app.config['PDF_WORKERS'] = 3
+    with app.app_context():
+        assert bill_api._pdf_batch_workers({'workers': 50}, 10) == 3
+        assert bill_api._pdf_batch_workers({}, 2) == 2
+        chunks = bill_api._iter_pdf_zip(bill_ids, app.config['PDF_CACHE_DIR'], 2)
+        next(chunks)
+        chunks.close()
+    # The pool is sized from PDF_WORKERS, not the request's workers.
+    assert sizes == [3]
+    assert len(pool.futures) == 2
+    assert all(future.cancelled() for future in pool.futures)
@@ -0,0 +1,32 @@
+"""revenue_daily is kept in step by hand on every bill write path; check each against a rebuild."""
+import rollups
+from models import db
+
+
+def test_every_bill_write_keeps_the_rollup_in_step(app, client, seed):
+    customer_ids, service_ids, bill_ids = seed(bills=8)
+
+    def item(quantity=1, service=0):
+        return [{'service_id': service_ids[service], 'quantity': quantity}]
+
+    created = client.post('/api/bills', json={'customer_id': customer_ids[0], 'date': '2025-03-03',
+                                              'items': item(2)}).get_json()['data']['id']
+    writes = [
+        ('create', lambda: client.post('/api/bills', json={
+            'customer_id': customer_ids[1], 'date': '2025-03-04', 'items': item(3)})),
+        ('bulk create', lambda: client.post('/api/bills/bulk', json={'bills': [
+            {'customer_id': customer_ids[2], 'date': '2025-03-04', 'items': item(1, 1)},
+            {'customer_id': customer_ids[0], 'date': '2025-04-01', 'items': item(5, 2), 'is_paid': True},
+        ]})),
+        ('update', lambda: client.put(f'/api/bills/{created}', json={
+            'customer_id': customer_ids[2], 'date': '2025-05-05', 'is_paid': True, 'items': item(7, 1)})),
+        ('toggle paid', lambda: client.patch(f'/api/bills/{bill_ids[0]}/toggle-paid')),
+        ('delete', lambda: client.delete(f'/api/bills/{bill_ids[1]}')),
+        ('bulk status', lambda: client.patch('/api/bills/bulk-status', json={'is_paid': True, 'ids': bill_ids[2:5]})),
+        ('bulk delete', lambda: client.delete('/api/bills/bulk', json={'filters': {'start_date': '2025-05-01'}})),
+    ]
+    for label, write in writes:
+        response = write()
+        assert response.status_code < 300, (label, response.get_json())
+        with app.app_context():
+            assert rollups.verify_rollup(db.session) == [], label
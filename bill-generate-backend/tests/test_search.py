@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.mark.parametrize('url', ['/api/customers/search', '/api/services/search'])
+@pytest.mark.parametrize('limit', ['-1', '0', 'x'])
+def test_search_rejects_bad_limits(client, url, limit):
+    response = client.get(url, query_string={'q': 'a', 'limit': limit})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('url', ['/api/customers/search', '/api/services/search'])
+def test_search_without_terms_is_a_bad_request(client, url):
+    response = client.get(url, query_string={'q': '  '})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'q is required'
+
+
+def test_search_limits_matches(client, seed):
+    seed(bills=1, services=5)
+    response = client.get('/api/services/search', query_string={'q': 'serv', 'limit': 2})
+    assert response.status_code == 200
+    assert len(response.get_json()['data']) == 2
@@ -0,0 +1,30 @@
+"""The list serializers must produce exactly what the models' to_dict() does."""
+from datetime import datetime
+
+from api.serializers import bill_dicts, bill_select, customer_dicts, customer_select, service_dicts, service_select
+from models import db, Bill, Customer, Service
+
+
+def test_row_dicts_match_to_dict(app, seed):
+    customer_ids, service_ids, bill_ids = seed(bills=3)
+    with app.app_context():
+        # Timestamps with and without a microsecond part.
+        whole_second = datetime(2025, 3, 1, 10, 0, 0)
+        db.session.execute(Bill.__table__.update().where(Bill.id == bill_ids[0])
+                           .values(created_at=whole_second, updated_at=whole_second))
+        db.session.execute(Customer.__table__.update().where(Customer.id == customer_ids[0])
+                           .values(created_at=whole_second))
+        db.session.execute(Service.__table__.update().where(Service.id == service_ids[0])
+                           .values(updated_at=datetime(2025, 3, 1, 10, 0, 0, 120)))
+        db.session.commit()
+
+        bills = bill_dicts(db.session.execute(bill_select().where(Bill.id.in_(bill_ids)).order_by(Bill.id)).all())
+        assert bills == [db.session.get(Bill, bill_id).to_dict() for bill_id in bill_ids]
+        assert bills[0]['created_at'] == '2025-03-01T10:00:00'
+
+        customers = customer_dicts(db.session.execute(customer_select().order_by(Customer.id)).all())
+        assert customers == [customer.to_dict() for customer in Customer.query.order_by(Customer.id)]
+
+        services = service_dicts(db.session.execute(service_select().order_by(Service.id)).all())
+        assert services == [service.to_dict() for service in Service.query.order_by(Service.id)]
+        assert services[0]['updated_at'] == '2025-03-01T10:00:00.000120'
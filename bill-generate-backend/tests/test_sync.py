@@ -0,0 +1,50 @@
+"""GET /api/sync: delta sync from a cursor."""
+import pytest
+
+
+def _sync(client, **args):
+    response = client.get('/api/sync', query_string=args)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', 'x'])
+def test_bad_limits_are_rejected(client, limit):
+    assert client.get('/api/sync', query_string={'limit': limit}).status_code == 400
+
+
+def test_since_cursor_picks_up_inserts_updates_and_deletes(client, seed):
+    customer_ids, service_ids, bill_ids = seed(bills=3)
+    initial = _sync(client)
+    assert not initial['has_more']
+    cursor = initial['cursor']
+
+    bill = client.get(f'/api/bills/{bill_ids[2]}').get_json()['data']   # three lines
+    removed_item = bill['items'][-1]['id']
+    new_customer = client.post('/api/customers', json={
+        'name': 'New', 'email': 'new@example.lk', 'phone': '0711111111'}).get_json()['data']['id']
+    client.put(f'/api/services/{service_ids[0]}', json={'name': 'Renamed'})
+    client.put(f'/api/bills/{bill_ids[2]}', json={'items': [
+        {'service_id': item['service_id'], 'quantity': item['quantity']} for item in bill['items'][:-1]]})
+    client.delete(f'/api/bills/{bill_ids[0]}')
+
+    delta = _sync(client, since=cursor)
+    data = delta['data']
+    assert [row['id'] for row in data['customers']] == [new_customer]
+    assert [(row['id'], row['name']) for row in data['services']] == [(service_ids[0], 'Renamed')]
+    assert {row['id']: row['is_deleted'] for row in data['bills']} == {bill_ids[0]: True, bill_ids[2]: False}
+    assert delta['deleted']['bill_items'] == [removed_item]
+    assert int(delta['cursor']) > int(cursor)
+
+    # Paging by limit hands out the same changes, and nothing is left after.
+    pages, since = [], cursor
+    while True:
+        page = _sync(client, since=since, limit=1)
+        pages.append(page)
+        since = page['cursor']
+        if not page['has_more']:
+            break
+    assert since == delta['cursor']
+    assert sum(len(rows) for page in pages for rows in page['data'].values()) == \
+        sum(len(rows) for rows in data.values())
+    assert _sync(client, since=since)['data'] == {table: [] for table in data}
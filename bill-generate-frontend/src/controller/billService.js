@@ -2,14 +2,25 @@ const API_BASE_URL = 'http://localhost:5000/api';
 
 // Bill API Service
 export const billService = {
-  // Get all bills
-  async getAll() {
-    const response = await fetch(`${API_BASE_URL}/bills`);
+  // Get all bills (optional filters: start_date, end_date, is_paid, customer_id)
+  async getAll(params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const response = await fetch(`${API_BASE_URL}/bills${query ? `?${query}` : ''}`);
     const data = await response.json();
     if (!data.success) throw new Error(data.message);
     return data.data;
   },
 
+  // Get one page of bills; pass the returned next_cursor to fetch the next page
+  async getPage(params = {}, limit = 50, cursor = null) {
+    const query = new URLSearchParams({ ...params, limit });
+    if (cursor) query.set('cursor', cursor);
+    const response = await fetch(`${API_BASE_URL}/bills?${query}`);
+    const data = await response.json();
+    if (!data.success) throw new Error(data.message);
+    return { data: data.data, nextCursor: data.next_cursor };
+  },
+
   // Get single bill
   async getById(id) {
     const response = await fetch(`${API_BASE_URL}/bills/${id}`);
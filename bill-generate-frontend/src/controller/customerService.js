@@ -2,14 +2,25 @@ const API_BASE_URL = 'http://localhost:5000/api';
 
 // Customer API Service
 export const customerService = {
-  // Get all customers
-  async getAll() {
-    const response = await fetch(`${API_BASE_URL}/customers`);
+  // Get all customers (optional filters: name prefix)
+  async getAll(params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const response = await fetch(`${API_BASE_URL}/customers${query ? `?${query}` : ''}`);
     const data = await response.json();
     if (!data.success) throw new Error(data.message);
     return data.data;
   },
 
+  // Get one page of customers; pass the returned next_cursor to fetch the next page
+  async getPage(params = {}, limit = 50, cursor = null) {
+    const query = new URLSearchParams({ ...params, limit });
+    if (cursor) query.set('cursor', cursor);
+    const response = await fetch(`${API_BASE_URL}/customers?${query}`);
+    const data = await response.json();
+    if (!data.success) throw new Error(data.message);
+    return { data: data.data, nextCursor: data.next_cursor };
+  },
+
   // Get single customer
   async getById(id) {
     const response = await fetch(`${API_BASE_URL}/customers/${id}`);
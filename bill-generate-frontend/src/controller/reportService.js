@@ -0,0 +1,15 @@
+const API_BASE_URL = 'http://localhost:5000/api';
+
+// Report API Service
+export const reportService = {
+  // Revenue summary (params: start_date, end_date, group_by=day|month|customer|service)
+  async getSummary(params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const response = await fetch(`${API_BASE_URL}/reports/summary${query ? `?${query}` : ''}`);
+    const data = await response.json();
+    if (!data.success) throw new Error(data.message);
+    return data.data;
+  },
+};
+
+export default reportService;
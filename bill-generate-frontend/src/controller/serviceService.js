@@ -2,14 +2,25 @@ const API_BASE_URL = 'http://localhost:5000/api';
 
 // Service API Service
 export const serviceService = {
-  // Get all services
-  async getAll() {
-    const response = await fetch(`${API_BASE_URL}/services`);
+  // Get all services (optional filters: name prefix)
+  async getAll(params = {}) {
+    const query = new URLSearchParams(params).toString();
+    const response = await fetch(`${API_BASE_URL}/services${query ? `?${query}` : ''}`);
     const data = await response.json();
     if (!data.success) throw new Error(data.message);
     return data.data;
   },
 
+  // Get one page of services; pass the returned next_cursor to fetch the next page
+  async getPage(params = {}, limit = 50, cursor = null) {
+    const query = new URLSearchParams({ ...params, limit });
+    if (cursor) query.set('cursor', cursor);
+    const response = await fetch(`${API_BASE_URL}/services?${query}`);
+    const data = await response.json();
+    if (!data.success) throw new Error(data.message);
+    return { data: data.data, nextCursor: data.next_cursor };
+  },
+
   // Get single service
   async getById(id) {
     const response = await fetch(`${API_BASE_URL}/services/${id}`);
@@ -1,10 +1,19 @@
 import React, { useState, useEffect } from "react";
 import billService from "../controller/billService";
-import customerService from "../controller/customerService";
+import reportService from "../controller/reportService";
+
+const emptyTotals = {
+  paid_total: 0,
+  unpaid_total: 0,
+  total: 0,
+  paid_count: 0,
+  unpaid_count: 0,
+  bill_count: 0,
+};
 
 const Reports = () => {
   const [bills, setBills] = useState([]);
-  const [customers, setCustomers] = useState([]);
+  const [totals, setTotals] = useState(emptyTotals);
   const [loading, setLoading] = useState(true);
   const [dateRange, setDateRange] = useState({
     startDate: "",
@@ -13,89 +22,89 @@ const Reports = () => {
   const [statusFilter, setStatusFilter] = useState("all");
   const [page, setPage] = useState(1);
   const [pageSize, setPageSize] = useState(10);
+  // cursors[i] is the keyset cursor that loads page i + 1 (page 1 has none)
+  const [cursors, setCursors] = useState([null]);
+
+  // Filters understood by GET /api/bills and GET /api/reports/summary
+  const buildFilters = () => {
+    const filters = {};
+    if (dateRange.startDate) filters.start_date = dateRange.startDate;
+    if (dateRange.endDate) filters.end_date = dateRange.endDate;
+    return filters;
+  };
+
+  // Totals are aggregated by the server over the date range only
+  useEffect(() => {
+    const fetchSummary = async () => {
+      try {
+        const summary = await reportService.getSummary(buildFilters());
+        setTotals(summary.totals);
+      } catch (error) {
+        console.error("Error fetching summary:", error);
+        alert("Failed to fetch data");
+      }
+    };
+    fetchSummary();
+  }, [dateRange.startDate, dateRange.endDate]);
 
+  // Fetch only the visible page of invoices
   useEffect(() => {
-    fetchData();
-  }, []);
+    const fetchPage = async () => {
+      try {
+        setLoading(true);
+        const filters = buildFilters();
+        if (statusFilter !== "all") filters.status = statusFilter;
+        const { data, nextCursor } = await billService.getPage(filters, pageSize, cursors[page - 1]);
+        setBills(data);
+        setCursors((prev) => {
+          const next = prev.slice(0, page);
+          next[page] = nextCursor;
+          return next;
+        });
+      } catch (error) {
+        console.error("Error fetching data:", error);
+        alert("Failed to fetch data");
+      } finally {
+        setLoading(false);
+      }
+    };
+    fetchPage();
+  }, [page, pageSize, statusFilter, dateRange.startDate, dateRange.endDate]);
 
-  const fetchData = async () => {
-    try {
-      setLoading(true);
-      const [billsData, customersData] = await Promise.all([
-        billService.getAll(),
-        customerService.getAll(),
-      ]);
-      setBills(billsData);
-      setCustomers(customersData);
-    } catch (error) {
-      console.error("Error fetching data:", error);
-      alert("Failed to fetch data");
-    } finally {
-      setLoading(false);
-    }
+  // Back to the first page whenever the filters change
+  const resetPaging = () => {
+    setPage(1);
+    setCursors([null]);
   };
 
   const handleDateChange = (e) => {
     const { name, value } = e.target;
     setDateRange((prev) => ({ ...prev, [name]: value }));
+    resetPaging();
   };
 
   const clearFilters = () => {
     setDateRange({ startDate: "", endDate: "" });
     setStatusFilter("all");
-    setPage(1);
+    resetPaging();
   };
 
-  // Filter bills by date range first
-  const dateFilteredBills = bills.filter((bill) => {
-    if (!dateRange.startDate && !dateRange.endDate) return true;
-    const billDate = new Date(bill.date);
-    const start = dateRange.startDate ? new Date(dateRange.startDate) : null;
-    const end = dateRange.endDate ? new Date(dateRange.endDate) : null;
-
-    if (start && end) {
-      return billDate >= start && billDate <= end;
-    } else if (start) {
-      return billDate >= start;
-    } else if (end) {
-      return billDate <= end;
-    }
-    return true;
-  });
+  // Totals from the server-side summary
+  const totalPaid = Number(totals.paid_total);
+  const totalUnpaid = Number(totals.unpaid_total);
+  const grandTotal = totalPaid + totalUnpaid;
 
-  // Status filter (all, paid, unpaid)
-  const filteredBills = dateFilteredBills.filter((bill) => {
-    if (statusFilter === "paid") return bill.is_paid;
-    if (statusFilter === "unpaid") return !bill.is_paid;
-    return true;
-  });
+  // Record count / total for the current status filter
+  const filteredCount =
+    statusFilter === "paid" ? totals.paid_count : statusFilter === "unpaid" ? totals.unpaid_count : totals.bill_count;
+  const filteredTotal = statusFilter === "paid" ? totalPaid : statusFilter === "unpaid" ? totalUnpaid : grandTotal;
 
   // Pagination
-  const totalPages = Math.max(1, Math.ceil(filteredBills.length / pageSize));
+  const totalPages = Math.max(1, Math.ceil(filteredCount / pageSize));
   const currentPage = Math.min(page, totalPages);
-  const paginatedBills = filteredBills.slice((currentPage - 1) * pageSize, currentPage * pageSize);
-
-  // Separate paid and unpaid bills (after date filter only) for totals
-  const paidBills = dateFilteredBills.filter((bill) => bill.is_paid);
-  const unpaidBills = dateFilteredBills.filter((bill) => !bill.is_paid);
-
-  // Calculate totals
-  const totalPaid = paidBills.reduce((sum, bill) => sum + Number(bill.total), 0);
-  const totalUnpaid = unpaidBills.reduce((sum, bill) => sum + Number(bill.total), 0);
-  const grandTotal = totalPaid + totalUnpaid;
-
-  // Reset to first page when filters change
-  useEffect(() => {
-    setPage(1);
-  }, [statusFilter, dateRange.startDate, dateRange.endDate]);
-
-  // Get customer name helper
-  const getCustomerName = (customerId) => {
-    const customer = customers.find((c) => c.id === customerId);
-    return customer ? customer.name : "Unknown";
-  };
+  const hasNextPage = Boolean(cursors[page]);
 
-  if (loading) {
+  if (loading && bills.length === 0) {
     return (
       <div className="flex justify-center items-center h-64">
         <div className="text-gray-500">Loading reports...</div>
@@ -138,7 +147,10 @@ const Reports = () => {
             <label className="block text-sm font-medium text-gray-600 mb-1">Status</label>
             <select
               value={statusFilter}
-              onChange={(e) => setStatusFilter(e.target.value)}
+              onChange={(e) => {
+                setStatusFilter(e.target.value);
+                resetPaging();
+              }}
               className="w-full rounded-lg border border-gray-300 px-4 py-2 text-gray-800 focus:border-slate-500 focus:ring-2 focus:ring-slate-200 outline-none transition"
             >
               <option value="all">All</option>
@@ -163,7 +175,7 @@ const Reports = () => {
             <div>
               <p className="text-green-100 text-sm font-medium uppercase tracking-wide">Total Paid</p>
               <p className="text-3xl font-bold mt-1">Rs. {totalPaid.toFixed(2)}</p>
-              <p className="text-green-100 text-sm mt-2">{paidBills.length} invoice(s)</p>
+              <p className="text-green-100 text-sm mt-2">{totals.paid_count} invoice(s)</p>
             </div>
             <div className="p-3 bg-white/20 rounded-full">
               <svg width="32" height="32" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round">
@@ -180,7 +192,7 @@ const Reports = () => {
             <div>
               <p className="text-red-100 text-sm font-medium uppercase tracking-wide">Total Unpaid</p>
               <p className="text-3xl font-bold mt-1">Rs. {totalUnpaid.toFixed(2)}</p>
-              <p className="text-red-100 text-sm mt-2">{unpaidBills.length} invoice(s)</p>
+              <p className="text-red-100 text-sm mt-2">{totals.unpaid_count} invoice(s)</p>
             </div>
             <div className="p-3 bg-white/20 rounded-full">
               <svg width="32" height="32" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round">
@@ -198,7 +210,7 @@ const Reports = () => {
             <div>
               <p className="text-slate-300 text-sm font-medium uppercase tracking-wide">Grand Total</p>
               <p className="text-3xl font-bold mt-1">Rs. {grandTotal.toFixed(2)}</p>
-              <p className="text-slate-300 text-sm mt-2">{filteredBills.length} invoice(s)</p>
+              <p className="text-slate-300 text-sm mt-2">{totals.bill_count} invoice(s)</p>
             </div>
             <div className="p-3 bg-white/20 rounded-full">
               <svg width="32" height="32" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="2" strokeLinecap="round" strokeLinejoin="round">
@@ -229,7 +241,7 @@ const Reports = () => {
                 value={pageSize}
                 onChange={(e) => {
                   setPageSize(Number(e.target.value));
-                  setPage(1);
+                  resetPaging();
                 }}
                 className="bg-slate-700 text-white border border-slate-500 rounded px-2 py-1 text-xs"
               >
@@ -238,7 +250,7 @@ const Reports = () => {
                 ))}
               </select>
             </div>
-            <span>{filteredBills.length} record(s)</span>
+            <span>{filteredCount} record(s)</span>
           </div>
         </div>
         <div className="overflow-x-auto max-h-[520px]">
@@ -253,21 +265,21 @@ const Reports = () => {
               </tr>
             </thead>
             <tbody className="divide-y divide-gray-100">
-              {filteredBills.length === 0 ? (
+              {bills.length === 0 ? (
                 <tr>
                   <td colSpan="5" className="text-center text-gray-400 italic py-10">
                     No invoices found for the selected filters
                   </td>
                 </tr>
               ) : (
-                paginatedBills.map((bill) => (
+                bills.map((bill) => (
                   <tr key={bill.id} className="hover:bg-slate-50 transition-colors">
                     <td className="px-4 py-3">
                       <span className={`font-mono px-2 py-1 rounded text-xs font-bold ${bill.is_paid ? "bg-green-100 text-green-800" : "bg-red-100 text-red-800"}`}>
                         {bill.bill_number}
                       </span>
                     </td>
-                    <td className="px-4 py-3 text-gray-700">{bill.customer_name || getCustomerName(bill.customer_id)}</td>
+                    <td className="px-4 py-3 text-gray-700">{bill.customer_name || "Unknown"}</td>
                     <td className="px-4 py-3 text-gray-700">{bill.date}</td>
                     <td className="px-4 py-3 text-gray-700">
                       <span className={`px-2 py-1 rounded-full text-xs font-semibold ${bill.is_paid ? "bg-green-100 text-green-800" : "bg-red-100 text-red-800"}`}>
@@ -279,12 +291,12 @@ const Reports = () => {
                 ))
               )}
             </tbody>
-            {filteredBills.length > 0 && (
+            {bills.length > 0 && (
               <tfoot className="bg-slate-50 sticky bottom-0">
                 <tr>
                   <td colSpan="4" className="px-4 py-3 font-bold text-gray-800">Total (filtered)</td>
                   <td className="px-4 py-3 text-right font-bold text-slate-900">
-                    Rs. {filteredBills.reduce((sum, bill) => sum + Number(bill.total), 0).toFixed(2)}
+                    Rs. {filteredTotal.toFixed(2)}
                   </td>
                 </tr>
                 <tr>
@@ -300,9 +312,9 @@ const Reports = () => {
                           Prev
                         </button>
                         <button
-                          onClick={() => setPage((p) => Math.min(totalPages, p + 1))}
-                          disabled={currentPage === totalPages}
-                          className={`px-3 py-1 rounded border ${currentPage === totalPages ? "border-gray-200 text-gray-400 cursor-not-allowed" : "border-slate-300 text-slate-800 hover:bg-slate-100"}`}
+                          onClick={() => setPage((p) => p + 1)}
+                          disabled={!hasNextPage}
+                          className={`px-3 py-1 rounded border ${!hasNextPage ? "border-gray-200 text-gray-400 cursor-not-allowed" : "border-slate-300 text-slate-800 hover:bg-slate-100"}`}
                         >
                           Next
                         </button>